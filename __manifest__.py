@@ -17,11 +17,13 @@
         'base',
         'sale_management',
         'account',
+        'project',
         'hr',
         'web',
     ],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/dashboard.xml',
         'views/hr_dashboard_menu.xml',
         'views/l2_dashboard.xml',
@@ -35,12 +37,16 @@
     'images': ['static/description/icon.png'],
     'assets': {
         'web.assets_backend': [
-            "https://cdnjs.cloudflare.com/ajax/libs/highcharts/12.1.2/highcharts.min.js",
-            "https://cdnjs.cloudflare.com/ajax/libs/highcharts/12.1.2/highcharts-3d.min.js",
-            "https://cdnjs.cloudflare.com/ajax/libs/highcharts/12.1.2/css/highcharts.min.css",
+            'my_dashboard/static/src/js/dashboard_loader.js',
+        ],
+        # loaded on demand by dashboard_loader.js when a dashboard opens
+        'my_dashboard.assets_dashboard': [
+            # Chart.js 4.4.5, the UMD build of the release, served by Odoo
+            'my_dashboard/static/lib/chartjs-4.4.5/chart.umd.min.js',
             'my_dashboard/static/src/js/*.js',
+            ('remove', 'my_dashboard/static/src/js/dashboard_loader.js'),
             'my_dashboard/static/src/scss/*.scss',
-            'my_dashboard/static/src/xml/*.xml', 
+            'my_dashboard/static/src/xml/*.xml',
         ],
     },
     'application': True,
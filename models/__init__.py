@@ -1,8 +1,19 @@
+from . import dashboard_mixin
+from . import dashboard_period_cache
+from . import dashboard_snapshot
+from . import res_company
+from . import dashboard_monthly_cube
+from . import dashboard_cube_stale
+from . import sale_order
+from . import account_move
+from . import project_project
 from . import dashboard
 from . import l2_dashboard
 from . import l4_dashboard
 from . import sale_target
+from . import sale_target_cube
 from . import l3_dashboard
 from . import reports
 from . import hr_dashboard
+from . import hr_headcount_snapshot
 from . import l1_dashboard
@@ -0,0 +1,91 @@
+from odoo import api, models
+
+# Fields of the moves and move lines the dashboard cubes read: writes to any
+# other field leave the cubes untouched
+MOVE_FIELDS = {'state', 'date', 'invoice_date', 'company_id', 'move_type', 'currency_id',
+               'line_ids', 'invoice_line_ids'}
+MOVE_LINE_FIELDS = {'move_id', 'account_id', 'display_type', 'balance', 'debit', 'credit', 'amount_currency',
+                    'price_unit', 'quantity', 'discount', 'tax_ids', 'analytic_distribution'}
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    # Roll-up cubes built from the posted invoices, bills and payments
+    _dashboard_cubes = ('druksmart_dashboard.monthly_cube',)
+
+    def _get_dashboard_cube_months(self, counterparts=True):
+        """``(company id, year, month)`` of the posted moves, see ``druksmart_dashboard.cube_stale``.
+
+        Payments are spread over the invoices they reconcile, so the months
+        of the moves reconciled with these ones are included, unless
+        ``counterparts`` is False.
+        """
+        moves = self.filtered(lambda move: move.state == 'posted')
+        if counterparts:
+            lines = moves.line_ids
+            moves |= lines.matched_debit_ids.debit_move_id.move_id | lines.matched_credit_ids.credit_move_id.move_id
+        return {
+            (move.company_id.id, day.year, day.month)
+            for move in moves for day in (move.date, move.invoice_date) if day
+        }
+
+    def _mark_dashboard_cubes(self, months=(), counterparts=True):
+        """Mark the months of the moves, and ``months``, stale in the dashboard cubes."""
+        self.env['druksmart_dashboard.cube_stale'].sudo()._mark(
+            self._dashboard_cubes, set(months) | self._get_dashboard_cube_months(counterparts))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        moves = super().create(vals_list)
+        moves._mark_dashboard_cubes()
+        return moves
+
+    def write(self, vals):
+        if not MOVE_FIELDS & set(vals):
+            return super().write(vals)
+        # months before the change too: the move may leave them
+        months = self._get_dashboard_cube_months()
+        res = super().write(vals)
+        self._mark_dashboard_cubes(months)
+        return res
+
+    def unlink(self):
+        self._mark_dashboard_cubes()
+        return super().unlink()
+
+
+class AccountMoveLine(models.Model):
+    _inherit = 'account.move.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.move_id._mark_dashboard_cubes()
+        return lines
+
+    def write(self, vals):
+        if not MOVE_LINE_FIELDS & set(vals):
+            return super().write(vals)
+        months = self.move_id._get_dashboard_cube_months()
+        res = super().write(vals)
+        self.move_id._mark_dashboard_cubes(months)
+        return res
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = 'account.partial.reconcile'
+
+    def _get_dashboard_moves(self):
+        """Both reconciled moves: the other reconciliations of these moves do not change."""
+        return (self.debit_move_id | self.credit_move_id).move_id
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        partials._get_dashboard_moves()._mark_dashboard_cubes(counterparts=False)
+        return partials
+
+    def unlink(self):
+        self._get_dashboard_moves()._mark_dashboard_cubes(counterparts=False)
+        return super().unlink()
@@ -5,7 +5,7 @@ from dateutil.relativedelta import relativedelta
 
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
-from odoo.tools import date_utils, float_round
+from odoo.tools import date_utils
 import base64
 from io import BytesIO
 from odoo.tools.misc import xlsxwriter
@@ -14,8 +14,11 @@ _logger = logging.getLogger(__name__)
 
 class L1Dashboard(models.Model):
     _name = 'l1.dashboard'
+    _inherit = ['druksmart_dashboard.mixin']
     _description = 'L1 Dashboard Data'
 
+    DASHBOARD_FILTER_FIELDS = ('company_id', 'year', 'month', 'quarter', 'consolidated', 'sections')
+
     name = fields.Char(string='Dashboard Name', default='L1 Dashboard')
     month = fields.Selection([
         ('1', 'January'), ('2', 'February'), ('3', 'March'), ('4', 'April'),
@@ -32,6 +35,27 @@ class L1Dashboard(models.Model):
     
     company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
     currency_id = fields.Many2one('res.currency', related='company_id.currency_id')
+    consolidated = fields.Boolean(
+        string='Consolidated',
+        help='Merge all the selected companies, converted to the currency of the current company.')
+
+    sections = fields.Char(
+        string='Sections',
+        help='Comma-separated payload sections to compute, all of them when empty.')
+
+    CONSOLIDATION_UNSCALED_KEYS = frozenset({
+        'sales_order_count', 'gross_profit_margin', 'net_profit_margin',
+    })
+
+    # Payload sections (one per group of cards) and the computations they need
+    PAYLOAD_SECTIONS = {
+        'sales': ('sales', 'target'),
+        'revenue': ('financial',),
+        'expenses': ('financial',),
+        'cash_flow': ('cash_flow',),
+        'ttm': ('ttm',),
+        'companies': ('sales', 'target', 'financial', 'cash_flow'),
+    }
     
     def _get_year_selection(self):
         current_year = datetime.now().year
@@ -43,34 +67,44 @@ class L1Dashboard(models.Model):
         default=lambda self: str(fields.Date.today().year)
     )
 
-    @api.depends('year', 'month', 'company_id', "quarter")
+    @api.depends('year', 'month', 'company_id', "quarter", 'consolidated', 'sections')
     def _compute_dashboard_data(self):
+        # with ``dashboard_lazy`` (set by the dashboard action) the form only
+        # gets the filters: the widget fetches every section on its own
+        lazy = self.env.context.get('dashboard_lazy')
         for record in self:
-            record.dashboard_data = json.dumps(record._get_dashboard_data())
+            data = record.with_context(dashboard_sections=[])._get_dashboard_data() if lazy \
+                else record._get_dashboard_data()
+            record.dashboard_data = self._json_dumps(dict(data, lazy=bool(lazy)))
             record.last_update = fields.Datetime.now()
 
     @api.model
-    def get_dashboard_data_json(self, year=None, month=None, quarter=None):
-        """API method to get dashboard data in JSON format"""
+    def get_dashboard_data_json(self, year=None, month=None, quarter=None, consolidated=False, sections=None):
+        """API method to get dashboard data in JSON format
+
+        Args:
+            sections (list): Payload sections to compute (see ``PAYLOAD_SECTIONS``), all when empty
+        """
         if not year:
             year = fields.Date.today().year
-            
-        dashboard = self.search([
-            ('year', '=', year),
-            ('month', '=', month),
-            ('quarter', '=', quarter),
-            ('company_id', '=', self.env.company.id)
-        ], limit=1)
-        
-        if not dashboard:
-            dashboard = self.create({
-                'year': year,
-                'month': month,
-                'quarter': quarter,
-            })
-        
-        dashboard._compute_dashboard_data()
-        return dashboard.dashboard_data
+
+        return self._get_dashboard_snapshot({
+            'year': str(year),
+            'month': month or False,
+            'quarter': quarter or False,
+            'consolidated': bool(consolidated),
+            'sections': ','.join(sorted(set(sections))) if sections else False,
+        })
+
+    def _get_requested_sections(self):
+        """Payload sections to compute: ``dashboard_sections`` in context, else the ``sections`` field."""
+        requested = self.env.context.get('dashboard_sections')
+        if requested is None:
+            requested = [name.strip() for name in (self.sections or '').split(',') if name.strip()]
+            requested = requested or list(self.PAYLOAD_SECTIONS)
+        if not self.consolidated:
+            requested = [name for name in requested if name != 'companies']
+        return {name for name in requested if name in self.PAYLOAD_SECTIONS}
 
     def _get_dashboard_data(self):
         """Compute dashboard data **without** mutating year/month/quarter selections."""
@@ -107,27 +141,81 @@ class L1Dashboard(models.Model):
             end_date   = fields.Date.to_string(date_utils.end_of(datetime(sel_year, sel_month, 1), 'month'))
             month_for_label = str(sel_month)
 
-        sales_data      = self._get_sales_data(start_date, end_date)
-        financial_data  = self._get_financial_data(start_date, end_date)
-        cash_flow_data  = self._get_cash_flow_data(start_date, end_date)
+        perf = self._perf_start()
+        # the cards of every period are sums of the cells of the monthly cube
+        # (see ``druksmart_dashboard.monthly_cube``), so the year, quarter and
+        # month views share one computation; ledger sections of periods closed
+        # by the lock dates are also cached, but not the cash flow: payments
+        # of a closed period can still be matched with new invoices and bills
+        # only what the requested payload sections need is computed
+        requested = self._get_requested_sections()
+        needed = {name for section in requested for name in self.PAYLOAD_SECTIONS[section]}
+        sections = [section for section in [
+            ('sales', '_get_sales_cards', (start_date, end_date), True),
+            ('target', '_get_target_data', (start_date, end_date), True),
+            ('financial', '_get_closed_period_cached', ('_get_financial_cards', start_date, end_date), True),
+            ('cash_flow', '_get_cash_flow_cards', (start_date, end_date), True),
+            ('ttm', '_get_ttm_data', (end_date,), True),
+        ] if section[0] in needed]
+        company_data = []
+        if self.consolidated:
+            companies = self.env.companies
+            per_company = self._run_sections(sections, perf, companies=companies) if sections else {}
+            closing_date = min(fields.Date.to_date(end_date), fields.Date.context_today(self))
+            results, converted = self._consolidate(per_company, closing_date) if per_company else ({}, {})
+            if 'companies' in requested:
+                for company in companies:
+                    company_data.append(self._get_company_drilldown(company, converted[company.id]))
+            currency = self.env.company.currency_id
+            company_info = {
+                'name': _('Consolidated (%s companies)', len(companies)),
+                'currency': currency.symbol,
+                'country': False,
+            }
+        else:
+            results = self._run_sections(sections, perf)
+            currency = self.currency_id
+            company_info = {
+                'name': self.company_id.name,
+                'currency': self.currency_id.symbol,
+                'country': self.company_id.country_id.name,
+            }
+        if 'target' in results:
+            sales_data = dict(results['sales'], **results['target'])
+            sales_data['target_achievement'] = self._ratio(sales_data['sales_amount'], sales_data['sales_target'])
+        if 'financial' in results:
+            financial_data = dict(
+                results['financial'],
+                gross_profit_margin=self._ratio(results['financial']['gross_profit'], results['financial']['revenue']),
+                net_profit_margin=self._ratio(results['financial']['net_profit'], results['financial']['revenue']),
+            )
+        cash_flow_data = results.get('cash_flow')
 
-        return {
+        payload = {
             'filters': {
                 'year': sel_year,
                 'month': sel_month,
                 'month_name': dict(self._fields['month'].selection).get(month_for_label),
                 'quarter': sel_quarter,
             },
-            'company': {
-                'name': self.company_id.name,
-                'currency': self.currency_id.symbol,
-                'country': self.company_id.country_id.name,
-            },
-            'sales': {
+            'company': company_info,
+            'consolidated': bool(self.consolidated),
+            'sections': sorted(requested),
+            'schema': self.PAYLOAD_SCHEMA,
+            'format': self._get_payload_format(currency),
+        }
+        if 'companies' in requested:
+            payload['companies'] = company_data
+        if 'sales' in requested:
+            payload['sales'] = {
                 'order_count': sales_data['sales_order_count'],
-                'amount': self._format_amount(sales_data['sales_amount']),
-                'target': self._format_amount(sales_data['sales_target']),
-                'target_achievement': f"{float_round(sales_data['target_achievement'], 0)}%",
+                'amount': round(sales_data['sales_amount'], 2),
+                'target': round(sales_data['sales_target'], 2),
+                'target_achievement': sales_data['target_achievement'],
+                'run_rate': round(sales_data['run_rate'], 2),
+                'forecast': round(sales_data['forecast'], 2),
+                'year_target': round(sales_data['year_target'], 2),
+                'year_forecast': round(sales_data['year_forecast'], 2),
                 'region_wise': {
                     'data': [
                         {'name': 'Export', 'value': sales_data['export_sales']},
@@ -136,17 +224,18 @@ class L1Dashboard(models.Model):
                     'total': sales_data['sales_amount'],
                     'colors': ['#1e88e5', '#ff8f00'],
                 },
-            },
-            'revenue': {
-                'amount': self._format_amount(financial_data['revenue']),
-                'cost_of_revenue': self._format_amount(financial_data['cost_of_revenue']),
-                'gross_profit': self._format_amount(financial_data['gross_profit']),
-                'gross_profit_margin': f"{self._format_amount(financial_data['gross_profit_margin'])}%",
-                'expenses': self._format_amount(financial_data['expenses']),
-                'net_profit': self._format_amount(financial_data['net_profit']),
-                'net_profit_margin': f"{self._format_amount(financial_data['net_profit_margin'])}%",
-                'accounts_receivable': self._format_amount(financial_data['accounts_receivable']),
-                'accounts_payable': self._format_amount(financial_data['accounts_payable']),
+            }
+        if 'revenue' in requested:
+            payload['revenue'] = {
+                'amount': round(financial_data['revenue'], 2),
+                'cost_of_revenue': round(financial_data['cost_of_revenue'], 2),
+                'gross_profit': round(financial_data['gross_profit'], 2),
+                'gross_profit_margin': financial_data['gross_profit_margin'],
+                'expenses': round(financial_data['expenses'], 2),
+                'net_profit': round(financial_data['net_profit'], 2),
+                'net_profit_margin': financial_data['net_profit_margin'],
+                'accounts_receivable': round(financial_data['accounts_receivable'], 2),
+                'accounts_payable': round(financial_data['accounts_payable'], 2),
                 'region_wise': {
                     'data': [
                         {'name': 'Export', 'value': financial_data['export_revenue']},
@@ -155,9 +244,10 @@ class L1Dashboard(models.Model):
                     'total': financial_data['export_revenue'] + financial_data['local_revenue'],
                     'colors': ['#1e88e5', '#ff8f00'],
                 },
-            },
-            'expenses': {
-                'total': self._format_amount(financial_data['expenses']),
+            }
+        if 'expenses' in requested:
+            payload['expenses'] = {
+                'total': round(financial_data['expenses'], 2),
                 'region_wise': {
                     'data': [
                         {'name': 'Export', 'value': financial_data['export_expenses']},
@@ -166,10 +256,11 @@ class L1Dashboard(models.Model):
                     'total': financial_data['expenses'],
                     'colors': ['#1e88e5', '#ff8f00'],
                 },
-            },
-            'cash_flow': {
-                'inflows': self._format_amount(cash_flow_data['inflows']),
-                'outflows': self._format_amount(cash_flow_data['outflows']),
+            }
+        if 'cash_flow' in requested:
+            payload['cash_flow'] = {
+                'inflows': round(cash_flow_data['inflows'], 2),
+                'outflows': round(cash_flow_data['outflows'], 2),
                 'region_wise': {
                     'inflow':  [{'name': 'Export', 'value': cash_flow_data['export_inflow']},
                                 {'name': 'Local',  'value': cash_flow_data['local_inflow']}],
@@ -179,13 +270,41 @@ class L1Dashboard(models.Model):
                     'total_outflow': cash_flow_data['outflows'],
                     'colors': ['#ff8f00', '#1e88e5'],
                 },
-            },
+            }
+        if 'ttm' in requested:
+            payload['ttm'] = {
+                'sales': round(results['ttm']['sales'], 2),
+                'revenue': round(results['ttm']['revenue'], 2),
+                'expenses': round(results['ttm']['expenses'], 2),
+                'inflows': round(results['ttm']['inflows'], 2),
+                'outflows': round(results['ttm']['outflows'], 2),
+            }
+        return self._perf_finish(payload, perf)
+
+    @staticmethod
+    def _ratio(amount, base):
+        """``amount`` as a percentage of ``base``, 0 when there is no base."""
+        return round(amount / base * 100, 2) if base else 0.0
+
+    def _get_company_drilldown(self, company, results):
+        """Key figures of one company of a consolidated dashboard (already converted)."""
+        sales = results['sales']
+        financial = results['financial']
+        return {
+            'id': company.id,
+            'name': company.name,
+            'currency': company.currency_id.name,
+            'order_count': sales['sales_order_count'],
+            'sales': round(sales['sales_amount'], 2),
+            'target': round(results['target']['sales_target'], 2),
+            'target_achievement': self._ratio(sales['sales_amount'], results['target']['sales_target']),
+            'revenue': round(financial['revenue'], 2),
+            'expenses': round(financial['expenses'], 2),
+            'net_profit': round(financial['net_profit'], 2),
+            'inflows': round(results['cash_flow']['inflows'], 2),
+            'outflows': round(results['cash_flow']['outflows'], 2),
         }
 
-    def _format_amount(self, amount):
-        """Format amount to match the dashboard display format"""
-        return f"{float_round(round(amount, 2), 2):,.2f}"
-    
     def _get_sales_data(self, start_date, end_date):
         """Get sales related data for dashboard"""
         # Get company currency
@@ -210,11 +329,6 @@ class L1Dashboard(models.Model):
             )
             sales_amount += amount_in_company_currency
 
-        # sales_amount = sum(order.amount_total for order in sales_orders)
-        sales_target = self._get_yearly_sales_target()  # Ensure this returns a valid value
-        
-        target_achievement = (sales_amount / sales_target) * 100 if sales_target else 0
-        
         local_tag = self.env['project.tags'].search([('name', '=', 'Local')], limit=1)
         export_tag = self.env['project.tags'].search([('name', '=', 'Export')], limit=1)
 
@@ -302,11 +416,86 @@ class L1Dashboard(models.Model):
         return {
             'sales_order_count': sales_order_count,
             'sales_amount': sales_amount,
-            'sales_target': sales_target,
-            'target_achievement': target_achievement,
             'local_sales': local_sales_amount,
             'export_sales': export_sales_amount,
         }
+
+    def _get_cube_rollup(self, start_date, end_date):
+        """Monthly cube roll-up of the period (see ``druksmart_dashboard.monthly_cube``).
+
+        None while a year of the period was never built: the cards are then
+        computed directly, with the same definitions.
+        """
+        return self.env['druksmart_dashboard.monthly_cube']._get_built_rollup(
+            self.company_id or self.env.company, start_date, end_date)
+
+    def _get_sales_cards(self, start_date, end_date):
+        """Sales cards of the period, summed from the monthly cube."""
+        rollup = self._get_cube_rollup(start_date, end_date)
+        if rollup is None:
+            return self._get_sales_data(start_date, end_date)
+        return {
+            'sales_order_count': int(rollup['sales_orders']['total']),
+            'sales_amount': rollup['card_sales']['total'],
+            'local_sales': rollup['card_sales']['local'],
+            'export_sales': rollup['card_sales']['export'],
+        }
+
+    def _get_financial_cards(self, start_date, end_date):
+        """Revenue and expenses cards of the period, summed from the monthly cube."""
+        return self._get_financial_data(start_date, end_date, rollup=self._get_cube_rollup(start_date, end_date))
+
+    def _get_cash_flow_cards(self, start_date, end_date):
+        """Cash flow cards of the period, summed from the monthly cube."""
+        rollup = self._get_cube_rollup(start_date, end_date)
+        if rollup is None:
+            return self._get_cash_flow_data(start_date, end_date)
+        result = {
+            'local_inflow': rollup['card_cash_in']['local'],
+            'export_inflow': rollup['card_cash_in']['export'],
+            'local_outflow': rollup['card_cash_out']['local'],
+            'export_outflow': rollup['card_cash_out']['export'],
+        }
+        result['inflows'] = result['local_inflow'] + result['export_inflow']
+        result['outflows'] = result['local_outflow'] + result['export_outflow']
+        result['net_cash_flow'] = result['inflows'] - result['outflows']
+        return result
+
+    def _get_ttm_data(self, end_date):
+        """Totals of the twelve months ending with the period, with the definitions of the cards."""
+        end_date = fields.Date.to_date(end_date)
+        start_date = fields.Date.to_string(end_date.replace(day=1) - relativedelta(months=11))
+        end_date = fields.Date.to_string(end_date)
+        rollup = self._get_cube_rollup(start_date, end_date)
+        sales = self._get_sales_cards(start_date, end_date)
+        if rollup is None:
+            revenue = self.compute_untaxed_revenue(start_date, end_date)
+            expenses = self.compute_untaxed_expenses(start_date, end_date)
+        else:
+            revenue = rollup['card_revenue']['total']
+            expenses = max(rollup['card_expenses']['total'], 0.0)
+        cash_flow = self._get_cash_flow_cards(start_date, end_date)
+        return {
+            'sales': sales['sales_amount'],
+            'revenue': revenue,
+            'expenses': expenses,
+            'inflows': cash_flow['inflows'],
+            'outflows': cash_flow['outflows'],
+        }
+
+    def _get_target_data(self, start_date, end_date):
+        """Target of the selected period, phased from the yearly targets (see ``sale.target.cube``)."""
+        period_start = fields.Date.to_date(start_date)
+        period_end = fields.Date.to_date(end_date)
+        period_achievement = self.env['sale.target.cube']._get_period_achievement(
+            self.company_id or self.env.company, period_start.year, period_start.month, period_end.month)
+        return {
+            'sales_target': period_achievement['target'],
+            'run_rate': period_achievement['run_rate'],
+            'forecast': period_achievement['forecast'],
+            'year_target': period_achievement['year_target'],
+            'year_forecast': period_achievement['year_forecast'],
+        }
     
     def _get_yearly_sales_target(self):
         """Get the yearly sales target from configuration"""
@@ -318,13 +507,22 @@ class L1Dashboard(models.Model):
             return sum(sale_targets.mapped('target_amount'))
         return 0.0
     
-    def _get_financial_data(self, start_date, end_date):
-        """Get financial data for the dashboard"""
-        total_revenue = self.compute_untaxed_revenue(start_date, end_date)
-        
-        total_expenses = self.compute_untaxed_expenses(start_date, end_date)
+    def _get_financial_data(self, start_date, end_date, rollup=None):
+        """Get financial data for the dashboard
 
-        cost_of_revenue = self.calculate_cost_of_revenue(start_date, end_date)
+        Args:
+            rollup (dict): monthly cube roll-up of the period (see
+                ``_get_cube_rollup``) to take the period amounts from instead
+                of computing them
+        """
+        if rollup:
+            total_revenue = rollup['card_revenue']['total']
+            total_expenses = max(rollup['card_expenses']['total'], 0.0)
+            cost_of_revenue = rollup['card_cost']['total']
+        else:
+            total_revenue = self.compute_untaxed_revenue(start_date, end_date)
+            total_expenses = self.compute_untaxed_expenses(start_date, end_date)
+            cost_of_revenue = self.calculate_cost_of_revenue(start_date, end_date)
         
         gross_profit = total_revenue - cost_of_revenue
 
@@ -340,13 +538,24 @@ class L1Dashboard(models.Model):
         else:
             net_profit_margin = 0.0
 
-        # Calculate accounts receivable and payable
+        # Calculate accounts receivable and payable: balances at the end of
+        # the period, not sums of months, so never taken from the cube
         accounts_receivable = self.calculate_accounts_receivable(start_date, end_date)
         accounts_payable = self.calculate_accounts_payable(start_date, end_date)
 
         # Calculate revenue and expenses region-wise
-        revenue_region_wise = self.calculate_revenue_region_wise(start_date, end_date)
-        expenses_region_wise = self.calculate_expenses_region_wise(start_date, end_date)
+        if rollup:
+            revenue_region_wise = {
+                'local_revenue': rollup['card_revenue']['local'],
+                'export_revenue': rollup['card_revenue']['export'],
+            }
+            expenses_region_wise = {
+                'local_expense': round(rollup['card_expenses']['local'], 2),
+                'export_expense': round(rollup['card_expenses']['export'], 2),
+            }
+        else:
+            revenue_region_wise = self.calculate_revenue_region_wise(start_date, end_date)
+            expenses_region_wise = self.calculate_expenses_region_wise(start_date, end_date)
 
         return {
             'revenue': total_revenue,
@@ -376,6 +585,15 @@ class L1Dashboard(models.Model):
         Returns:
             float: Total expenses for the period
         """
+        total_expenses = self._get_expense_balance(start_date, end_date)
+        return total_expenses if total_expenses > 0 else 0.0
+
+    def _get_expense_balance(self, start_date, end_date):
+        """Balance of the expense accounts over the period, negative when refunds exceed the expenses.
+
+        Kept apart from ``compute_untaxed_expenses`` so the monthly cube can
+        sum the months before the card drops a negative total.
+        """
         # Convert string dates to datetime objects if needed
         if isinstance(start_date, str):
             start_date = fields.Date.from_string(start_date)
@@ -408,7 +626,7 @@ class L1Dashboard(models.Model):
             # check if total_expenses is not None
             if total_expenses is None:
                 total_expenses = 0.0
-            return total_expenses if total_expenses > 0 else 0.0
+            return total_expenses
         
         return 0.0
 
@@ -835,7 +1053,10 @@ class L1Dashboard(models.Model):
             ('payment_type', '=', 'inbound'),
             ('state', '=', 'posted'),
             ('date', '>=', start_date),
-            ('date', '<=', end_date)
+            ('date', '<=', end_date),
+            # what the record rules let users see, also when the monthly
+            # cube computes the month as superuser
+            ('company_id', 'in', self.env.companies.ids),
         ])
         
         for payment in customer_payments:
@@ -881,7 +1102,8 @@ class L1Dashboard(models.Model):
             ('payment_type', '=', 'outbound'),
             ('state', '=', 'posted'),
             ('date', '>=', start_date),
-            ('date', '<=', end_date)
+            ('date', '<=', end_date),
+            ('company_id', 'in', self.env.companies.ids),
         ])
         
         for payment in vendor_payments:
@@ -930,28 +1152,13 @@ class L1Dashboard(models.Model):
         return result
     
     def action_export_excel(self):
-        """Export dashboard data to Excel with charts in a single sheet."""
-        self.ensure_one()
+        """Export dashboard data to Excel with charts in a single sheet.
 
-        def _to_num(s):
-            """Convert formatted string to numeric value."""
-            if s is None:
-                return 0.0
-            if isinstance(s, (int, float)):
-                return float(s)
-            s = str(s).strip()
-            if s in ('-', ''):
-                return 0.0
-            s = s.replace(',', '')
-            if s.endswith('%'):
-                try:
-                    return float(s[:-1]) / 100.0
-                except Exception:
-                    return s
-            try:
-                return float(s)
-            except Exception:
-                return s
+        Payload amounts are numbers and percentages are percentage points, so
+        they are written as they are (percentages divided by 100 for the
+        percent format).
+        """
+        self.ensure_one()
 
         data = self._get_dashboard_data()
         
@@ -992,21 +1199,19 @@ class L1Dashboard(models.Model):
         row += 1
 
         ws.write(row, 0, 'Sales Orders', f_txt)
-        ws.write(row, 1, _to_num(data['sales']['order_count']), f_int)
+        ws.write(row, 1, data['sales']['order_count'], f_int)
         row += 1
 
         ws.write(row, 0, 'Sales Amount', f_txt)
-        ws.write(row, 1, _to_num(data['sales']['amount']), f_num)
+        ws.write(row, 1, data['sales']['amount'], f_num)
         row += 1
 
         ws.write(row, 0, 'Sales Target', f_txt)
-        ws.write(row, 1, _to_num(data['sales']['target']), f_num)
+        ws.write(row, 1, data['sales']['target'], f_num)
         row += 1
 
         ws.write(row, 0, 'Target Achievement', f_txt)
-        ta = _to_num(data['sales']['target_achievement'])
-        ws.write(row, 1, ta if isinstance(ta, float) else data['sales']['target_achievement'],
-                f_pct if isinstance(ta, float) else f_txt)
+        ws.write(row, 1, data['sales']['target_achievement'] / 100.0, f_pct)
         row += 2
 
         # ========== SALES BY REGION (Data + Chart) ==========
@@ -1020,7 +1225,7 @@ class L1Dashboard(models.Model):
         sales_region_data_start = row
         for item in data['sales']['region_wise']['data']:
             ws.write(row, 0, item['name'], f_txt)
-            ws.write(row, 1, _to_num(item['value']), f_num)
+            ws.write(row, 1, item['value'], f_num)
             row += 1
         sales_region_data_end = row - 1
 
@@ -1059,12 +1264,10 @@ class L1Dashboard(models.Model):
 
         for label, value in financial_metrics:
             ws.write(row, 0, label, f_txt)
-            num_val = _to_num(value)
             if 'Margin' in label:
-                ws.write(row, 1, num_val if isinstance(num_val, float) else value,
-                        f_pct if isinstance(num_val, float) else f_txt)
+                ws.write(row, 1, value / 100.0, f_pct)
             else:
-                ws.write(row, 1, num_val, f_num)
+                ws.write(row, 1, value, f_num)
             row += 1
         
         row += 1
@@ -1080,7 +1283,7 @@ class L1Dashboard(models.Model):
         revenue_region_data_start = row
         for item in data['revenue']['region_wise']['data']:
             ws.write(row, 0, item['name'], f_txt)
-            ws.write(row, 1, _to_num(item['value']), f_num)
+            ws.write(row, 1, item['value'], f_num)
             row += 1
         revenue_region_data_end = row - 1
 
@@ -1110,7 +1313,7 @@ class L1Dashboard(models.Model):
         expenses_region_data_start = row
         for item in data['expenses']['region_wise']['data']:
             ws.write(row, 0, item['name'], f_txt)
-            ws.write(row, 1, _to_num(item['value']), f_num)
+            ws.write(row, 1, item['value'], f_num)
             row += 1
         expenses_region_data_end = row - 1
 
@@ -1144,9 +1347,9 @@ class L1Dashboard(models.Model):
         local_in = next((x['value'] for x in data['cash_flow']['region_wise']['inflow'] if x['name'] == 'Local'), 0.0)
         
         ws.write(row, 0, 'Inflow', f_txt)
-        ws.write(row, 1, _to_num(export_in), f_num)
-        ws.write(row, 2, _to_num(local_in), f_num)
-        ws.write(row, 3, _to_num(export_in) + _to_num(local_in), f_num)
+        ws.write(row, 1, export_in, f_num)
+        ws.write(row, 2, local_in, f_num)
+        ws.write(row, 3, export_in + local_in, f_num)
         row += 1
 
         # Outflow
@@ -1154,18 +1357,18 @@ class L1Dashboard(models.Model):
         local_out = next((x['value'] for x in data['cash_flow']['region_wise']['outflow'] if x['name'] == 'Local'), 0.0)
         
         ws.write(row, 0, 'Outflow', f_txt)
-        ws.write(row, 1, _to_num(export_out), f_num)
-        ws.write(row, 2, _to_num(local_out), f_num)
-        ws.write(row, 3, _to_num(export_out) + _to_num(local_out), f_num)
+        ws.write(row, 1, export_out, f_num)
+        ws.write(row, 2, local_out, f_num)
+        ws.write(row, 3, export_out + local_out, f_num)
         row += 1
         
         cashflow_data_end = row - 1
 
         # Net Cash Flow
         ws.write(row, 0, 'Net Cash Flow', f_txt)
-        ws.write(row, 1, _to_num(export_in) - _to_num(export_out), f_num)
-        ws.write(row, 2, _to_num(local_in) - _to_num(local_out), f_num)
-        ws.write(row, 3, (_to_num(export_in) + _to_num(local_in)) - (_to_num(export_out) + _to_num(local_out)), f_num)
+        ws.write(row, 1, export_in - export_out, f_num)
+        ws.write(row, 2, local_in - local_out, f_num)
+        ws.write(row, 3, (export_in + local_in) - (export_out + local_out), f_num)
 
         # Cash Flow Column Chart
         cashflow_chart = wb.add_chart({'type': 'column'})
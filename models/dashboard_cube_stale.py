@@ -0,0 +1,101 @@
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class DashboardCubeStale(models.Model):
+    """Months of a roll-up cube that no longer match their documents.
+
+    The documents a cube is built from mark the months they touch when they
+    are created, written or deleted (see the ``_get_dashboard_cube_months``
+    hooks), before and after the change: an order moved to another month
+    marks both months. ``_cron_refresh`` rebuilds the marked months in the
+    background, so reading a cube never refreshes it. Month 0 stands for the
+    whole year, e.g. when the project classification changes.
+
+    A month is marked once per transaction (``INSERT ... ON CONFLICT DO
+    NOTHING`` on the cube, company, year, month and writing transaction):
+    the many writes of one posting or confirmation add a single row. Marks
+    of different transactions are not merged, the cron groups them: a
+    transaction finding the mark of another one would rely on a row the
+    cron may consume before its own changes are committed, and its month
+    would never be rebuilt. The cron deletes the rows it read, so a mark
+    committed while a month is being rebuilt is kept for the next run.
+    """
+    _name = 'druksmart_dashboard.cube_stale'
+    _description = 'Stale Dashboard Cube Month'
+    _log_access = False
+
+    cube = fields.Char(string='Cube', required=True, help='Model name of the cube.')
+    company_id = fields.Many2one('res.company', string='Company', required=True, ondelete='cascade')
+    year = fields.Integer(string='Year', required=True)
+    month = fields.Integer(string='Month', required=True, help='0 for the whole year.')
+    xact = fields.Char(string='Transaction', required=True, help='Id of the transaction that marked the month.')
+
+    _sql_constraints = [
+        ('unique_stale_mark', 'UNIQUE(cube, company_id, year, month, xact)',
+         'A month is only marked once per transaction!'),
+    ]
+
+    @api.model
+    def _mark(self, cubes, months):
+        """Mark ``months``, ``(company id, year, month)`` tuples, stale in every cube of ``cubes``."""
+        rows = [(cube,) + key for cube in cubes for key in set(months) if key[0]]
+        if not rows:
+            return
+        self.env.cr.execute("""
+            INSERT INTO druksmart_dashboard_cube_stale (cube, company_id, year, month, xact)
+            SELECT *, txid_current()::varchar FROM unnest(%s::varchar[], %s::int[], %s::int[], %s::int[])
+                ON CONFLICT DO NOTHING
+        """, [list(column) for column in zip(*rows)])
+
+    @api.model
+    def _mark_all(self, cubes):
+        """Mark every year already built in ``cubes`` for a full rebuild."""
+        for cube in cubes:
+            self.env[cube].flush_model()
+            self.env.cr.execute("""
+                INSERT INTO druksmart_dashboard_cube_stale (cube, company_id, year, month, xact)
+                SELECT DISTINCT %s, company_id, year, 0, txid_current()::varchar FROM {table}
+                    ON CONFLICT DO NOTHING
+            """.format(table=self.env[cube]._table), (cube,))
+
+    @api.model
+    def _request_build(self, cube, company, year):
+        """Ask the cron to build a year of ``cube`` that was never built.
+
+        Called from the read path: the mark is committed in its own cursor,
+        so the request itself stays read-only, and the cron is woken up.
+        """
+        with self.env.registry.cursor() as cr:
+            env = self.env(cr=cr, su=True)
+            cr.execute("""
+                INSERT INTO druksmart_dashboard_cube_stale (cube, company_id, year, month, xact)
+                SELECT %(cube)s, %(company_id)s, %(year)s, 0, txid_current()::varchar
+                 WHERE NOT EXISTS (SELECT 1 FROM druksmart_dashboard_cube_stale
+                                    WHERE cube = %(cube)s AND company_id = %(company_id)s
+                                      AND year = %(year)s AND month = 0)
+                    ON CONFLICT DO NOTHING
+            """, {'cube': cube, 'company_id': company.id, 'year': year})
+            if cr.rowcount:
+                env.ref('my_dashboard.ir_cron_dashboard_cube_refresh')._trigger()
+
+    @api.model
+    def _cron_refresh(self):
+        """Rebuild the marked months of every cube, one committed transaction per cube year."""
+        self.env.cr.execute("""
+            SELECT cube, company_id, year, array_agg(id), array_agg(DISTINCT month)
+              FROM druksmart_dashboard_cube_stale
+          GROUP BY cube, company_id, year
+          ORDER BY year DESC
+        """)
+        for cube, company_id, year, ids, months in self.env.cr.fetchall():
+            if cube not in self.env:
+                self.browse(ids).unlink()
+                continue
+            company = self.env['res.company'].browse(company_id)
+            self.env[cube].sudo()._refresh(company, year, None if 0 in months else sorted(months))
+            self.env.cr.execute("DELETE FROM druksmart_dashboard_cube_stale WHERE id = ANY(%s)", (ids,))
+            self.env.cr.commit()
@@ -0,0 +1,980 @@
+import gzip
+import hashlib
+import inspect
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+
+import psycopg2
+from werkzeug.exceptions import BadRequest, NotFound
+from werkzeug.http import parse_etags, quote_etag
+
+from odoo import api, fields, http, models, tools
+from odoo.http import request
+from odoo.tools import date_utils, str2bool
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_logger = logging.getLogger(__name__)
+
+# Token a client tags its data request with, to cancel it later
+REQUEST_TOKEN_RE = re.compile(r'^[0-9a-f]{16,32}$')
+
+
+class DashboardMixin(models.AbstractModel):
+    """Helpers shared by the dashboard models."""
+    _name = 'druksmart_dashboard.mixin'
+    _description = 'Dashboard Shared Helpers'
+
+    DEFAULT_SNAPSHOT_TTL = 60  # seconds a computed payload is reused
+    DEFAULT_PARALLEL_WORKERS = 4  # threads (and database connections) per request
+    DEFAULT_GZIP_THRESHOLD = 16 * 1024  # bytes above which transport responses are gzipped
+    MAX_BATCH_REQUESTS = 20  # dashboards computed by one ``/my_dashboard/batch`` request
+    # Version of the payload layout: since 2, amounts are numbers formatted by
+    # the widgets with the ``format`` descriptor of the payload
+    PAYLOAD_SCHEMA = 2
+    # Paths of the row lists (lists of dicts) of the payload that clients may
+    # ask to receive column-wise, e.g. ``(('sales_data', 'sales'),)``
+    COLUMNAR_ROWS = ()
+    # Numeric keys of section results that are not amounts (counts, ids,
+    # ratios): consolidation must not convert them to another currency.
+    CONSOLIDATION_UNSCALED_KEYS = frozenset()
+    # Transaction caches (see ``_get_region_index`` and ``_get_rate_table``)
+    # handed over to the cursors a request computes on, so every dashboard
+    # and section of the request builds them once
+    SHARED_CACHE_KEYS = ('druksmart_dashboard.region_index', 'druksmart_dashboard.rate_table')
+    # Fields of the filters the dashboard records are shared on (see
+    # ``_get_dashboard_record``): they get a unique index, so a record is
+    # only ever inserted once per filters
+    DASHBOARD_FILTER_FIELDS = ()
+
+    def init(self):
+        if self._abstract or not self.DASHBOARD_FILTER_FIELDS:
+            return
+        index_name = '%s_dashboard_filter_uniq' % self._table
+        try:
+            with self._cr.savepoint(flush=False):
+                tools.create_unique_index(self._cr, index_name, self._table, [
+                    "COALESCE(%s::text, '')" % name for name in self.DASHBOARD_FILTER_FIELDS])
+        except psycopg2.IntegrityError:
+            _logger.warning("Table %s holds duplicated dashboard records, the unique index %s is not created",
+                            self._table, index_name)
+
+    @api.model
+    def _get_region_index(self):
+        """Project classification used by every dashboard section.
+
+        Projects are classified by their 'Local'/'Export' tag and, for the
+        target cube, by a tag named after one of the sale target types
+        (SAP, Odoo, ITES). The index is built once per transaction and kept on
+        the cursor cache, so sections and dashboards computed in the same
+        request share it.
+
+        Returns:
+            dict: {
+                'local_tag', 'export_tag': project.tags ids (or False),
+                'local_project_ids', 'export_project_ids': sets of project ids,
+                'aa_to_project_id': {analytic account id: project id},
+                'project_names': {project id: name},
+                'project_types': {project id: sale.target type},
+            }
+        """
+        cache_key = 'druksmart_dashboard.region_index'
+        index = self.env.cr.cache.get(cache_key)
+        if index is not None:
+            return index
+
+        Tag = self.env['project.tags']
+        local_tag = Tag.search([('name', '=', 'Local')], limit=1)
+        export_tag = Tag.search([('name', '=', 'Export')], limit=1)
+
+        Project = self.env['project.project']
+        local_projects = Project.search([('tag_ids', 'in', [local_tag.id])]) if local_tag else Project
+        export_projects = Project.search([('tag_ids', 'in', [export_tag.id])]) if export_tag else Project
+        projects = local_projects | export_projects
+
+        type_by_label = {
+            label.lower(): value
+            for value, label in self.env['sale.target']._fields['type'].selection
+        }
+        project_types = {}
+        for project in projects:
+            for tag in project.tag_ids:
+                target_type = type_by_label.get((tag.name or '').strip().lower())
+                if target_type:
+                    project_types[project.id] = target_type
+                    break
+
+        index = {
+            'local_tag': local_tag.id,
+            'export_tag': export_tag.id,
+            'local_project_ids': set(local_projects.ids),
+            'export_project_ids': set(export_projects.ids),
+            'aa_to_project_id': {
+                project.analytic_account_id.id: project.id
+                for project in projects if project.analytic_account_id
+            },
+            'project_names': {project.id: project.name for project in projects},
+            'project_types': project_types,
+        }
+        self.env.cr.cache[cache_key] = index
+        return index
+
+    # ------------------------------------------------------------------
+    # Performance instrumentation
+    # ------------------------------------------------------------------
+    def _perf_start(self):
+        """Start collecting section timings for one ``_get_dashboard_data`` call."""
+        return {
+            'started': time.perf_counter(),
+            'queries': self.env.cr.sql_log_count,
+            'sections': {},
+        }
+
+    @contextmanager
+    def _perf_section(self, name, perf):
+        """Record wall time, SQL query count and rows fetched of the wrapped block.
+
+        Rows are counted by wrapping ``cr.execute`` for the duration of the
+        section; nested sections are counted in their parents as well.
+        """
+        cr = self.env.cr
+        stats = {'rows': 0}
+        previous = cr.__dict__.get('execute')
+        execute = cr.execute
+
+        def counting_execute(query, params=None, log_exceptions=True):
+            res = execute(query, params, log_exceptions)
+            if cr.description is not None and cr.rowcount > 0:
+                stats['rows'] += cr.rowcount
+            return res
+
+        cr.execute = counting_execute
+        queries = cr.sql_log_count
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if previous is None:
+                del cr.execute
+            else:
+                cr.execute = previous
+            perf['sections'][name] = {
+                'wall_ms': round((time.perf_counter() - started) * 1000, 2),
+                'queries': cr.sql_log_count - queries,
+                'rows': stats['rows'],
+            }
+
+    # ------------------------------------------------------------------
+    # Section execution
+    # ------------------------------------------------------------------
+    @classmethod
+    def _share_cursor_cache(cls, source, target):
+        """Copy the ``SHARED_CACHE_KEYS`` entries of cursor ``source`` to cursor ``target``."""
+        target.cache.update({key: source.cache[key] for key in cls.SHARED_CACHE_KEYS if key in source.cache})
+
+    def _use_parallel_sections(self, param='my_dashboard.parallel_sections', default=False):
+        """Whether sections run in a thread pool: ``dashboard_parallel`` in context, else ``param``."""
+        if 'dashboard_parallel' in self.env.context:
+            return bool(self.env.context['dashboard_parallel'])
+        if self.env.registry.in_test_mode():
+            return False
+        return str2bool(self.env['ir.config_parameter'].sudo().get_param(param, str(default)), default=default)
+
+    def _get_parallel_workers(self):
+        param = self.env['ir.config_parameter'].sudo().get_param(
+            'my_dashboard.parallel_workers', self.DEFAULT_PARALLEL_WORKERS)
+        try:
+            return max(int(param), 1)
+        except (TypeError, ValueError):
+            return self.DEFAULT_PARALLEL_WORKERS
+
+    def _get_section_record(self, env, values, company):
+        """In-memory copy of the record in ``env``, bound to ``company`` when given.
+
+        The copy is built from the stored values because the record may not
+        be committed yet, and other cursors would not see it. A company copy
+        only allows that company, so record rules keep unfiltered searches
+        from counting the other companies' documents.
+        """
+        Dashboard = env[self._name]
+        if company:
+            Dashboard = Dashboard.with_context(allowed_company_ids=[company.id])
+            if 'company_id' in self._fields:
+                values = dict(values, company_id=company.id)
+        return Dashboard.new(values)
+
+    def _run_sections(self, sections, perf, companies=None):
+        """Compute dashboard sections and return ``{name: result}``.
+
+        Args:
+            sections (list): ``(name, method_name, args, read_only)`` tuples;
+                ``read_only`` sections do not write to the database.
+            perf (dict): collector returned by ``_perf_start``.
+            companies (res.company): compute every section once per company
+                instead, and return ``{company_id: {name: result}}``.
+
+        In parallel mode the read-only sections run in a bounded thread pool,
+        each thread on its own read-only cursor importing the snapshot of the
+        current transaction (``pg_export_snapshot``). An imported snapshot
+        does not see the uncommitted writes of the transaction that exported
+        it, so the sections only run in parallel while the current
+        transaction has not written anything yet, and sequentially otherwise.
+        Sections that write (e.g. refreshing a cache table) run in the
+        calling thread meanwhile. Parallel mode is opt-in for sections
+        (``my_dashboard.parallel_sections``) and opt-out for companies
+        (``my_dashboard.parallel_companies``).
+        """
+        self.ensure_one()
+        if companies is None:
+            tasks = [(name, None, method, args, read_only) for name, method, args, read_only in sections]
+            parallel_mode = self._use_parallel_sections()
+        else:
+            tasks = [
+                ('%s:%s' % (name, company.id), company, method, args, read_only)
+                for company in companies for name, method, args, read_only in sections
+            ]
+            parallel_mode = len(companies) > 1 and self._use_parallel_sections(
+                'my_dashboard.parallel_companies', default=True)
+
+        values = self._convert_to_write({
+            name: self[name] for name, field in self._fields.items()
+            if field.store and not field.compute and name not in models.MAGIC_COLUMNS
+        })
+
+        def run_local(key, company, method, args):
+            record = self._get_section_record(self.env, values, company) if company else self
+            with self._perf_section(key, perf):
+                return getattr(record, method)(*args)
+
+        parallel = [task for task in tasks if task[4]] if parallel_mode else []
+        if len(parallel) > 1:
+            self.env.flush_all()
+            # the other cursors would not see what this transaction wrote
+            self.env.cr.execute('SELECT txid_current_if_assigned()')
+            if self.env.cr.fetchone()[0] is not None:
+                parallel = []
+        results = {}
+        if len(parallel) < 2:
+            for key, company, method, args, _read_only in tasks:
+                results[key] = run_local(key, company, method, args)
+        else:
+            self.env.cr.execute('SELECT pg_export_snapshot()')
+            snapshot_id = self.env.cr.fetchone()[0]
+            registry, uid, context, su = self.env.registry, self.env.uid, self.env.context, self.env.su
+            source_cr = self.env.cr
+
+            def run_thread(key, company, method, args):
+                with registry.cursor() as cr:
+                    cr.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+                    cr.execute('SET TRANSACTION SNAPSHOT %s', (snapshot_id,))
+                    self._set_request_label(cr)
+                    self._share_cursor_cache(source_cr, cr)
+                    record = self._get_section_record(api.Environment(cr, uid, context, su=su), values, company)
+                    section_perf = {'sections': {}}
+                    try:
+                        with record._perf_section(key, section_perf):
+                            result = getattr(record, method)(*args)
+                    finally:
+                        cr.rollback()
+                    return result, section_perf['sections'][key]
+
+            with ThreadPoolExecutor(max_workers=min(self._get_parallel_workers(), len(parallel)),
+                                    thread_name_prefix='dashboard') as executor:
+                futures = {
+                    key: executor.submit(run_thread, key, company, method, args)
+                    for key, company, method, args, _read_only in parallel
+                }
+                for key, company, method, args, read_only in tasks:
+                    if not read_only:
+                        results[key] = run_local(key, company, method, args)
+                for key, future in futures.items():
+                    results[key], perf['sections'][key] = future.result()
+                    perf['sections'][key]['parallel'] = True
+
+        if companies is None:
+            return results
+        return {
+            company.id: {name: results['%s:%s' % (name, company.id)] for name, _method, _args, _ro in sections}
+            for company in companies
+        }
+
+    # ------------------------------------------------------------------
+    # Closed period cache
+    # ------------------------------------------------------------------
+    def _get_classification_fingerprint(self):
+        """Digest of the Local/Export project classification the figures depend on."""
+        index = self._get_region_index()
+        payload = json.dumps([
+            sorted(index['local_project_ids']),
+            sorted(index['export_project_ids']),
+            sorted(index['aa_to_project_id'].items()),
+            sorted(index['project_names'].items()),
+        ])
+        return hashlib.md5(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _month_start(year, month):
+        """First day of ``month`` of ``year``; month 13 is January of the next year."""
+        return fields.Date.to_string(date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1))
+
+    def _month_slice(self, value, index):
+        """Part of a yearly section result belonging to month ``index`` (0-based).
+
+        Twelve-item lists hold one entry per month; other values (year totals)
+        are left out and must be recomputed by the caller.
+        """
+        if isinstance(value, dict):
+            result = {}
+            for key, item in value.items():
+                part = self._month_slice(item, index)
+                if part is not None:
+                    result[key] = part
+            return result
+        if isinstance(value, list) and len(value) == 12:
+            return value[index]
+        return None
+
+    def _apply_month_slice(self, value, part, index):
+        """Write a slice made by ``_month_slice`` back into month ``index`` of ``value``."""
+        for key, item in part.items():
+            if isinstance(value.get(key), dict):
+                self._apply_month_slice(value[key], item, index)
+            elif isinstance(value.get(key), list) and len(value[key]) == 12:
+                value[key][index] = item
+
+    def _get_closed_months_cached(self, method, year):
+        """Monthly section ``method(year, month_from=1)`` with the closed months taken from the period cache.
+
+        When every month closed by the lock date is cached, only the open
+        months are computed and the cached ones are merged in; otherwise the
+        whole year is computed and the closed months are stored. Year totals
+        of the result are not refreshed.
+        """
+        Cache = self.env['druksmart_dashboard.period_cache'].sudo()
+        company = self.env.company
+        closed = Cache._get_closed_months(company, year) if Cache._is_enabled() else 0
+        if not closed:
+            return getattr(self, method)(year)
+
+        metric = '%s.%s' % (self._name, method)
+        fingerprint = self._get_classification_fingerprint()
+        periods = ['%04d-%02d' % (year, month) for month in range(1, closed + 1)]
+        cached = Cache._fetch(company, metric, periods, fingerprint)
+        if len(cached) == len(periods):
+            result = getattr(self, method)(year, month_from=closed + 1)
+            for index, period in enumerate(periods):
+                self._apply_month_slice(result, cached[period], index)
+            return result
+
+        result = getattr(self, method)(year)
+        Cache._store(company, metric, {
+            period: (date_utils.end_of(date(year, index + 1, 1), 'month'), self._month_slice(result, index))
+            for index, period in enumerate(periods)
+        }, fingerprint)
+        return result
+
+    def _get_closed_period_cached(self, method, start_date, end_date):
+        """Section ``method(start_date, end_date)``, kept in the period cache once the whole period is closed."""
+        Cache = self.env['druksmart_dashboard.period_cache'].sudo()
+        company = self.env.company
+        if not (Cache._is_enabled() and Cache._is_closed(company, end_date)):
+            return getattr(self, method)(start_date, end_date)
+
+        metric = '%s.%s' % (self._name, method)
+        period = '%s/%s' % (start_date, end_date)
+        fingerprint = self._get_classification_fingerprint()
+        cached = Cache._fetch(company, metric, [period], fingerprint)
+        if period in cached:
+            return cached[period]
+        result = getattr(self, method)(start_date, end_date)
+        Cache._store(company, metric, {period: (fields.Date.to_date(end_date), result)}, fingerprint)
+        return result
+
+    # ------------------------------------------------------------------
+    # Multi-company consolidation
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_rate_table(self, currencies, dates):
+        """Rates of ``currencies`` at every date of ``dates`` in a single query.
+
+        Rates follow ``res.currency._get_rates`` for the current company (its
+        own rates first, then shared ones) and are cached for the transaction.
+
+        Returns:
+            dict: ``{(currency_id, date): rate}``
+        """
+        company_id = self.env.company.id
+        table = self.env.cr.cache.setdefault('druksmart_dashboard.rate_table', {})
+        wanted = [(currency_id, day) for currency_id in set(currencies.ids) for day in set(dates)]
+        if any((company_id,) + key not in table for key in wanted):
+            self.env['res.currency.rate'].flush_model(['rate', 'name', 'currency_id', 'company_id'])
+            self.env.cr.execute("""
+                SELECT c.id, d.day::date,
+                       COALESCE((SELECT r.rate FROM res_currency_rate r
+                                  WHERE r.currency_id = c.id AND r.name <= d.day
+                                    AND (r.company_id IS NULL OR r.company_id = %(company_id)s)
+                               ORDER BY r.company_id, r.name DESC
+                                  LIMIT 1), 1.0)
+                  FROM res_currency c
+            CROSS JOIN unnest(%(dates)s::date[]) AS d(day)
+                 WHERE c.id IN %(currency_ids)s
+            """, {
+                'company_id': company_id,
+                'dates': sorted(set(dates)),
+                'currency_ids': tuple(set(currencies.ids)),
+            })
+            for currency_id, day, rate in self.env.cr.fetchall():
+                table[(company_id, currency_id, day)] = rate
+        return {key: table[(company_id,) + key] for key in wanted}
+
+    def _scale_amounts(self, value, factor, key=None):
+        """Multiply every amount of a section result by ``factor``."""
+        if isinstance(value, dict):
+            return {k: self._scale_amounts(v, factor, k) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._scale_amounts(v, factor, key) for v in value]
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and key not in self.CONSOLIDATION_UNSCALED_KEYS:
+            return value * factor
+        return value
+
+    def _merge_amounts(self, left, right):
+        """Sum two section results of the same shape.
+
+        Numbers are added, lists of numbers element-wise and lists of records
+        (e.g. per-project breakdowns) concatenated; anything else (labels)
+        is taken from ``left``.
+        """
+        if isinstance(left, dict) and isinstance(right, dict):
+            merged = dict(right, **left)
+            for k in left.keys() & right.keys():
+                merged[k] = self._merge_amounts(left[k], right[k])
+            return merged
+        if isinstance(left, list) and isinstance(right, list):
+            if all(isinstance(v, dict) for v in left + right):
+                return left + right
+            return [self._merge_amounts(a, b) for a, b in zip(left, right)]
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)) and not isinstance(left, bool):
+            return left + right
+        return left
+
+    def _consolidate(self, per_company, date):
+        """Convert per-company section results to the current company currency and sum them.
+
+        Args:
+            per_company (dict): ``{company_id: {name: result}}`` as returned by
+                ``_run_sections(..., companies=...)``.
+            date (date): closing date whose rates are applied to every amount.
+
+        Returns:
+            tuple: the merged ``{name: result}`` and the converted
+            ``{company_id: {name: result}}`` used for drill-downs.
+        """
+        companies = self.env['res.company'].browse(list(per_company))
+        currency = self.env.company.currency_id
+        rates = self._get_rate_table(companies.currency_id | currency, [date])
+        converted = {}
+        for company in companies:
+            factor = rates[(currency.id, date)] / rates[(company.currency_id.id, date)]
+            converted[company.id] = self._scale_amounts(per_company[company.id], factor)
+        merged = {}
+        for sections in converted.values():
+            merged = self._merge_amounts(merged, sections) if merged else sections
+        return merged, converted
+
+    def _perf_finish(self, payload, perf):
+        """Log the collected timings and, in debug mode, return them in ``_perf``."""
+        report = {
+            'model': self._name,
+            'record_id': self.id,
+            'filters': payload.get('filters') or payload.get('filter'),
+            'wall_ms': round((time.perf_counter() - perf['started']) * 1000, 2),
+            # sections computed in parallel ran on their own cursors
+            'queries': self.env.cr.sql_log_count - perf['queries'] + sum(
+                section['queries'] for section in perf['sections'].values() if section.get('parallel')),
+            'rows': sum(section['rows'] for section in perf['sections'].values()),
+            'sections': perf['sections'],
+        }
+        _logger.info("dashboard.perf %s", json.dumps(report, default=str))
+        if self.env.context.get('dashboard_snapshot'):
+            # snapshots are served again later: the report only goes with the
+            # response of the request that computed it
+            self.env.cr.cache['druksmart_dashboard.perf'] = report
+        elif self.user_has_groups('base.group_no_one'):
+            payload['_perf'] = report
+        return payload
+
+    # ------------------------------------------------------------------
+    # Payload schema
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_payload_format(self, currency, currencies=None):
+        """Format descriptor sent with a payload whose amounts are plain numbers.
+
+        Amounts are in ``currency`` unless their row names one of
+        ``currencies``; the widgets format them with the symbol, symbol
+        position and decimal places given here.
+
+        Returns:
+            dict: {'currency': code, 'currencies': {code: {'symbol', 'position', 'digits'}}}
+        """
+        currencies = currency | (currencies or currency.browse())
+        return {
+            'currency': currency.name,
+            'currencies': {
+                cur.name: {'symbol': cur.symbol or '', 'position': cur.position, 'digits': cur.decimal_places}
+                for cur in currencies
+            },
+        }
+
+    @staticmethod
+    def _encode_rows(rows):
+        """Column-wise form of a list of dicts.
+
+        Each field becomes one array of values, so the keys are sent once
+        instead of once per row. String columns with few distinct values
+        (regions, tags, statuses) are dictionary-encoded: the column holds
+        indexes into ``dictionaries[field]``. Fields missing from a row are
+        sent as null.
+
+        Returns:
+            dict: {'columnar': 1, 'length', 'fields', 'values': {field: [...]},
+            'dictionaries': {field: [...]}}, or ``rows`` itself when it is not
+            a list of dicts.
+        """
+        if not rows or not all(isinstance(row, dict) for row in rows):
+            return rows
+        fields = list(dict.fromkeys(key for row in rows for key in row))
+        values, dictionaries = {}, {}
+        for field in fields:
+            column = [row.get(field) for row in rows]
+            if all(value is None or isinstance(value, str) for value in column):
+                codes = {}
+                encoded = [codes.setdefault(value, len(codes)) for value in column]
+                if len(codes) * 2 <= len(column):
+                    values[field] = encoded
+                    dictionaries[field] = list(codes)
+                    continue
+            values[field] = column
+        return {
+            'columnar': 1,
+            'length': len(rows),
+            'fields': fields,
+            'values': values,
+            'dictionaries': dictionaries,
+        }
+
+    @api.model
+    def _encode_columnar(self, payload):
+        """Return ``payload`` with the row lists of ``COLUMNAR_ROWS`` encoded column-wise."""
+        for path in self.COLUMNAR_ROWS:
+            parent = payload
+            for key in path[:-1]:
+                parent = parent.get(key) if isinstance(parent, dict) else None
+            if isinstance(parent, dict) and isinstance(parent.get(path[-1]), list):
+                parent[path[-1]] = self._encode_rows(parent[path[-1]])
+        return payload
+
+    # ------------------------------------------------------------------
+    # Request cancellation
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_request_label(self, token):
+        """``application_name`` of the connections working for request ``token`` of the current user."""
+        return 'my_dashboard/%s/%s' % (self.env.uid, token)
+
+    def _set_request_label(self, cr):
+        """Tag the current transaction of ``cr`` with the ``dashboard_request_token`` of the context.
+
+        The label is transaction-local (``set_config(..., true)``), so pooled
+        connections do not keep it once the transaction ends.
+        """
+        token = self.env.context.get('dashboard_request_token')
+        if token:
+            cr.execute("SELECT set_config('application_name', %s, true)", (self._get_request_label(token),))
+
+    @api.model
+    def _cancel_request(self, token):
+        """Cancel the statements running for request ``token`` of the current user.
+
+        Only the running statement is aborted (``pg_cancel_backend``); its
+        transaction then fails and is rolled back. Returns the number of
+        connections signalled.
+        """
+        self.env.cr.execute("""
+            SELECT pg_cancel_backend(pid)
+              FROM pg_stat_activity
+             WHERE datname = current_database()
+               AND application_name = %s
+               AND pid <> pg_backend_pid()
+        """, (self._get_request_label(token),))
+        return len(self.env.cr.fetchall())
+
+    # ------------------------------------------------------------------
+    # Single-flight snapshots
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return str(value)
+
+    @api.model
+    def _json_loads(self, data):
+        """Parse a payload string, with orjson when it is installed."""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    @api.model
+    def _json_dumps(self, data):
+        """Serialize a payload to a JSON string, with orjson when it is installed.
+
+        orjson is several times faster than ``json`` on the large row lists of
+        L2 and the reports; values it does not know go through ``_json_default``
+        either way, so both encoders produce the same document.
+        """
+        if orjson is not None:
+            return orjson.dumps(data, default=self._json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(data, default=self._json_default)
+
+    @api.model
+    def _get_gzip_threshold(self):
+        param = self.env['ir.config_parameter'].sudo().get_param(
+            'my_dashboard.gzip_threshold', self.DEFAULT_GZIP_THRESHOLD)
+        try:
+            return max(int(param), 0)
+        except (TypeError, ValueError):
+            return self.DEFAULT_GZIP_THRESHOLD
+
+    @api.model
+    def _get_snapshot_key(self, vals):
+        """Key of the payload of the filters ``vals`` for the current access and companies.
+
+        Payloads depend on the access rights and record rules of the user and
+        on the allowed companies, so both are part of the key, e.g.
+        ``l2.dashboard|{"access": "9f2c...", "company_id": 1, "company_ids": [1], "year": "2024"}``:
+        users with the same groups share their payloads (see
+        ``_get_access_signature``).
+        """
+        scope = dict(vals, access=self._get_access_signature(), company_ids=sorted(self.env.companies.ids))
+        return '%s|%s' % (self._name, json.dumps(scope, sort_keys=True, default=str))
+
+    @api.model
+    def _get_access_signature(self):
+        """Signature of what the access rights and record rules of the user depend on.
+
+        Access rights and record rules are granted to groups, so users with the
+        same groups read the same records, unless one of their record rules
+        reads the user itself (e.g. ``[('user_id', '=', user.id)]``): the user
+        id is part of the signature then.
+        """
+        group_ids = sorted(self.env.user.groups_id.ids)
+        user_rules = self.env['ir.rule'].sudo().search_count([
+            ('domain_force', 'ilike', 'user.'),
+            '|', ('global', '=', True), ('groups', 'in', group_ids),
+        ], limit=1)
+        signature = json.dumps([group_ids, self.env.uid if user_rules else False])
+        return hashlib.blake2b(signature.encode(), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _get_lock_id(key):
+        """PostgreSQL advisory lock id of ``key``."""
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big', signed=True)
+
+    @api.model
+    def _get_snapshot_ttl(self):
+        if 'dashboard_snapshot_ttl' in self.env.context:
+            return self.env.context['dashboard_snapshot_ttl']
+        param = self.env['ir.config_parameter'].sudo().get_param(
+            'my_dashboard.snapshot_ttl', self.DEFAULT_SNAPSHOT_TTL)
+        try:
+            return max(int(param), 0)
+        except (TypeError, ValueError):
+            return self.DEFAULT_SNAPSHOT_TTL
+
+    @api.model
+    def _get_dashboard_record(self, vals):
+        """Dashboard record of the filters ``vals``, inserted if missing.
+
+        Records are shared by the users with the same filters. A transaction
+        advisory lock on the filters serialises the requests looking for the
+        same record, and the row is inserted with ``INSERT ... ON CONFLICT DO
+        NOTHING`` on the unique index of ``DASHBOARD_FILTER_FIELDS``, so a
+        record created concurrently elsewhere is never duplicated: the
+        conflict fails the transaction with a serialization error, and the
+        retried request finds the record.
+        """
+        key = '%s|%s' % (self._name, json.dumps(vals, sort_keys=True, default=str))
+        self.env.cr.execute('SELECT pg_advisory_xact_lock(%s)', (self._get_lock_id(key),))
+        Dashboard = self.with_context(active_test=False)
+        domain = [(name, '=', value) for name, value in vals.items()]
+        record = Dashboard.search(domain, limit=1)
+        if record:
+            return record
+
+        values = self._add_missing_default_values(dict(vals))
+        columns = {
+            name: self._fields[name].convert_to_column(value, self, values)
+            for name, value in values.items()
+            if self._fields[name].store and self._fields[name].column_type
+        }
+        columns.update(create_uid=self.env.uid, write_uid=self.env.uid)
+        names = list(columns)
+        self.env.cr.execute("""
+            INSERT INTO "{table}" ({columns}, create_date, write_date)
+            VALUES ({placeholders}, now() at time zone 'UTC', now() at time zone 'UTC')
+            ON CONFLICT DO NOTHING
+            RETURNING id
+        """.format(
+            table=self._table,
+            columns=', '.join('"%s"' % name for name in names),
+            placeholders=', '.join(['%s'] * len(names)),
+        ), [columns[name] for name in names])
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else Dashboard.search(domain, limit=1)
+
+    def _compute_snapshot_data(self):
+        """Compute the payload of the record through the model's own compute."""
+        self.ensure_one()
+        self._compute_dashboard_data()
+        return self.dashboard_data
+
+    def _store_snapshot(self, key):
+        """Compute the payload of the record and store it under ``key``.
+
+        Returns:
+            tuple: the payload and the perf report of its computation
+        """
+        self.ensure_one()
+        data = self.with_context(dashboard_snapshot=True)._compute_snapshot_data()
+        self.env['druksmart_dashboard.snapshot'].sudo()._write(key, self._name, data)
+        return data, self.env.cr.cache.pop('druksmart_dashboard.perf', None)
+
+    @api.model
+    def _get_dashboard_snapshot(self, vals):
+        """Single-flight computation of the dashboard of ``vals`` for the current user and companies.
+
+        Concurrent requests for the same key (see ``_get_snapshot_key``)
+        serialise on a PostgreSQL advisory lock: the first one computes and
+        stores the payload, the others wait for the lock and reuse the stored
+        result while it is younger than ``my_dashboard.snapshot_ttl`` seconds.
+
+        The work runs in its own transaction so the stored payload is
+        committed before the lock is released; waiters start a fresh
+        snapshot once they hold the lock, so they see it. Pass
+        ``dashboard_single_flight=False`` in the context (or run in test mode)
+        to compute in the current transaction instead, e.g. when the data of
+        interest is not committed yet. The ``SHARED_CACHE_KEYS`` caches go
+        back and forth between both transactions.
+        """
+        if self.env.context.get('dashboard_lazy'):
+            # snapshots always hold the full payload of their filters
+            return self.with_context(dashboard_lazy=False)._get_dashboard_snapshot(vals)
+        vals = dict(vals, company_id=self.env.company.id)
+        key = self._get_snapshot_key(vals)
+        ttl = self._get_snapshot_ttl()
+        report = None
+
+        if not self.env.context.get('dashboard_single_flight', True) or self.env.registry.in_test_mode():
+            self._set_request_label(self.env.cr)
+            data = self.env['druksmart_dashboard.snapshot'].sudo()._read(key, ttl)
+            if data is None:
+                data, report = self._get_dashboard_record(vals)._store_snapshot(key)
+            return self._add_perf_report(data, report)
+
+        with self.env.registry.cursor() as cr:
+            self._set_request_label(cr)
+            self._share_cursor_cache(self.env.cr, cr)
+            lock_id = self._get_lock_id(key)
+            cr.execute('SELECT pg_advisory_lock(%s)', (lock_id,))
+            try:
+                # Start a new transaction now that the lock is held, so the
+                # payload committed by the previous holder is visible.
+                cr.commit()
+                self._set_request_label(cr)
+                Dashboard = self.with_env(self.env(cr=cr))
+                data = Dashboard.env['druksmart_dashboard.snapshot'].sudo()._read(key, ttl)
+                if data is None:
+                    record = Dashboard._get_dashboard_record(vals)
+                    # releases the lock on the filters of the record
+                    cr.commit()
+                    self._set_request_label(cr)
+                    data, report = record._store_snapshot(key)
+                    cr.commit()
+                self._share_cursor_cache(cr, self.env.cr)
+            except Exception:
+                cr.rollback()
+                raise
+            finally:
+                cr.execute('SELECT pg_advisory_unlock(%s)', (lock_id,))
+        return self._add_perf_report(data, report)
+
+    @api.model
+    def _add_perf_report(self, data, report):
+        """Payload ``data`` with the perf ``report`` of its computation, in debug mode."""
+        if not report or not self.user_has_groups('base.group_no_one'):
+            return data
+        return self._json_dumps(dict(self._json_loads(data), _perf=report))
+
+
+class DashboardController(http.Controller):
+
+    def _read_body(self):
+        """JSON body of a transport request, once its CSRF token is checked."""
+        try:
+            body = json.loads(request.httprequest.get_data() or b'{}')
+        except ValueError:
+            raise BadRequest('Invalid JSON body')
+        if not request.validate_csrf(body.get('csrf_token')):
+            raise BadRequest('Session expired (invalid CSRF token)')
+        return body
+
+    def _get_dashboard_model(self, model, token=None):
+        """Dashboard model ``model`` in the request environment, or NotFound."""
+        if model not in request.env:
+            raise NotFound()
+        Dashboard = request.env[model].with_context(dashboard_lazy=False)
+        if token and REQUEST_TOKEN_RE.match(str(token)):
+            Dashboard = Dashboard.with_context(dashboard_request_token=token)
+        if not (hasattr(Dashboard, '_get_dashboard_snapshot') and hasattr(Dashboard, 'get_dashboard_data_json')):
+            raise NotFound()
+        Dashboard.check_access_rights('read')
+        return Dashboard
+
+    def _get_payload(self, Dashboard, kwargs, encoding=None, etags=()):
+        """Encoded ``Dashboard.get_dashboard_data_json(**kwargs)`` and its ETag.
+
+        The payload is None when the ETag is in ``etags``, parsed ETags of
+        the client (``werkzeug.datastructures.ETags``): the copy of the client
+        is current. The ETag is returned unquoted.
+        """
+        # only the arguments are the client's fault: errors of the
+        # computation itself propagate as they are
+        try:
+            inspect.signature(Dashboard.get_dashboard_data_json).bind(**kwargs)
+        except TypeError as e:
+            raise BadRequest(str(e))
+        data = Dashboard.get_dashboard_data_json(**kwargs)
+        payload = (data if isinstance(data, str) else Dashboard._json_dumps(data)).encode()
+        columnar = encoding == 'columnar' and bool(Dashboard.COLUMNAR_ROWS)
+        etag = hashlib.md5(payload).hexdigest() + ('-columnar' if columnar else '')
+        if etag in etags:
+            return None, etag
+        if columnar:
+            # encoded per response: snapshots keep the plain payload
+            payload = Dashboard._json_dumps(Dashboard._encode_columnar(Dashboard._json_loads(payload))).encode()
+        return payload, etag
+
+    def _make_json_response(self, payload, threshold):
+        """JSON response of ``payload``, gzipped above ``threshold`` bytes when the client accepts it."""
+        headers = [('Content-Type', 'application/json; charset=utf-8'), ('Vary', 'Accept-Encoding')]
+        if len(payload) > threshold and 'gzip' in request.httprequest.headers.get('Accept-Encoding', ''):
+            payload = gzip.compress(payload, compresslevel=5)
+            headers.append(('Content-Encoding', 'gzip'))
+        return request.make_response(payload, headers=headers)
+
+    @http.route('/my_dashboard/data/<string:model>', type='http', auth='user', methods=['POST'], csrf=False)
+    def get_dashboard_data(self, model):
+        """Return ``model.get_dashboard_data_json(**kwargs)`` as a plain JSON response.
+
+        Through JSON-RPC the stored payload string would be encoded a second
+        time inside the envelope and parsed twice by the browser. Here it is
+        sent as is and gzipped when it exceeds ``my_dashboard.gzip_threshold``
+        bytes. The request body is ``{"kwargs": {...}, "csrf_token": "...",
+        "request_token": "...", "encoding": "columnar"}``; the optional request
+        token lets the client cancel the computation through
+        ``/my_dashboard/cancel``, and ``encoding`` asks for the row lists of
+        the model's ``COLUMNAR_ROWS`` column-wise (see ``_encode_rows``).
+
+        The response carries an ``ETag`` digest of the payload. Clients keeping
+        a copy send it back in ``If-None-Match`` and get an empty ``304`` while
+        the payload is unchanged; with a fresh snapshot that costs a read of
+        the stored payload and nothing else.
+        """
+        body = self._read_body()
+        Dashboard = self._get_dashboard_model(model, body.get('request_token'))
+        # werkzeug only answers conditional GET/HEAD requests by itself
+        payload, etag = self._get_payload(
+            Dashboard, body.get('kwargs', {}), body.get('encoding'), request.httprequest.if_none_match)
+        if payload is None:
+            response = request.make_response(b'', status=304)
+        else:
+            response = self._make_json_response(payload, Dashboard._get_gzip_threshold())
+        response.set_etag(etag)
+        return response
+
+    @http.route('/my_dashboard/batch', type='http', auth='user', methods=['POST'], csrf=False)
+    def get_dashboard_batch(self):
+        """Return the payloads of several dashboards in one response.
+
+        The request body is ``{"requests": [{"model": "...", "filters": {...},
+        "sections": [...], "etag": "...", "encoding": "columnar"}, ...],
+        "csrf_token": "...", "request_token": "..."}``, at most
+        ``MAX_BATCH_REQUESTS`` requests. ``filters`` (and ``sections``, for
+        the models taking them) are the arguments of the model's
+        ``get_dashboard_data_json``; ``etag`` and ``encoding`` work as for
+        ``/my_dashboard/data``.
+
+        The dashboards are computed one after the other in the transaction of
+        this request (``dashboard_single_flight=False``), so they all read
+        the same snapshot of the database, share the ``SHARED_CACHE_KEYS``
+        caches (region index, rate table), and one request token cancels
+        them all. Stored payloads are still reused while fresh, but
+        concurrent batches do not wait for each other's computation. The
+        response is ``{"results": [...]}`` in the order of the requests,
+        each ``{"model", "etag", "data"}`` or ``{"model", "etag",
+        "not_modified": true}``. ETags are quoted as in the ``ETag`` header of
+        ``/my_dashboard/data``, so the clients can send back either one;
+        unquoted ones are accepted too.
+        """
+        body = self._read_body()
+        entries = body.get('requests')
+        Mixin = request.env['druksmart_dashboard.mixin']
+        if not isinstance(entries, list) or not all(
+                isinstance(entry, dict) and isinstance(entry.get('filters') or {}, dict) for entry in entries):
+            raise BadRequest('Invalid batch requests')
+        if len(entries) > Mixin.MAX_BATCH_REQUESTS:
+            raise BadRequest('Too many batch requests (%s at most)' % Mixin.MAX_BATCH_REQUESTS)
+
+        results = []
+        for entry in entries:
+            Dashboard = self._get_dashboard_model(str(entry.get('model')), body.get('request_token'))
+            Dashboard = Dashboard.with_context(dashboard_single_flight=False)
+            kwargs = dict(entry.get('filters') or {})
+            if entry.get('sections'):
+                kwargs['sections'] = entry['sections']
+            payload, etag = self._get_payload(
+                Dashboard, kwargs, entry.get('encoding'), parse_etags(str(entry.get('etag') or '')))
+            # payloads are already JSON: the response is assembled around them
+            head = '{"model": %s, "etag": %s' % (json.dumps(Dashboard._name), json.dumps(quote_etag(etag)))
+            if payload is None:
+                results.append(head.encode() + b', "not_modified": true}')
+            else:
+                results.append(head.encode() + b', "data": ' + payload + b'}')
+        return self._make_json_response(b'{"results": [' + b', '.join(results) + b']}', Mixin._get_gzip_threshold())
+
+    @http.route('/my_dashboard/cancel', type='http', auth='user', methods=['POST'], csrf=False)
+    def cancel_dashboard_request(self):
+        """Abort the running query of a data request the client gave up on.
+
+        Sent with ``navigator.sendBeacon`` when a newer filter selection
+        replaces a request or the page goes away; the body is
+        ``{"request_token": "...", "csrf_token": "..."}``.
+        """
+        body = self._read_body()
+        token = str(body.get('request_token') or '')
+        if not REQUEST_TOKEN_RE.match(token):
+            raise BadRequest('Invalid request token')
+        request.env['druksmart_dashboard.mixin']._cancel_request(token)
+        return request.make_response(b'', status=204)
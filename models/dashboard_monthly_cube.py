@@ -0,0 +1,440 @@
+import logging
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models, tools
+from odoo.tools import date_utils
+
+_logger = logging.getLogger(__name__)
+
+
+class DashboardMonthlyCube(models.Model):
+    """Monthly amounts per company, metric, region and project.
+
+    One cube per company and year holds every month of three families of
+    metrics, all in company currency:
+
+    - ledger metrics: sales (confirmed order lines), revenue (customer
+      invoice lines), expenses (vendor bill lines) and cash in/out
+      (payments, allocated to the invoice lines they reconcile), split along
+      the analytic distribution; lines without a Local/Export project land
+      in the ``other`` region without project. Revenue and expenses are the
+      balance of the invoice product lines times their analytic share,
+      refunds deducted; cash is the amount actually paid, spread over the
+      lines of the invoices each payment reconciles pro rata of their
+      balance. They feed the Reports TTM totals.
+    - L4 vendor metrics: the vendor bills of the month (``vendor_bills``)
+      and those of them already paid (``vendor_paid``), per project, as the
+      L4 "Vendor Invoice" and "Payment Made" columns define them.
+    - L1 card metrics (``card_*``): computed month by month with the card
+      computations of ``l1.dashboard`` themselves (``_get_sales_data``,
+      ``compute_untaxed_revenue``, ``calculate_revenue_region_wise``, ...),
+      so the cards of a month, a quarter or a year, and the
+      trailing-twelve-month block, are sums of cells equal to a direct
+      computation. The ``other`` region holds what the card total does not
+      split into Local and Export.
+
+    Year, quarter, month and trailing-twelve-month views are all sums of
+    cells (``_get_rollup``), so switching filters only re-sums in memory.
+    Reading never refreshes the cube: the documents mark the months they
+    change in ``druksmart_dashboard.cube_stale`` and a cron rebuilds them;
+    readers fall back to their direct computation for a year that was never
+    built (``_get_built_rollup``).
+    """
+    _name = 'druksmart_dashboard.monthly_cube'
+    _description = 'Dashboard Monthly Roll-up Cube'
+    _order = 'year, month, metric, region'
+
+    METRIC_SELECTION = [
+        ('sales', 'Sales'),
+        ('sales_orders', 'Sales Orders'),
+        ('revenue', 'Revenue'),
+        ('expenses', 'Expenses'),
+        ('cash_in', 'Cash In'),
+        ('cash_out', 'Cash Out'),
+        ('vendor_bills', 'Vendor Bills'),
+        ('vendor_paid', 'Paid Vendor Bills'),
+        ('card_sales', 'Sales (L1)'),
+        ('card_revenue', 'Revenue (L1)'),
+        ('card_expenses', 'Expenses (L1)'),
+        ('card_cost', 'Cost of Revenue (L1)'),
+        ('card_cash_in', 'Cash In (L1)'),
+        ('card_cash_out', 'Cash Out (L1)'),
+    ]
+    REGIONS = ('local', 'export', 'other')
+
+    company_id = fields.Many2one('res.company', string='Company', required=True, index=True, ondelete='cascade')
+    currency_id = fields.Many2one('res.currency', related='company_id.currency_id')
+    year = fields.Integer(string='Year', required=True, index=True)
+    month = fields.Integer(string='Month', required=True)
+    metric = fields.Selection(METRIC_SELECTION, string='Metric', required=True)
+    region = fields.Selection([
+        ('local', 'Local'),
+        ('export', 'Export'),
+        ('other', 'Other'),
+    ], string='Region', required=True)
+    project_id = fields.Many2one('project.project', string='Project', ondelete='set null')
+    amount = fields.Float(string='Amount', help='Amount in company currency, or number of orders for Sales Orders.')
+
+    def init(self):
+        # One cell per key: requests refreshing the same stale months at the
+        # same time conflict on it (and get retried) instead of doubling amounts.
+        tools.create_unique_index(self._cr, 'druksmart_dashboard_monthly_cube_cell_uniq', self._table, [
+            'company_id', 'year', 'month', 'metric', 'region', 'COALESCE(project_id, 0)'])
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_classification(self):
+        """Analytic account -> (project, region) arrays for the SQL queries."""
+        index = self.env['druksmart_dashboard.mixin']._get_region_index()
+        account_keys, project_ids, regions = [], [], []
+        for account_id, project_id in index['aa_to_project_id'].items():
+            if project_id in index['local_project_ids']:
+                region = 'local'
+            elif project_id in index['export_project_ids']:
+                region = 'export'
+            else:
+                continue
+            account_keys.append(str(account_id))
+            project_ids.append(project_id)
+            regions.append(region)
+        return {'account_keys': account_keys, 'project_ids': project_ids, 'regions': regions}
+
+    @api.model
+    def _insert_cells(self, company, year, months):
+        """Compute the cells of ``months`` of ``year`` and insert them, one grouped query per metric.
+
+        Documents are selected on a date range (from the first to the end of
+        the last month), so the date indexes are used; the month list only
+        drops the months in between that are not rebuilt.
+        """
+        for model in ('sale.order', 'sale.order.line', 'account.move', 'account.move.line',
+                      'account.payment', 'account.partial.reconcile'):
+            self.env[model].flush_model()
+        params = dict(
+            self._get_classification(),
+            company_id=company.id,
+            year=year,
+            months=list(months),
+            date_from=date(year, min(months), 1),
+            date_to=date(year, max(months), 1) + relativedelta(months=1),
+            uid=self.env.uid,
+        )
+        insert = """
+            INSERT INTO druksmart_dashboard_monthly_cube
+                   (company_id, year, month, metric, region, project_id, amount,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT %(company_id)s, %(year)s, cell.month, cell.metric, cell.region, cell.project_id, cell.amount,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM ({query}) AS cell
+             WHERE cell.amount <> 0
+                ON CONFLICT DO NOTHING
+        """
+        # Analytic shares of a line (1.0 when it has no distribution) and
+        # the Local/Export project of each analytic account.
+        shares = """
+            LEFT JOIN LATERAL (
+                SELECT d.key, COALESCE(NULLIF(d.value, '')::numeric, 100) / 100.0 AS share
+                  FROM jsonb_each_text({line}.analytic_distribution) d
+            ) dist ON TRUE
+            LEFT JOIN unnest(%(account_keys)s::varchar[], %(project_ids)s::int[], %(regions)s::varchar[])
+                   AS cls(account_key, project_id, region) ON cls.account_key = dist.key
+        """
+        queries = [
+            # Sales: confirmed order lines, converted with the order rate.
+            """
+            SELECT EXTRACT(MONTH FROM so.date_order)::int AS month, 'sales' AS metric,
+                   COALESCE(cls.region, 'other') AS region, cls.project_id,
+                   SUM(sol.price_subtotal / COALESCE(NULLIF(so.currency_rate, 0), 1)
+                       * COALESCE(dist.share, 1.0)) AS amount
+              FROM sale_order_line sol
+              JOIN sale_order so ON so.id = sol.order_id
+              """ + shares.format(line='sol') + """
+             WHERE so.company_id = %(company_id)s
+               AND so.state IN ('sale', 'done')
+               AND so.date_order >= %(date_from)s AND so.date_order < %(date_to)s
+               AND EXTRACT(MONTH FROM so.date_order)::int = ANY(%(months)s)
+          GROUP BY 1, 2, 3, 4
+            """,
+            """
+            SELECT EXTRACT(MONTH FROM so.date_order)::int AS month, 'sales_orders' AS metric,
+                   'other' AS region, NULL::int AS project_id, COUNT(*) AS amount
+              FROM sale_order so
+             WHERE so.company_id = %(company_id)s
+               AND so.state IN ('sale', 'done')
+               AND so.date_order >= %(date_from)s AND so.date_order < %(date_to)s
+               AND EXTRACT(MONTH FROM so.date_order)::int = ANY(%(months)s)
+          GROUP BY 1
+            """,
+            # Revenue and expenses: invoice product lines in company currency.
+            """
+            SELECT EXTRACT(MONTH FROM am.invoice_date)::int AS month,
+                   CASE WHEN am.move_type IN ('out_invoice', 'out_refund') THEN 'revenue' ELSE 'expenses' END AS metric,
+                   COALESCE(cls.region, 'other') AS region, cls.project_id,
+                   SUM(CASE WHEN am.move_type IN ('out_invoice', 'out_refund') THEN -aml.balance ELSE aml.balance END
+                       * COALESCE(dist.share, 1.0)) AS amount
+              FROM account_move_line aml
+              JOIN account_move am ON am.id = aml.move_id
+              """ + shares.format(line='aml') + """
+             WHERE am.company_id = %(company_id)s
+               AND am.state = 'posted'
+               AND am.move_type IN ('out_invoice', 'out_refund', 'in_invoice', 'in_refund')
+               AND aml.display_type = 'product'
+               AND am.invoice_date >= %(date_from)s AND am.invoice_date < %(date_to)s
+               AND EXTRACT(MONTH FROM am.invoice_date)::int = ANY(%(months)s)
+          GROUP BY 1, 2, 3, 4
+            """,
+            # L4 vendor figures: the bills of the month and those already
+            # paid, split along the analytic distribution.
+            """
+            SELECT EXTRACT(MONTH FROM am.invoice_date)::int AS month, vendor.metric,
+                   COALESCE(cls.region, 'other') AS region, cls.project_id,
+                   SUM(aml.balance * COALESCE(dist.share, 1.0)) AS amount
+              FROM account_move_line aml
+              JOIN account_move am ON am.id = aml.move_id
+             CROSS JOIN (VALUES ('vendor_bills'), ('vendor_paid')) AS vendor(metric)
+              """ + shares.format(line='aml') + """
+             WHERE am.company_id = %(company_id)s
+               AND am.state = 'posted'
+               AND am.move_type = 'in_invoice'
+               AND aml.display_type = 'product'
+               AND (vendor.metric = 'vendor_bills' OR am.payment_state IN ('paid', 'in_payment'))
+               AND am.invoice_date >= %(date_from)s AND am.invoice_date < %(date_to)s
+               AND EXTRACT(MONTH FROM am.invoice_date)::int = ANY(%(months)s)
+          GROUP BY 1, 2, 3, 4
+            """,
+            # Cash: each payment is spread over the product lines of the
+            # invoices it reconciles, pro rata of their balance; the part
+            # that reconciles no invoice goes to ``other``.
+            """
+            WITH payment_line AS (
+                SELECT pm.id AS move_id, pm.date, p.payment_type, pl.id AS line_id,
+                       ABS(p.amount_company_currency_signed) AS amount
+                  FROM account_payment p
+                  JOIN account_move pm ON pm.id = p.move_id
+                  JOIN account_move_line pl ON pl.move_id = pm.id
+                  JOIN account_account acc ON acc.id = pl.account_id
+                 WHERE pm.company_id = %(company_id)s
+                   AND pm.state = 'posted'
+                   AND acc.account_type IN ('asset_receivable', 'liability_payable')
+                   AND pm.date >= %(date_from)s AND pm.date < %(date_to)s
+                   AND EXTRACT(MONTH FROM pm.date)::int = ANY(%(months)s)
+            ), allocation AS (
+                SELECT pay.move_id, pay.date, pay.payment_type, inv_line.move_id AS invoice_id, apr.amount
+                  FROM payment_line pay
+                  JOIN account_partial_reconcile apr ON pay.line_id IN (apr.debit_move_id, apr.credit_move_id)
+                  JOIN account_move_line inv_line ON inv_line.id = CASE
+                       WHEN apr.debit_move_id = pay.line_id THEN apr.credit_move_id ELSE apr.debit_move_id END
+                  JOIN account_move inv ON inv.id = inv_line.move_id
+                 WHERE inv.move_type IN ('out_invoice', 'out_refund', 'in_invoice', 'in_refund')
+            ), invoice_line AS (
+                SELECT aml.move_id, aml.analytic_distribution,
+                       aml.balance / NULLIF(SUM(aml.balance) OVER (PARTITION BY aml.move_id), 0) AS weight
+                  FROM account_move_line aml
+                 WHERE aml.display_type = 'product'
+                   AND aml.move_id IN (SELECT invoice_id FROM allocation)
+            ), allocated AS (
+                SELECT EXTRACT(MONTH FROM a.date)::int AS month, a.payment_type,
+                       COALESCE(cls.region, 'other') AS region, cls.project_id,
+                       SUM(a.amount * COALESCE(aml.weight, 0) * COALESCE(dist.share, 1.0)) AS amount
+                  FROM allocation a
+                  JOIN invoice_line aml ON aml.move_id = a.invoice_id
+                  """ + shares.format(line='aml') + """
+              GROUP BY 1, 2, 3, 4
+            ), unallocated AS (
+                SELECT EXTRACT(MONTH FROM pay.date)::int AS month, pay.payment_type,
+                       'other' AS region, NULL::int AS project_id,
+                       SUM(pay.amount - COALESCE((SELECT SUM(a.amount) FROM allocation a
+                                                   WHERE a.move_id = pay.move_id), 0)) AS amount
+                  FROM payment_line pay
+              GROUP BY 1, 2
+            )
+            SELECT month, CASE payment_type WHEN 'inbound' THEN 'cash_in' ELSE 'cash_out' END AS metric,
+                   region, project_id, SUM(amount) AS amount
+              FROM (SELECT * FROM allocated UNION ALL SELECT * FROM unallocated) cash
+          GROUP BY 1, 2, 3, 4
+            """,
+        ]
+        for query in queries:
+            self.env.cr.execute(insert.format(query=query), params)
+
+    @api.model
+    def _insert_card_cells(self, company, year, months):
+        """Compute the L1 card cells of ``months`` of ``year`` and insert them.
+
+        Each month is computed by the card computations of ``l1.dashboard``
+        on a copy of the dashboard bound to ``company``, so the cells keep
+        exactly the definitions of the cards.
+        """
+        card = self.env['l1.dashboard'].with_context(allowed_company_ids=[company.id]).new({
+            'company_id': company.id,
+            'year': str(year),
+        })
+        index = self.env['druksmart_dashboard.mixin']._get_region_index()
+        rows = []
+        for month in months:
+            start_date = fields.Date.to_string(date(year, month, 1))
+            end_date = fields.Date.to_string(date_utils.end_of(date(year, month, 1), 'month'))
+            sales = card._get_sales_data(start_date, end_date)
+            revenue = card.calculate_revenue_region_wise(start_date, end_date)
+            # the card raises without both region tags
+            expenses = card.calculate_expenses_region_wise(start_date, end_date) \
+                if index['local_tag'] and index['export_tag'] else {'local_expense': 0.0, 'export_expense': 0.0}
+            cash_flow = card._get_cash_flow_data(start_date, end_date)
+            cells = {
+                'card_sales': (sales['local_sales'], sales['export_sales'], sales['sales_amount']),
+                'card_revenue': (revenue['local_revenue'], revenue['export_revenue'],
+                                 card.compute_untaxed_revenue(start_date, end_date)),
+                'card_expenses': (expenses['local_expense'], expenses['export_expense'],
+                                  card._get_expense_balance(start_date, end_date)),
+                'card_cost': (0.0, 0.0, card.calculate_cost_of_revenue(start_date, end_date)),
+                'card_cash_in': (cash_flow['local_inflow'], cash_flow['export_inflow'], cash_flow['inflows']),
+                'card_cash_out': (cash_flow['local_outflow'], cash_flow['export_outflow'], cash_flow['outflows']),
+            }
+            for metric, (local, export, total) in cells.items():
+                for region, amount in (('local', local), ('export', export), ('other', total - local - export)):
+                    if amount:
+                        rows.append((month, metric, region, amount))
+        if not rows:
+            return
+        self.env.cr.execute("""
+            INSERT INTO druksmart_dashboard_monthly_cube
+                   (company_id, year, month, metric, region, amount, create_uid, create_date, write_uid, write_date)
+            SELECT %s, %s, cell.month, cell.metric, cell.region, cell.amount,
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM unnest(%s::int[], %s::varchar[], %s::varchar[], %s::float8[])
+                   AS cell(month, metric, region, amount)
+                ON CONFLICT DO NOTHING
+        """, [company.id, year, self.env.uid, self.env.uid] + [list(column) for column in zip(*rows)])
+
+    @api.model
+    def _get_watermark(self, company, year):
+        """Last refresh time of the cube of ``company``/``year`` (None when never built)."""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT MAX(write_date) FROM druksmart_dashboard_monthly_cube WHERE company_id = %s AND year = %s
+        """, (company.id, year))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _refresh(self, company, year, months=None):
+        """Rebuild ``months`` of the cube of ``company``/``year``, the whole year when None.
+
+        Run by ``druksmart_dashboard.cube_stale._cron_refresh``.
+        """
+        months = months or list(range(1, 13))
+        self.flush_model()
+        self.env.cr.execute("""
+            DELETE FROM druksmart_dashboard_monthly_cube
+             WHERE company_id = %s AND year = %s AND month = ANY(%s)
+        """, (company.id, year, months))
+        self._insert_cells(company, year, months)
+        self._insert_card_cells(company, year, months)
+        # Keep a marker row so a built year without documents reads as built.
+        self.env.cr.execute("""
+            INSERT INTO druksmart_dashboard_monthly_cube
+                   (company_id, year, month, metric, region, amount, create_uid, create_date, write_uid, write_date)
+            VALUES (%s, %s, %s, 'sales_orders', 'other', 0, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')
+                ON CONFLICT DO NOTHING
+        """, (company.id, year, months[0], self.env.uid, self.env.uid))
+        self.invalidate_model()
+        _logger.info("Dashboard monthly cube refreshed: company=%s year=%s months=%s", company.id, year, months)
+
+    @api.model
+    def _is_built(self, company, year):
+        """Whether the cube of ``company``/``year`` was built, else ask the cron to build it."""
+        if self._get_watermark(company, year):
+            return True
+        self.env['druksmart_dashboard.cube_stale']._request_build(self._name, company, year)
+        return False
+
+    @api.model
+    def _ensure_built(self, company, year):
+        """Build the cube of ``company``/``year`` now if it never was (for actions, not for reads)."""
+        if not self._get_watermark(company, year):
+            self.sudo()._refresh(company, year)
+
+    # ------------------------------------------------------------------
+    # Roll-up
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_cells(self, company, year):
+        """Cells of a year as ``(month, metric, region, project_id, amount)`` tuples.
+
+        A year that was never built has no cells yet: its build is handed to
+        the cron and the year reads as empty meanwhile.
+        """
+        watermark = self._get_watermark(company, year)
+        if not watermark:
+            self.env['druksmart_dashboard.cube_stale']._request_build(self._name, company, year)
+            return ()
+        return self._get_cells_cached(company.id, year, watermark)
+
+    @tools.ormcache('company_id', 'year', 'watermark')
+    def _get_cells_cached(self, company_id, year, watermark):
+        self.env.cr.execute("""
+            SELECT month, metric, region, project_id, SUM(amount)
+              FROM druksmart_dashboard_monthly_cube
+             WHERE company_id = %s AND year = %s AND amount <> 0
+          GROUP BY 1, 2, 3, 4
+        """, (company_id, year))
+        return tuple(self.env.cr.fetchall())
+
+    @api.model
+    def _get_rollup(self, company, date_from, date_to):
+        """Sum the cells of the months from ``date_from`` to ``date_to`` (both included).
+
+        The window may span several years, e.g. a trailing twelve months.
+
+        Returns:
+            dict: ``{metric: {'total', 'local', 'export', 'other', 'monthly',
+            'projects'}}`` where ``monthly`` lists the total of every month of
+            the window and ``projects`` maps project ids to their total.
+        """
+        date_from = fields.Date.to_date(date_from).replace(day=1)
+        date_to = fields.Date.to_date(date_to).replace(day=1)
+        months = []
+        current = date_from
+        while current <= date_to:
+            months.append((current.year, current.month))
+            current += relativedelta(months=1)
+        position = {month: i for i, month in enumerate(months)}
+
+        rollup = {
+            metric: dict({region: 0.0 for region in self.REGIONS},
+                         total=0.0, monthly=[0.0] * len(months), projects={})
+            for metric, _label in self.METRIC_SELECTION
+        }
+        for year in sorted({year for year, _month in months}):
+            for month, metric, region, project_id, amount in self._get_cells(company, year):
+                i = position.get((year, month))
+                if i is None:
+                    continue
+                bucket = rollup[metric]
+                bucket[region] += amount
+                bucket['total'] += amount
+                bucket['monthly'][i] += amount
+                if project_id:
+                    bucket['projects'][project_id] = bucket['projects'].get(project_id, 0.0) + amount
+        return rollup
+
+    @api.model
+    def _get_built_rollup(self, company, date_from, date_to):
+        """``_get_rollup`` of the window, or None while one of its years is not built yet.
+
+        Readers compute their figures directly meanwhile; the build of the
+        missing years is handed to the cron.
+        """
+        years = range(fields.Date.to_date(date_from).year, fields.Date.to_date(date_to).year + 1)
+        if not all([self._is_built(company, year) for year in years]):
+            return None
+        return self._get_rollup(company, date_from, date_to)
+
+    @api.model
+    def _get_ttm_rollup(self, company, date_to):
+        """Roll-up of the twelve months ending with the month of ``date_to``, None while not built."""
+        date_to = fields.Date.to_date(date_to)
+        return self._get_built_rollup(company, date_to - relativedelta(months=11), date_to)
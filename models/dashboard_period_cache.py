@@ -0,0 +1,135 @@
+import json
+import logging
+from datetime import date
+
+from odoo import api, fields, models
+from odoo.tools import date_utils
+
+_logger = logging.getLogger(__name__)
+
+
+class DashboardPeriodCache(models.Model):
+    """Dashboard results of accounting periods closed by the lock dates.
+
+    Entries before the fiscal year lock date cannot change any more, so they
+    are kept forever, keyed by company, metric (``model.method``), period
+    (``2024-03`` for a month, ``2024-01-01/2024-12-31`` for a range) and
+    scope: results depend on the record rules of the user and on the
+    allowed companies, so each user and company selection has its own
+    entries. A period is only closed once it is locked in every company of
+    the scope (see ``_get_lock_date``), and entries are dropped when the
+    lock date of any of these companies moves backwards, see
+    ``res.company.write``.
+
+    Each entry also records the fingerprint of the Local/Export project
+    classification it was computed with; an entry computed under another
+    classification is treated as missing and overwritten.
+    """
+    _name = 'druksmart_dashboard.period_cache'
+    _description = 'Dashboard Closed Period Cache'
+    _order = 'company_id, metric, period'
+
+    company_id = fields.Many2one('res.company', string='Company', required=True, index=True, ondelete='cascade')
+    metric = fields.Char(string='Metric', required=True)
+    period = fields.Char(string='Period', required=True)
+    period_end = fields.Date(string='Period End', required=True, index=True)
+    scope = fields.Char(string='Scope', required=True, help="User and allowed companies the result was computed for")
+    fingerprint = fields.Char(string='Classification Fingerprint')
+    data = fields.Text(string='Data')
+
+    _sql_constraints = [
+        ('unique_period_metric',
+         'UNIQUE(company_id, metric, period, scope)',
+         'Only one cached result per company, metric, period and scope!')
+    ]
+
+    @api.model
+    def _is_enabled(self):
+        """Disabled with ``dashboard_period_cache=False`` in context, e.g. on uncommitted data."""
+        return self.env.context.get('dashboard_period_cache', True)
+
+    @api.model
+    def _get_scope(self):
+        """Scope of the results computed in the current environment, e.g. ``2:1,3`` (uid: company ids)."""
+        return '%s:%s' % (self.env.uid, ','.join(str(company_id) for company_id in sorted(self.env.companies.ids)))
+
+    @api.model
+    def _get_lock_date(self, company):
+        """Last day closed for everyone in ``company`` and in every allowed company.
+
+        Results may read the documents of all the allowed companies (e.g.
+        the receivables of L1 have no company filter), so the earliest
+        fiscal year lock date applies, and nothing is closed while one of
+        these companies has none. The period lock date still lets advisers
+        post, so it does not close a period.
+        """
+        lock_dates = [each.fiscalyear_lock_date for each in company | self.env.companies]
+        return min(lock_dates) if all(lock_dates) else None
+
+    @api.model
+    def _get_closed_months(self, company, year):
+        """Number of months of ``year``, from January, that end on or before the lock date."""
+        lock_date = self._get_lock_date(company)
+        if not lock_date or lock_date.year < year:
+            return 0
+        if lock_date.year > year:
+            return 12
+        month_end = date_utils.end_of(lock_date, 'month')
+        return lock_date.month if lock_date == month_end else lock_date.month - 1
+
+    @api.model
+    def _is_closed(self, company, end_date):
+        lock_date = self._get_lock_date(company)
+        return bool(lock_date) and fields.Date.to_date(end_date) <= lock_date
+
+    @api.model
+    def _fetch(self, company, metric, periods, fingerprint):
+        """Cached results of ``periods``, as ``{period: data}`` (missing ones are left out)."""
+        self.env.cr.execute("""
+            SELECT period, data
+              FROM druksmart_dashboard_period_cache
+             WHERE company_id = %s AND metric = %s AND period IN %s AND scope = %s
+               AND fingerprint IS NOT DISTINCT FROM %s
+        """, (company.id, metric, tuple(periods), self._get_scope(), fingerprint))
+        return {period: json.loads(data) for period, data in self.env.cr.fetchall()}
+
+    @api.model
+    def _store(self, company, metric, values, fingerprint):
+        """Save ``{period: (period_end, data)}`` in a transaction of its own.
+
+        Entries are committed right away so they survive the request (which
+        may be read-only, or rolled back) and are shared with every worker.
+        """
+        if not values:
+            return
+        scope = self._get_scope()
+        with self.env.registry.cursor() as cr:
+            for period, (period_end, data) in values.items():
+                cr.execute("""
+                    INSERT INTO druksmart_dashboard_period_cache
+                           (company_id, metric, period, scope, period_end, fingerprint, data,
+                            create_uid, create_date, write_uid, write_date)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')
+                    ON CONFLICT (company_id, metric, period, scope) DO UPDATE
+                       SET period_end = EXCLUDED.period_end,
+                           fingerprint = EXCLUDED.fingerprint,
+                           data = EXCLUDED.data,
+                           write_uid = EXCLUDED.write_uid,
+                           write_date = EXCLUDED.write_date
+                """, (company.id, metric, period, scope, period_end, fingerprint, json.dumps(data),
+                      self.env.uid, self.env.uid))
+
+    @api.model
+    def _invalidate(self, company, lock_date):
+        """Drop the entries of ``company``, or of a scope allowing it, ending after ``lock_date`` (all if None)."""
+        self.flush_model()
+        self.env.cr.execute("""
+            DELETE FROM druksmart_dashboard_period_cache
+             WHERE (company_id = %(company_id)s
+                    OR ',' || split_part(scope, ':', 2) || ',' LIKE %(pattern)s)
+               AND (%(lock_date)s::date IS NULL OR period_end > %(lock_date)s::date)
+        """, {'company_id': company.id, 'pattern': '%%,%s,%%' % company.id, 'lock_date': lock_date})
+        if self.env.cr.rowcount:
+            _logger.info("Dropped %s closed period dashboard entries of company %s after %s",
+                         self.env.cr.rowcount, company.id, lock_date)
+        self.invalidate_model()
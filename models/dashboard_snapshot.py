@@ -0,0 +1,64 @@
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class DashboardSnapshot(models.Model):
+    """Computed dashboard payloads, reused while they are fresh.
+
+    Payloads depend on the filters, the user (access rights and record rules)
+    and the allowed companies, so each one is stored under a key holding all
+    of them (see ``druksmart_dashboard.mixin._get_snapshot_key``) and is only
+    ever served again to users with the same access and companies.
+    """
+    _name = 'druksmart_dashboard.snapshot'
+    _description = 'Dashboard Payload Snapshot'
+    _order = 'date desc'
+
+    DEFAULT_RETENTION = 24  # hours a snapshot is kept after its computation
+
+    key = fields.Char(string='Key', required=True, index=True)
+    model = fields.Char(string='Model', required=True)
+    data = fields.Text(string='Data')
+    date = fields.Datetime(string='Date', required=True)
+
+    _sql_constraints = [
+        ('unique_snapshot_key', 'UNIQUE(key)', 'Only one snapshot per key!'),
+    ]
+
+    @api.model
+    def _read(self, key, ttl=None):
+        """Payload stored under ``key`` if computed less than ``ttl`` seconds ago (whatever its age
+        without ``ttl``), else None."""
+        snapshot = self.search([('key', '=', key)], limit=1)
+        if snapshot and (ttl is None or fields.Datetime.now() - snapshot.date < timedelta(seconds=ttl)):
+            return snapshot.data
+        return None
+
+    @api.model
+    def _write(self, key, model, data):
+        """Store ``data`` under ``key``, replacing the payload stored before."""
+        self.flush_model()
+        self.env.cr.execute("""
+            INSERT INTO druksmart_dashboard_snapshot
+                   (key, model, data, date, create_uid, create_date, write_uid, write_date)
+            VALUES (%(key)s, %(model)s, %(data)s, now() at time zone 'UTC',
+                    %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC')
+            ON CONFLICT (key) DO UPDATE
+               SET model = EXCLUDED.model,
+                   data = EXCLUDED.data,
+                   date = EXCLUDED.date,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, {'key': key, 'model': model, 'data': data, 'uid': self.env.uid})
+        self.invalidate_model()
+
+    @api.autovacuum
+    def _gc_snapshots(self):
+        """Drop the snapshots no request reused for ``DEFAULT_RETENTION`` hours."""
+        outdated = self.search([('date', '<', fields.Datetime.now() - timedelta(hours=self.DEFAULT_RETENTION))])
+        outdated.unlink()
+        _logger.info("Dropped %s outdated dashboard snapshots", len(outdated))
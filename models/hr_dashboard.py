@@ -1,4 +1,3 @@
-import json
 from odoo import api, fields, models, _
 import base64
 from io import BytesIO
@@ -6,8 +5,11 @@ from odoo.tools.misc import xlsxwriter
 
 class HRDashboard(models.Model):
     _name = 'hr.dashboard'
+    _inherit = ['druksmart_dashboard.mixin']
     _description = 'HR Dashboard Data'
 
+    DASHBOARD_FILTER_FIELDS = ('company_id',)
+
     name = fields.Char(string='Dashboard Name', default='HR Dashboard')
     
     dashboard_data = fields.Text(string='Dashboard Data', compute='_compute_dashboard_data')
@@ -20,32 +22,31 @@ class HRDashboard(models.Model):
     @api.depends('company_id')
     def _compute_dashboard_data(self):
         for record in self:
-            record.dashboard_data = json.dumps(record._get_dashboard_data())
+            record.dashboard_data = self._json_dumps(record._get_dashboard_data())
             record.last_update = fields.Datetime.now()
 
     @api.model
     def get_dashboard_data_json(self):
         """API method to get dashboard data in JSON format"""
-            
-        dashboard = self.search([
-            ('company_id', '=', self.env.company.id)
-        ], limit=1)
-        
-        if not dashboard:
-            dashboard = self.create({
-                'company_id': self.env.company.id,
-            })
-        
-        dashboard._compute_dashboard_data()
-        return dashboard.dashboard_data
+        return self._get_dashboard_snapshot({})
+
+    @api.model
+    def get_headcount_trend(self, date_from, date_to, dimension='total'):
+        """API method returning headcount trend series from the stored snapshots"""
+        return self.env['hr.headcount.snapshot']._get_trend(
+            self.env.company, date_from, date_to, dimension=dimension)
 
     def _get_dashboard_data(self):
         """Compute all dashboard data and return as a structured dictionary"""
         self.ensure_one()
         
-        employee_data = self._get_employee_data()
-        
-        return {
+        perf = self._perf_start()
+        with self._perf_section('employees', perf):
+            employee_data = self._get_employee_data()
+        with self._perf_section('department_tree', perf):
+            department_tree = self._get_department_rollup(self.company_id or self.env.company)
+
+        return self._perf_finish({
             'hr': {
                 'total_employees': employee_data['total_employees'],
                 'gender_data': {
@@ -57,59 +58,137 @@ class HRDashboard(models.Model):
                              employee_data['gender_data']['other'],
                     'colors': ['#1e88e5', '#ff8f00'],
                 },
-                'departments': [
-                    {'name': dept, 'count': count} 
-                    for dept, count in employee_data['departments'].items()
-                ],
+                'departments': employee_data['departments'],
+                'department_tree': department_tree,
                 'categories': [
                     {'name': cat, 'count': count} 
                     for cat, count in employee_data['categories'].items()
                 ]
             },
-        }
+        }, perf)
     
     def _get_employee_data(self):
         """Get employee related data for the dashboard"""
-        employees = self.env['hr.employee'].search([
-            ('company_id', '=', self.company_id.id),
-            ('active', '=', True),
-        ])
-        
-        total_employees = len(employees)
-        
-        gender_data = {
-            'male': len(employees.filtered(lambda e: e.gender == 'male')),
-            'female': len(employees.filtered(lambda e: e.gender == 'female')),
-            'other': len(employees.filtered(lambda e: e.gender not in ['male', 'female'] or not e.gender)),
-        }
-        
-        departments = {}
-        for employee in employees:
-            department_name = employee.department_id.name or 'Undefined'
-            departments[department_name] = departments.get(department_name, 0) + 1
-        
-        categories = self.env['hr.employee.category'].search([
-            ('name', 'not in', ['Male', 'Female'])
-        ])
-    
-        categories_count = {}
-        
-        for category in categories:
-            # Count employees in this category
-            employee_count = self.env['hr.employee'].search_count([
-                ('category_ids', 'in', category.id),
-                ('active', '=', True)  # Only count active employees
-            ])
-            
-            categories_count[category.name] = employee_count
-            
+        return self._get_headcount_stats(self.company_id or self.env.company)
+
+    @api.model
+    def _get_headcount_stats(self, company):
+        """Headcount totals for the active employees of ``company``.
+
+        Uses two grouped reads on ``hr.employee`` (gender, department) and a
+        single grouped query on the ``employee_category_rel`` relation table,
+        so the cost no longer grows with the number of employees or tags.
+        Categories named Male/Female are skipped as they only duplicate the
+        gender split.
+        """
+        Employee = self.env['hr.employee']
+        domain = [('company_id', '=', company.id), ('active', '=', True)]
+
+        gender_data = {'male': 0, 'female': 0, 'other': 0}
+        for group in Employee.read_group(domain, ['gender'], ['gender'], lazy=False):
+            key = group['gender'] if group['gender'] in ('male', 'female') else 'other'
+            gender_data[key] += group['__count']
+        total_employees = sum(gender_data.values())
+
+        departments = []
+        for group in Employee.read_group(domain, ['department_id'], ['department_id'], lazy=False):
+            department_id, department_name = group['department_id'] or (False, 'Undefined')
+            departments.append({'id': department_id, 'name': department_name, 'count': group['__count']})
+
+        Employee.flush_model(['active', 'company_id', 'category_ids'])
+        self.env['hr.employee.category'].flush_model(['name'])
+        self.env.cr.execute("""
+            SELECT c.name, COUNT(e.id) AS employee_count
+              FROM hr_employee_category c
+         LEFT JOIN employee_category_rel rel ON rel.category_id = c.id
+         LEFT JOIN hr_employee e ON e.id = rel.employee_id
+                                AND e.active
+                                AND e.company_id = %s
+             WHERE LOWER(c.name) NOT IN ('male', 'female')
+          GROUP BY c.id, c.name
+          ORDER BY c.name
+        """, (company.id,))
+        categories = {}
+        for name, count in self.env.cr.fetchall():
+            categories[name] = categories.get(name, 0) + count
+
         return {
             'total_employees': total_employees,
             'gender_data': gender_data,
             'departments': departments,
-            'categories': categories_count,
+            'categories': categories,
         }
 
+    @api.model
+    def _get_department_rollup(self, company):
+        """Headcount rolled up the department hierarchy.
+
+        A single query joins every department with its descendants through
+        ``parent_path`` so each node carries both its own headcount and the
+        headcount of its whole subtree. Nodes are keyed by id, so departments
+        sharing a name stay separate. Subtrees without employees are dropped.
+
+        Returns:
+            list: root nodes ``{'id', 'name', 'count', 'direct_count', 'children'}``
+            with nested children sorted by name; employees without a
+            department are reported as an 'Undefined' root.
+        """
+        Department = self.env['hr.department']
+        Department.flush_model(['name', 'parent_id', 'parent_path', 'company_id', 'active'])
+        self.env['hr.employee'].flush_model(['active', 'company_id', 'department_id'])
+        self.env.cr.execute("""
+            SELECT anc.id,
+                   anc.name,
+                   anc.parent_id,
+                   COUNT(e.id) AS total_count,
+                   COUNT(e.id) FILTER (WHERE d.id = anc.id) AS direct_count
+              FROM hr_department anc
+              JOIN hr_department d ON d.parent_path LIKE anc.parent_path || '%%'
+         LEFT JOIN hr_employee e ON e.department_id = d.id
+                                AND e.active
+                                AND e.company_id = %(company_id)s
+             WHERE anc.active
+               AND (anc.company_id = %(company_id)s OR anc.company_id IS NULL)
+          GROUP BY anc.id, anc.name, anc.parent_id
+        """, {'company_id': company.id})
+        rows = self.env.cr.dictfetchall()
+
+        nodes = {
+            row['id']: {
+                'id': row['id'],
+                'name': row['name'],
+                'count': row['total_count'],
+                'direct_count': row['direct_count'],
+                'children': [],
+            }
+            for row in rows if row['total_count']
+        }
+        roots = []
+        for row in rows:
+            node = nodes.get(row['id'])
+            if not node:
+                continue
+            parent = nodes.get(row['parent_id'])
+            (parent['children'] if parent else roots).append(node)
+        for node in nodes.values():
+            node['children'].sort(key=lambda child: child['name'] or '')
+        roots.sort(key=lambda node: node['name'] or '')
+
+        unassigned = self.env['hr.employee'].search_count([
+            ('company_id', '=', company.id),
+            ('active', '=', True),
+            ('department_id', '=', False),
+        ])
+        if unassigned:
+            roots.append({
+                'id': False,
+                'name': 'Undefined',
+                'count': unassigned,
+                'direct_count': unassigned,
+                'children': [],
+            })
+        return roots
+
     def action_export_excel(self):
         """Export summary + stats (dept, gender, category) and then an Employees table (stacked below)."""
         self.ensure_one()
@@ -123,31 +202,13 @@ class HRDashboard(models.Model):
             ('active', '=', True),
         ])
 
-        total_employees = len(employees)
-        male   = len(employees.filtered(lambda e: e.gender == 'male'))
-        female = len(employees.filtered(lambda e: e.gender == 'female'))
-        other  = total_employees - male - female
-
-        # Departments
-        dept_counts = {}
-        for emp in employees:
-            dname = emp.department_id.name or 'Undefined'
-            dept_counts[dname] = dept_counts.get(dname, 0) + 1
-
-        # Categories (tags) – count active employees tagged with each category
-        categories = self.env['hr.employee.category'].search([])
-        category_counts = {}
-        for cat in categories:
-            # skip “Male/Female” categories if you use those as tags (optional)
-            if cat.name and cat.name.lower() in ('male', 'female'):
-                continue
-            cnt = Employee.search_count([
-                ('category_ids', 'in', cat.id),
-                ('company_id', '=', company.id),
-                ('active', '=', True),
-            ])
-            if cnt:
-                category_counts[cat.name] = cnt
+        stats = self._get_headcount_stats(company)
+        total_employees = stats['total_employees']
+        male = stats['gender_data']['male']
+        female = stats['gender_data']['female']
+        other = stats['gender_data']['other']
+        dept_counts = [(dept['name'], dept['count']) for dept in stats['departments']]
+        category_counts = {name: cnt for name, cnt in stats['categories'].items() if cnt}
 
         # ---- Workbook ----
         from io import BytesIO
@@ -186,7 +247,7 @@ class HRDashboard(models.Model):
         ws.write(r, 1, 'Departments – Headcount', hdr_fmt); r += 1
         ws.write(r, 1, 'Department', hdr_fmt)
         ws.write(r, 2, 'Count', hdr_fmt)
-        for dname, cnt in sorted(dept_counts.items()):
+        for dname, cnt in sorted(dept_counts):
             r += 1
             ws.write(r, 1, dname, cell_txt)
             ws.write(r, 2, cnt, cell_int)
@@ -0,0 +1,182 @@
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+class HRHeadcountSnapshot(models.Model):
+    """Daily headcount history used for the HR trend charts.
+
+    Two kinds of rows are stored for every snapshot date and company:
+
+    * headcount rows (``category_id`` empty) with one row per
+      department/gender pair; summing them gives the company headcount.
+    * category rows (``category_id`` set, no department/gender) holding the
+      number of employees tagged with that category. An employee can carry
+      several tags, so these rows must never be added to the headcount rows.
+
+    Daily rows older than the retention period are compacted to a single
+    snapshot per month (the last day recorded in that month).
+    """
+    _name = 'hr.headcount.snapshot'
+    _description = 'HR Headcount Snapshot'
+    _order = 'date desc, id'
+
+    DEFAULT_RETENTION_DAYS = 90
+
+    date = fields.Date(string='Date', required=True, index=True)
+    company_id = fields.Many2one('res.company', string='Company', required=True, index=True, ondelete='cascade')
+    department_id = fields.Many2one('hr.department', string='Department', ondelete='set null')
+    gender = fields.Selection([
+        ('male', 'Male'),
+        ('female', 'Female'),
+        ('other', 'Other'),
+    ], string='Gender')
+    category_id = fields.Many2one('hr.employee.category', string='Category', ondelete='cascade')
+    headcount = fields.Integer(string='Headcount')
+    resolution = fields.Selection([
+        ('daily', 'Daily'),
+        ('monthly', 'Monthly'),
+    ], string='Resolution', default='daily', required=True)
+
+    @api.model
+    def _cron_take_snapshot(self):
+        """Record today's headcount for every company and compact old rows."""
+        today = fields.Date.context_today(self)
+        self._take_snapshot(today)
+        self._compact_snapshots(today)
+
+    @api.model
+    def _take_snapshot(self, snapshot_date):
+        """Store the headcount of ``snapshot_date``, replacing any earlier run of the same day."""
+        self.search([('date', '=', snapshot_date)]).unlink()
+
+        Employee = self.env['hr.employee']
+        Employee.flush_model(['active', 'company_id', 'department_id', 'gender', 'category_ids'])
+
+        self.env.cr.execute("""
+            SELECT company_id,
+                   department_id,
+                   CASE WHEN gender IN ('male', 'female') THEN gender ELSE 'other' END AS gender,
+                   COUNT(*) AS headcount
+              FROM hr_employee
+             WHERE active AND company_id IS NOT NULL
+          GROUP BY 1, 2, 3
+        """)
+        vals_list = [{
+            'date': snapshot_date,
+            'company_id': row['company_id'],
+            'department_id': row['department_id'],
+            'gender': row['gender'],
+            'headcount': row['headcount'],
+        } for row in self.env.cr.dictfetchall()]
+
+        self.env.cr.execute("""
+            SELECT e.company_id, rel.category_id, COUNT(*) AS headcount
+              FROM employee_category_rel rel
+              JOIN hr_employee e ON e.id = rel.employee_id
+             WHERE e.active AND e.company_id IS NOT NULL
+          GROUP BY 1, 2
+        """)
+        vals_list += [{
+            'date': snapshot_date,
+            'company_id': row['company_id'],
+            'category_id': row['category_id'],
+            'headcount': row['headcount'],
+        } for row in self.env.cr.dictfetchall()]
+
+        return self.create(vals_list)
+
+    @api.model
+    def _get_retention_days(self):
+        param = self.env['ir.config_parameter'].sudo().get_param(
+            'my_dashboard.headcount_daily_retention_days', self.DEFAULT_RETENTION_DAYS)
+        try:
+            return max(int(param), 0)
+        except (TypeError, ValueError):
+            return self.DEFAULT_RETENTION_DAYS
+
+    @api.model
+    def _compact_snapshots(self, today):
+        """Keep one snapshot per month for daily rows older than the retention period.
+
+        Only whole months are compacted: the cutoff is moved back to the first
+        day of the month so a month is never split between the two resolutions.
+        """
+        cutoff = (today - timedelta(days=self._get_retention_days())).replace(day=1)
+        self.flush_model()
+        self.env.cr.execute("""
+            WITH month_end AS (
+                SELECT company_id, MAX(date) AS date
+                  FROM hr_headcount_snapshot
+                 WHERE resolution = 'daily' AND date < %(cutoff)s
+              GROUP BY company_id, date_trunc('month', date)
+            )
+            UPDATE hr_headcount_snapshot s
+               SET resolution = 'monthly'
+              FROM month_end m
+             WHERE s.company_id = m.company_id
+               AND s.date = m.date
+               AND s.resolution = 'daily'
+        """, {'cutoff': cutoff})
+        self.env.cr.execute("""
+            DELETE FROM hr_headcount_snapshot
+             WHERE resolution = 'daily' AND date < %s
+        """, (cutoff,))
+        self.invalidate_model()
+
+    @api.model
+    def _get_trend(self, company, date_from, date_to, dimension='total'):
+        """Headcount series between two dates.
+
+        Args:
+            company: res.company record
+            date_from, date_to: inclusive date range
+            dimension: 'total', 'department', 'gender' or 'category'
+
+        Returns:
+            dict: {'dates': [...], 'series': [{'id', 'name', 'data'}]} where
+            every series holds one value per entry of ``dates``.
+        """
+        if dimension not in ('total', 'department', 'gender', 'category'):
+            dimension = 'total'
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+
+        domain = [
+            ('company_id', '=', company.id),
+            ('date', '>=', date_from),
+            ('date', '<=', date_to),
+            ('category_id', '!=' if dimension == 'category' else '=', False),
+        ]
+        groupby = ['date:day']
+        if dimension == 'department':
+            groupby.append('department_id')
+        elif dimension == 'gender':
+            groupby.append('gender')
+        elif dimension == 'category':
+            groupby.append('category_id')
+
+        groups = self.read_group(domain, ['headcount:sum'], groupby, orderby='date', lazy=False)
+
+        dates = sorted({group['__range']['date:day']['from'][:10] for group in groups})
+        date_index = {day: i for i, day in enumerate(dates)}
+
+        gender_labels = dict(self._fields['gender'].selection)
+        series = {}
+        for group in groups:
+            if dimension == 'total':
+                key, name = 'total', 'Total'
+            elif dimension == 'gender':
+                key = group['gender'] or 'other'
+                name = gender_labels.get(key, key)
+            else:
+                value = group[groupby[1]]
+                key, name = (value[0], value[1]) if value else (False, 'Undefined')
+            entry = series.setdefault(key, {'id': key, 'name': name, 'data': [0] * len(dates)})
+            day = group['__range']['date:day']['from'][:10]
+            entry['data'][date_index[day]] += group['headcount'] or 0
+
+        return {
+            'dates': dates,
+            'series': list(series.values()),
+        }
@@ -1,19 +1,20 @@
-import json
 import logging
 from datetime import datetime
 import io
 import base64
 
 from odoo import api, fields, models, _
-from odoo.tools import float_round
 
 _logger = logging.getLogger(__name__)
 
 
 class L1Dashboard(models.Model):
     _name = 'l1.dashboard_demo'
+    _inherit = ['druksmart_dashboard.mixin']
     _description = 'L1 Dashboard Data'
 
+    DASHBOARD_FILTER_FIELDS = ('company_id', 'year')
+
     name = fields.Char(string='Dashboard Name', default='L1 Dashboard')
     
     dashboard_data = fields.Text(string='Dashboard Data', compute='_compute_dashboard_data')
@@ -35,7 +36,7 @@ class L1Dashboard(models.Model):
     @api.depends('year', 'company_id')
     def _compute_dashboard_data(self):
         for record in self:
-            record.dashboard_data = json.dumps(record._get_dashboard_data())
+            record.dashboard_data = self._json_dumps(record._get_dashboard_data())
             record.last_update = fields.Datetime.now()
 
     @api.model
@@ -43,19 +44,8 @@ class L1Dashboard(models.Model):
         """API method to get dashboard data in JSON format"""
         if not year:
             year = fields.Date.today().year
-            
-        dashboard = self.search([
-            ('year', '=', year),
-            ('company_id', '=', self.env.company.id)
-        ], limit=1)
-        
-        if not dashboard:
-            dashboard = self.create({
-                'year': year,
-            })
-        
-        dashboard._compute_dashboard_data()
-        return dashboard.dashboard_data
+
+        return self._get_dashboard_snapshot({'year': str(year)})
 
     def _get_dashboard_data(self):
         """Compute dashboard data **without** mutating year/month/quarter selections."""
@@ -66,33 +56,44 @@ class L1Dashboard(models.Model):
         start_date = fields.Date.to_string(datetime(sel_year, 1, 1))
         end_date   = fields.Date.to_string(datetime(sel_year, 12, 31))
         
-        sales_data = self._compute_sales_dashboard_metrics(start_date, end_date)
-        financial_data = self._compute_financial_dashboard_metrics(start_date, end_date)
-        revenue_expenses_data = self._compute_revenue_expenses_dashboard_metrics(start_date, end_date)
-        cashflow_data = self._compute_cashflow_dashboard_metrics(start_date, end_date)
-
-        return {
+        perf = self._perf_start()
+        sections = self._run_sections([
+            ('sales', '_compute_sales_dashboard_metrics', (start_date, end_date), True),
+            ('financial', '_compute_financial_dashboard_metrics', (start_date, end_date), True),
+            ('revenue_expenses', '_compute_revenue_expenses_dashboard_metrics', (start_date, end_date), True),
+            ('cashflow', '_compute_cashflow_dashboard_metrics', (start_date, end_date), True),
+            ('target_cube', '_get_target_cube_data', (sel_year,), True),
+        ], perf)
+        sales_data = sections['sales']
+        financial_data = sections['financial']
+        revenue_expenses_data = sections['revenue_expenses']
+        cashflow_data = sections['cashflow']
+        target_cube = sections['target_cube']
+
+        return self._perf_finish({
             'filter': {
                 'year': sel_year
             },
+            'schema': self.PAYLOAD_SCHEMA,
+            'format': self._get_payload_format(self.currency_id or self.env.company.currency_id),
             'overview': {
-                'sales_target': self._format_amount(sales_data['sales_target']),
-                'total_achieved': self._format_amount(sales_data['total_sales']),
+                'sales_target': round(sales_data['sales_target'], 2),
+                'total_achieved': round(sales_data['total_sales'], 2),
                 'sales_order': sales_data['order_count'],
-                'target': self._format_amount(sales_data['sales_target']),
-                'achieved': self._format_amount(sales_data['total_sales']),
+                'target': round(sales_data['sales_target'], 2),
+                'achieved': round(sales_data['total_sales'], 2),
                 'ratio': sales_data['target_achievement_ratio'],
-                'total_revenue': self._format_amount(financial_data['total_revenue']),
-                'cost_of_revenue': self._format_amount(financial_data['cost_of_revenue']),
-                'gross_profit': self._format_amount(financial_data['gross_profit']),
-                'gross_margin': f"{financial_data['gross_profit_margin']}%",
-                'total_expenses': self._format_amount(financial_data['total_expenses']),
-                'net_profit': self._format_amount(financial_data['net_profit']),
-                'net_margin': f"{financial_data['net_profit_margin']}%",
-                'accounts_receivable': self._format_amount(financial_data['accounts_receivable']),
-                'accounts_payable': self._format_amount(financial_data['accounts_payable']),
-                'net_postion': self._format_amount(
-                    financial_data['accounts_receivable'] - financial_data['accounts_payable']
+                'total_revenue': round(financial_data['total_revenue'], 2),
+                'cost_of_revenue': round(financial_data['cost_of_revenue'], 2),
+                'gross_profit': round(financial_data['gross_profit'], 2),
+                'gross_margin': financial_data['gross_profit_margin'],
+                'total_expenses': round(financial_data['total_expenses'], 2),
+                'net_profit': round(financial_data['net_profit'], 2),
+                'net_margin': financial_data['net_profit_margin'],
+                'accounts_receivable': round(financial_data['accounts_receivable'], 2),
+                'accounts_payable': round(financial_data['accounts_payable'], 2),
+                'net_postion': round(
+                    financial_data['accounts_receivable'] - financial_data['accounts_payable'], 2
                 ),
             },
             'sales': {
@@ -100,7 +101,17 @@ class L1Dashboard(models.Model):
             },
             'revenue_expenses': revenue_expenses_data,
             'cashflow': cashflow_data,
-        }
+            'target_cube': target_cube,
+        }, perf)
+
+    @api.model
+    def get_target_cube(self, year=None):
+        """API method returning the target vs actual cube of a year"""
+        year = int(year or fields.Date.today().year)
+        return self.env['sale.target.cube']._get_cube_data(self.env.company, year)
+
+    def _get_target_cube_data(self, year):
+        return self.env['sale.target.cube']._get_cube_data(self.company_id or self.env.company, year)
 
     def _get_yearly_sales_target(self):
         """Get the yearly sales target from configuration"""
@@ -112,10 +123,6 @@ class L1Dashboard(models.Model):
             return sum(sale_targets.mapped('target_amount'))
         return 0.0
 
-    def _format_amount(self, amount):
-        """Format amount to match the dashboard display format"""
-        return f"{float_round(round(amount, 2), 2):,.2f}"
-    
     def _compute_sales_dashboard_metrics(self, start_date, end_date):
         """Compute key sales metrics (count, total, target) for the dashboard within a given date range."""
         
@@ -585,22 +592,6 @@ class L1Dashboard(models.Model):
         dat = wb.add_worksheet('Data'); dat.hide()
 
         # ========= Helpers =========
-        def _to_num(v):
-            if isinstance(v, (int, float)):
-                return float(v)
-            if isinstance(v, str):
-                s = v.replace(',', '').strip()
-                if s.endswith('%'):
-                    try:
-                        return float(s[:-1]) / 100.0
-                    except Exception:
-                        return None
-                try:
-                    return float(s)
-                except Exception:
-                    return None
-            return None
-
         def paint_box(ws, r1, c1, r2, c2):
             """Fill a rectangle with bordered blank cells (no merge)."""
             for r in range(r1, r2 + 1):
@@ -642,60 +633,46 @@ class L1Dashboard(models.Model):
         # Card 1 area: B6:I16  -> rows 5..15, cols 1..8
         paint_box(sh, 5, 1, 15, 8)
         sh.write(6, 2, 'Sales', F_KPI_T)
-        sh.write(9,  2, 'Sales Target');   sh.write_number(9,  7, _to_num(ov.get('sales_target')) or 0.0, F_MONEY)
-        sh.write(11, 2, 'Total Achieved'); sh.write_number(11, 7, _to_num(ov.get('total_achieved')) or 0.0, F_MONEY)
-        sh.write(13, 2, 'Sales Order');    sh.write_number(13, 7, _to_num(ov.get('sales_order')) or 0.0, F_KPI_V)
+        sh.write(9,  2, 'Sales Target');   sh.write_number(9,  7, ov.get('sales_target') or 0.0, F_MONEY)
+        sh.write(11, 2, 'Total Achieved'); sh.write_number(11, 7, ov.get('total_achieved') or 0.0, F_MONEY)
+        sh.write(13, 2, 'Sales Order');    sh.write_number(13, 7, ov.get('sales_order') or 0, F_KPI_V)
 
         # Card 2 area: K6:R16 -> rows 5..15, cols 10..17
         paint_box(sh, 5, 10, 15, 17)
         sh.write(6, 11, 'Target Achievement', F_KPI_T)
-        sh.write(9,  11, 'Achieved'); sh.write_number(9,  16, _to_num(ov.get('achieved')) or 0.0, F_MONEY)
-        sh.write(11, 11, 'Target');   sh.write_number(11, 16, _to_num(ov.get('target')) or 0.0, F_MONEY)
-        ratio_num = _to_num(f"{ov.get('ratio', 0)}%") if isinstance(ov.get('ratio'), (int, float)) else _to_num(ov.get('ratio') or '')
+        sh.write(9,  11, 'Achieved'); sh.write_number(9,  16, ov.get('achieved') or 0.0, F_MONEY)
+        sh.write(11, 11, 'Target');   sh.write_number(11, 16, ov.get('target') or 0.0, F_MONEY)
+        # the ratio is a fraction, margins are percentage points
         sh.write(13, 11, 'Achievement Ratio')
-        if ratio_num is not None:
-            sh.write_number(13, 16, ratio_num, F_PCT)
-        else:
-            sh.write(13, 16, ov.get('ratio') or '', F_KPI_V)
+        sh.write_number(13, 16, ov.get('ratio') or 0.0, F_PCT)
 
         # Card 3 area: B18:I30 -> rows 17..29, cols 1..8
         paint_box(sh, 17, 1, 29, 8)
         sh.write(18, 2, 'Revenue & Profit', F_KPI_T)
-        sh.write(21, 2, 'Revenue');         sh.write_number(21, 7, _to_num(ov.get('total_revenue')) or 0.0, F_MONEY)
-        cor = _to_num(ov.get('cost_of_revenue'))
-        sh.write(23, 2, 'Cost of Revenue'); sh.write_number(23, 7, cor if cor is not None else 0.0, F_BAD if (cor or 0) > 0 else F_MONEY)
-        sh.write(25, 2, 'Gross Profit');    sh.write_number(25, 7, _to_num(ov.get('gross_profit')) or 0.0, F_GOOD)
-        gm = _to_num(ov.get('gross_margin') or '')
+        sh.write(21, 2, 'Revenue');         sh.write_number(21, 7, ov.get('total_revenue') or 0.0, F_MONEY)
+        cor = ov.get('cost_of_revenue') or 0.0
+        sh.write(23, 2, 'Cost of Revenue'); sh.write_number(23, 7, cor, F_BAD if cor > 0 else F_MONEY)
+        sh.write(25, 2, 'Gross Profit');    sh.write_number(25, 7, ov.get('gross_profit') or 0.0, F_GOOD)
         sh.write(27, 2, 'Gross Margin')
-        if gm is not None:
-            sh.write_number(27, 7, gm, F_PCT)
-        else:
-            sh.write(27, 7, ov.get('gross_margin') or '', F_KPI_V)
+        sh.write_number(27, 7, (ov.get('gross_margin') or 0.0) / 100.0, F_PCT)
 
         # Card 4 area: K18:R30 -> rows 17..29, cols 10..17
         paint_box(sh, 17, 10, 29, 17)
         sh.write(18, 11, 'Expenses & Net Profit', F_KPI_T)
-        sh.write(21, 11, 'Expenses');   sh.write_number(21, 16, _to_num(ov.get('total_expenses')) or 0.0, F_BAD)
-        npf = _to_num(ov.get('net_profit'))
-        sh.write(23, 11, 'Net Profit'); sh.write_number(23, 16, npf if npf is not None else 0.0, F_GOOD if (npf or 0) >= 0 else F_BAD)
-        nm = _to_num(ov.get('net_margin') or '')
+        sh.write(21, 11, 'Expenses');   sh.write_number(21, 16, ov.get('total_expenses') or 0.0, F_BAD)
+        npf = ov.get('net_profit') or 0.0
+        sh.write(23, 11, 'Net Profit'); sh.write_number(23, 16, npf, F_GOOD if npf >= 0 else F_BAD)
         sh.write(25, 11, 'Net Margin')
-        if nm is not None:
-            sh.write_number(25, 16, nm, F_PCT)
-        else:
-            sh.write(25, 16, ov.get('net_margin') or '', F_KPI_V)
+        sh.write_number(25, 16, (ov.get('net_margin') or 0.0) / 100.0, F_PCT)
 
         # Row 3.5: Receivable & Payable (B32:R42 -> rows 31..41, cols 1..17)
         paint_box(sh, 31, 1, 41, 17)
         sh.write(32, 2, 'Receivable & Payable', F_KPI_T)
-        sh.write(35, 2,  'Accounts Receivable'); sh.write_number(35, 7,  _to_num(ov.get('accounts_receivable')) or 0.0, F_MONEY)
-        sh.write(35, 12, 'Accounts Payable');    sh.write_number(35, 16, _to_num(ov.get('accounts_payable')) or 0.0, F_MONEY)
-        net_pos = _to_num(ov.get('net_postion'))
+        sh.write(35, 2,  'Accounts Receivable'); sh.write_number(35, 7,  ov.get('accounts_receivable') or 0.0, F_MONEY)
+        sh.write(35, 12, 'Accounts Payable');    sh.write_number(35, 16, ov.get('accounts_payable') or 0.0, F_MONEY)
+        net_pos = ov.get('net_postion') or 0.0
         sh.write(37, 2, 'Net Position')
-        if net_pos is not None:
-            sh.write_number(37, 7, net_pos, F_GOOD if net_pos >= 0 else F_BAD)
-        else:
-            sh.write(37, 7, ov.get('net_postion') or '', F_KPI_V)
+        sh.write_number(37, 7, net_pos, F_GOOD if net_pos >= 0 else F_BAD)
 
         # ========= Charts =========
         ch_sales = wb.add_chart({'type': 'column'})
@@ -750,5 +727,5 @@ class L1Dashboard(models.Model):
     def _onchange_year(self):
         # live-refresh the JSON used by the widget when Year changes
         for rec in self:
-            rec.dashboard_data = json.dumps(rec._get_dashboard_data())
+            rec.dashboard_data = self._json_dumps(rec._get_dashboard_data())
             rec.last_update = fields.Datetime.now()
\ No newline at end of file
@@ -1,9 +1,10 @@
 import json
 import logging
-from datetime import datetime
+from datetime import date, datetime
 from collections import defaultdict
 
 from odoo import api, fields, models, _
+from odoo.exceptions import UserError
 from odoo.tools import float_round
 
 import base64
@@ -15,9 +16,12 @@ _logger = logging.getLogger(__name__)
 
 class L2Dashboard(models.Model):
     _name = 'l2.dashboard'
+    _inherit = ['druksmart_dashboard.mixin']
     _description = 'L2 Dashboard Data'
     _rec_name = 'name'
 
+    DASHBOARD_FILTER_FIELDS = ('company_id', 'year', 'consolidated')
+
     name = fields.Char(
         string='Dashboard Name',
         default=lambda self: _('L2 Dashboard - %s') % fields.Date.today().strftime('%Y')
@@ -34,6 +38,14 @@ class L2Dashboard(models.Model):
 
     company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
     currency_id = fields.Many2one(related='company_id.currency_id')
+    consolidated = fields.Boolean(
+        string='Consolidated',
+        help='Merge all the selected companies, converted to the currency of the current company.')
+
+    CONSOLIDATION_UNSCALED_KEYS = frozenset({'project_id'})
+    # sections with per-project monthly breakdowns, served by ``get_breakdown``
+    BREAKDOWN_METRICS = ('sales', 'revenue', 'expenses')
+    BREAKDOWN_LIMIT = 8  # projects of a drill-down before the "others" bucket
 
     year = fields.Selection(
         selection='_get_year_selection',
@@ -97,52 +109,186 @@ class L2Dashboard(models.Model):
         return float_round(amount, precision_digits=2)
     # -----------------------------------------
 
-    @api.depends('year', 'company_id')
+    @api.depends('year', 'company_id', 'consolidated')
     def _compute_dashboard_data(self):
+        # with ``dashboard_lazy`` (set by the dashboard action) the form only
+        # carries the filters: the widget fetches the payload itself
+        lazy = self.env.context.get('dashboard_lazy')
         for record in self:
-            record.dashboard_data = json.dumps(record._get_dashboard_data(), default=float)
+            if lazy:
+                data = {'lazy': True, 'filters': {'year': record.year, 'consolidated': record.consolidated}}
+            else:
+                data = record._get_dashboard_data()
+                data.pop('breakdowns', None)
+            record.dashboard_data = self._json_dumps(data)
             record.last_update = fields.Datetime.now()
 
     @api.model
-    def get_dashboard_data_json(self, year=None):
+    def get_dashboard_data_json(self, year=None, consolidated=False):
         if not year:
             year = fields.Date.today().year
+        return self._get_dashboard_snapshot(self._get_snapshot_vals(year, consolidated))
 
-        dashboard = self.search([
-            ('year', '=', year),
-            ('company_id', '=', self.env.company.id)
-        ], limit=1)
+    @api.model
+    def _get_snapshot_vals(self, year, consolidated):
+        return {'year': str(year), 'consolidated': bool(consolidated)}
 
-        if not dashboard:
-            dashboard = self.create({'year': year, 'company_id': self.env.company.id})
+    @api.model
+    def _get_breakdown_key(self, key):
+        """Key of the project breakdowns stored next to the payload of snapshot ``key``."""
+        return '%s|breakdowns' % key
 
-        dashboard._compute_dashboard_data()
-        return dashboard.dashboard_data
+    @api.model
+    def get_breakdown(self, metric, region, month, year=None, consolidated=False, limit=None):
+        """Top projects of one bar of the Local/Export charts, for their tooltip.
+
+        Read from the breakdowns stored next to the snapshot of the same
+        filters as ``get_dashboard_data_json`` (see ``_store_snapshot``),
+        whatever their age: they match the payload the dashboard was drawn
+        from, so hovering it never recomputes the dashboard. Projects of
+        several companies (consolidated dashboards) are summed up.
+
+        Args:
+            metric (str): 'sales', 'revenue' or 'expenses'.
+            region (str): 'local' or 'export'.
+            month (int): 1 to 12.
+            limit (int): projects listed before the rest is summed up in
+                ``others``, ``BREAKDOWN_LIMIT`` by default.
+
+        Returns:
+            dict: {'projects': [{'project_id', 'project', 'amount'}],
+            'others': {'count', 'amount'}, 'total'}
+        """
+        if metric not in self.BREAKDOWN_METRICS or region not in ('local', 'export'):
+            raise UserError(_("Unknown breakdown %s/%s", metric, region))
+        if not year:
+            year = fields.Date.today().year
+        limit = self.BREAKDOWN_LIMIT if limit is None else max(int(limit), 0)
+
+        vals = self._get_snapshot_vals(year, consolidated)
+        key = self._get_breakdown_key(self._get_snapshot_key(dict(vals, company_id=self.env.company.id)))
+        Snapshot = self.env['druksmart_dashboard.snapshot'].sudo()
+        breakdowns = Snapshot._read(key)
+        if breakdowns is None:
+            # no dashboard of these filters was computed yet (or it was
+            # dropped by the autovacuum)
+            self._get_dashboard_snapshot(vals)
+            breakdowns = Snapshot._read(key) or '{}'
+        months = self._json_loads(breakdowns).get(metric, {}).get('%s_%s' % (region, metric)) or []
+        amounts, names = defaultdict(float), {}
+        for item in months[int(month) - 1] if 0 < int(month) <= len(months) else []:
+            amounts[item['project_id']] += item['amount']
+            names[item['project_id']] = item['project']
+        ranked = sorted(amounts.items(), key=lambda item: -item[1])
+        others = ranked[limit:]
+        return {
+            'projects': [
+                {'project_id': project_id, 'project': names[project_id], 'amount': round(amount, 2)}
+                for project_id, amount in ranked[:limit]
+            ],
+            'others': {'count': len(others), 'amount': round(sum(amount for _, amount in others), 2)},
+            'total': round(sum(amounts.values()), 2),
+        }
+
+    def _store_snapshot(self, key):
+        """Store the payload under ``key`` and its project breakdowns apart, under
+        ``_get_breakdown_key``: the payload is served as is and the breakdowns
+        are read one bar at a time by ``get_breakdown``."""
+        self.ensure_one()
+        data = self.with_context(dashboard_snapshot=True)._get_dashboard_data()
+        breakdowns = data.pop('breakdowns')
+        self.last_update = fields.Datetime.now()
+        data = self._json_dumps(data)
+        Snapshot = self.env['druksmart_dashboard.snapshot'].sudo()
+        Snapshot._write(key, self._name, data)
+        Snapshot._write(self._get_breakdown_key(key), self._name, self._json_dumps(breakdowns))
+        return data, self.env.cr.cache.pop('druksmart_dashboard.perf', None)
 
     def _get_dashboard_data(self):
         self.ensure_one()
         year = int(self.year)
 
-        sales_data = self._get_sales_data(year)
-        revenue_data = self._get_revenue_data(year)
-        expenses_data = self._get_expenses_data(year)
-        cash_flow_data = self._get_cashflow_data(year)
+        perf = self._perf_start()
+        # sale orders are not covered by the lock dates: only the ledger
+        # sections reuse closed months
+        sections = [
+            ('sales', '_get_sales_data', (year,), True),
+            ('revenue', '_get_ledger_section', ('_get_revenue_data', year), True),
+            ('expenses', '_get_ledger_section', ('_get_expenses_data', year), True),
+            # payments are matched to invoices through their reconciliation,
+            # which can still change after the lock date: never cached
+            ('cash_flow', '_get_cashflow_data', (year,), True),
+        ]
+        company_data = []
+        if self.consolidated:
+            companies = self.env.companies
+            per_company = self._run_sections(sections, perf, companies=companies)
+            closing_date = min(date(year, 12, 31), fields.Date.context_today(self))
+            sections, converted = self._consolidate(per_company, closing_date)
+            for company in companies:
+                company_data.append(self._get_company_drilldown(company, converted[company.id]))
+            company_info = {
+                'name': _('Consolidated (%s companies)', len(companies)),
+                'currency': self.env.company.currency_id.symbol,
+                'country': _('Not Set'),
+            }
+        else:
+            sections = self._run_sections(sections, perf)
+            company_info = {
+                'name': self.company_id.name,
+                'currency': self.currency_id.symbol,
+                'country': self.company_id.country_id.name or _('Not Set'),
+            }
+        sales_data = sections['sales']
+        revenue_data = sections['revenue']
+        expenses_data = sections['expenses']
+        cash_flow_data = sections['cash_flow']
+        # the per-project breakdowns of every month leave the charts: they are
+        # stored apart from the snapshot, for ``get_breakdown``
+        breakdowns = {
+            metric: {key: entry.pop('breakdown') for key, entry in sections[metric].items() if 'breakdown' in entry}
+            for metric in self.BREAKDOWN_METRICS
+        }
 
         global_max = self._get_global_max(sales_data, revenue_data, expenses_data, cash_flow_data)
 
-        return {
+        return self._perf_finish({
             'filters': {'year': year},
-            'company': {
-                'name': self.company_id.name,
-                'currency': self.currency_id.symbol,
-                'country': self.company_id.country_id.name or _('Not Set'),
-            },
+            'company': company_info,
+            'consolidated': bool(self.consolidated),
+            'companies': company_data,
             'sales': sales_data,
             'revenue': revenue_data,
             'expenses': expenses_data,
             'cash_flow': cash_flow_data,
             'global_max': global_max,
+            'breakdowns': breakdowns,
             'last_update': fields.Datetime.to_string(fields.Datetime.now())
+        }, perf)
+
+    def _get_ledger_section(self, method, year):
+        """Monthly ledger section, months closed by the lock date coming from the period cache."""
+        section = self._get_closed_months_cached(method, year)
+        for entry in section.values():
+            entry['sum'] = self._format_amount(sum(entry['amounts']))
+        return section
+
+    def _get_company_drilldown(self, company, sections):
+        """Monthly totals of one company of a consolidated dashboard (already converted)."""
+        return {
+            'id': company.id,
+            'name': company.name,
+            'currency': company.currency_id.name,
+            'sales': self._format_amount(sum(sections['sales']['total']['amounts'])),
+            'revenue': self._format_amount(sum(sections['revenue']['total']['amounts'])),
+            'expenses': self._format_amount(sum(sections['expenses']['total']['amounts'])),
+            'inflow': self._format_amount(sum(sections['cash_flow']['total']['inflow'])),
+            'outflow': self._format_amount(sum(sections['cash_flow']['total']['outflow'])),
+            'monthly': {
+                'sales': [round(v, 2) for v in sections['sales']['total']['amounts']],
+                'revenue': [round(v, 2) for v in sections['revenue']['total']['amounts']],
+                'expenses': [round(v, 2) for v in sections['expenses']['total']['amounts']],
+            },
         }
 
     def _get_global_max(self, sales, revenue, expenses, cash_flow):
@@ -285,7 +431,7 @@ class L2Dashboard(models.Model):
             'export_sales': {'months': months, 'amounts': export_monthly, 'sum': self._format_amount(sum(export_monthly)), 'breakdown': export_breakdown},
         }
 
-    def _get_revenue_data(self, year):
+    def _get_revenue_data(self, year, month_from=1):
         months = self._month_names()
         total_monthly = self._zeros()
         local_monthly = self._zeros()
@@ -294,7 +440,7 @@ class L2Dashboard(models.Model):
         local_m_buckets = self._month_buckets()
         export_m_buckets = self._month_buckets()
 
-        start_date = f"{year}-01-01"
+        start_date = self._month_start(year, month_from)
         end_date = f"{year}-12-31"
 
         company = self.env.company
@@ -390,7 +536,7 @@ class L2Dashboard(models.Model):
             'export_revenue': {'months': months, 'amounts': export_monthly, 'sum': self._format_amount(sum(export_monthly)), 'breakdown': export_breakdown},
         }
 
-    def _get_expenses_data(self, year):
+    def _get_expenses_data(self, year, month_from=1):
         months = self._month_names()
         total_monthly = self._zeros()
         local_monthly = self._zeros()
@@ -400,7 +546,7 @@ class L2Dashboard(models.Model):
         local_m_buckets = self._month_buckets()
         export_m_buckets = self._month_buckets()
 
-        start_date = f"{year}-01-01"
+        start_date = self._month_start(year, month_from)
         end_date = f"{year}-12-31"
 
         company = self.env.company
@@ -513,7 +659,7 @@ class L2Dashboard(models.Model):
             }
         }
 
-    def _get_cashflow_data(self, year):
+    def _get_cashflow_data(self, year, month_from=1):
         months = self._month_names()
 
         inflow_total = self._zeros()
@@ -523,7 +669,7 @@ class L2Dashboard(models.Model):
         inflow_export = self._zeros()
         outflow_export = self._zeros()
 
-        start_date = f'{year}-01-01'
+        start_date = self._month_start(year, month_from)
         end_date = f'{year}-12-31'
 
         company_currency = self.env.company.currency_id
@@ -677,13 +823,17 @@ class L2Dashboard(models.Model):
         total_fmt = wb.add_format({'border': 1, 'num_format': '#,##0.00', 'bold': True, 'bg_color': '#FFF2CC'})
         zebra = wb.add_format({'border': 1, 'num_format': '#,##0.00', 'bg_color': '#FAFAFA'})
 
+        # consolidated workbooks cover every selected company
+        company_names = (', '.join(self.env.companies.mapped('name')) if self.consolidated
+                         else self.company_id.name)
+
         def setup_sheet(name):
             ws = wb.add_worksheet(name)
             # Column widths to avoid "#####"
             ws.set_column('A:A', 16)    # Month
             ws.set_column('B:Z', 18)    # Amount columns
             # Header row (title + meta)
-            ws.merge_range(0, 0, 0, 5, f"{name} – {self.company_id.name}", title_fmt)
+            ws.merge_range(0, 0, 0, 5, f"{name} – {company_names}", title_fmt)
             ws.write(0, 6, f"Year: {self.year}   |   Generated: {fields.Datetime.now().strftime('%Y-%m-%d %H:%M')}", meta_fmt)
             # Print settings (looks nice if printed)
             ws.set_landscape()
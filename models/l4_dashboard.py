@@ -12,10 +12,14 @@ _logger = logging.getLogger(__name__)
 
 class L4Dashboard(models.Model):
     _name = 'l4.dashboard'
+    _inherit = ['druksmart_dashboard.mixin']
     _description = 'L4 Dashboard Data'
     _rec_name = 'name'
     _order = 'create_date desc'
 
+    COLUMNAR_ROWS = (('projects',),)
+    DASHBOARD_FILTER_FIELDS = ('company_id', 'year', 'month', 'quarter', 'tag_type')
+
     name = fields.Char(string='L4 Dashboard', default=lambda self: _('L4 Dashboard - %s') % fields.Date.today().strftime('%Y'))
     dashboard_data = fields.Text(string='Dashboard Data', compute='_compute_dashboard_data', store=False)
     last_update = fields.Datetime(string='Last Update', readonly=True)
@@ -53,14 +57,25 @@ class L4Dashboard(models.Model):
     @api.depends('year', 'company_id', 'tag_type', 'month', 'quarter')
     def _compute_dashboard_data(self):
         """Compute dashboard data based on current filters"""
+        # with ``dashboard_lazy`` (set by the dashboard action) the form only
+        # carries the filters: the widget fetches the projects itself
+        lazy = self.env.context.get('dashboard_lazy')
         for record in self:
             try:
-                data = record._get_dashboard_data()
-                record.dashboard_data = json.dumps(data)
+                if lazy:
+                    data = {'lazy': True, 'filters': {
+                        'year': record.year,
+                        'tag_type': record.tag_type,
+                        'month': record.month,
+                        'quarter': record.quarter,
+                    }}
+                else:
+                    data = record._get_dashboard_data()
+                record.dashboard_data = self._json_dumps(data)
                 record.last_update = fields.Datetime.now()
             except Exception as e:
                 _logger.error(f"Error computing dashboard data: {e}")
-                record.dashboard_data = json.dumps({
+                record.dashboard_data = self._json_dumps({
                     'error': str(e),
                     'filters': {
                         'year': record.year,
@@ -75,25 +90,13 @@ class L4Dashboard(models.Model):
         """API method to get dashboard data in JSON format"""
         if not year:
             year = fields.Date.today().year
-            
-        dashboard = self.search([
-            ('year', '=', year),
-            ('month', '=', month),
-            ('quarter', '=', quarter),
-            ('tag_type', '=', tag_type or 'all'),
-            ('company_id', '=', self.env.company.id)
-        ], limit=1)
-        
-        if not dashboard:
-            dashboard = self.create({
-                'year': year,
-                'month': month,
-                'quarter': quarter,
-                'tag_type': tag_type or 'all',
-            })
-        
-        dashboard._compute_dashboard_data()
-        return dashboard.dashboard_data
+
+        return self._get_dashboard_snapshot({
+            'year': str(year),
+            'month': month or False,
+            'quarter': quarter or False,
+            'tag_type': tag_type or 'all',
+        })
 
     def _get_dashboard_data(self):
         """Compute all dashboard data and return as a structured dictionary"""
@@ -129,9 +132,13 @@ class L4Dashboard(models.Model):
         
         tag_type = self.tag_type or 'all'
 
-        project_rows = self._get_project_rows(start_date, end_date, tag_type)
-        
-        return {
+        perf = self._perf_start()
+        with self._perf_section('projects', perf):
+            project_rows = self._get_project_rows(start_date, end_date, tag_type)
+        with self._perf_section('summary', perf):
+            summary = self._get_dashboard_summary(project_rows)
+
+        return self._perf_finish({
             'filters': {
                 'year': year,
                 'month': int(self.month) if self.month else 0,
@@ -146,8 +153,8 @@ class L4Dashboard(models.Model):
                 'country': self.company_id.country_id.name or _('Not Set')
             },
             'projects': project_rows,
-            'summary': self._get_dashboard_summary(project_rows),
-        }
+            'summary': summary,
+        }, perf)
         
     def _get_region_projects(self, tag_type):
         """Get projects based on region tag
@@ -209,6 +216,11 @@ class L4Dashboard(models.Model):
 
         # Get projects by region tag
         local_projects, export_projects, local_analytic_ids, export_analytic_ids = self._get_region_projects(tag_type)
+
+        # Vendor bills per project, summed once from the monthly cube (None
+        # while a year of the period is not built: bills are then scanned)
+        rollup = self.env['druksmart_dashboard.monthly_cube']._get_built_rollup(
+            self.company_id or self.env.company, start_date, end_date)
         
         # Process each sales order
         results = []
@@ -237,7 +249,8 @@ class L4Dashboard(models.Model):
                     try:
                         if project in projects:
                             data = self._get_project_data(project, order, start_date, end_date, 
-                                                        local_analytic_ids if project_region == 'Local' else export_analytic_ids)
+                                                        local_analytic_ids if project_region == 'Local' else export_analytic_ids,
+                                                        rollup=rollup)
                             data['region'] = project_region
                             results.append(data)
                     except Exception as e:
@@ -285,7 +298,8 @@ class L4Dashboard(models.Model):
                             try:
                                 if project in projects:
                                     data = self._get_project_data(project, order, start_date, end_date,
-                                                                local_analytic_ids if project_region == 'Local' else export_analytic_ids)
+                                                                local_analytic_ids if project_region == 'Local' else export_analytic_ids,
+                                                                rollup=rollup)
                                     data['region'] = project_region
                                     results.append(data)
                             except Exception as e:
@@ -296,7 +310,7 @@ class L4Dashboard(models.Model):
         
         return results
 
-    def _get_project_data(self, project, sale_order, start_date, end_date, analytic_ids):
+    def _get_project_data(self, project, sale_order, start_date, end_date, analytic_ids, rollup=None):
         """Calculate financial data for a project
         
         Args:
@@ -305,6 +319,8 @@ class L4Dashboard(models.Model):
             start_date: Start date string
             end_date: End date string
             analytic_ids: List of analytic account IDs
+            rollup: Monthly cube roll-up of the period, the vendor bills are
+                scanned without it
             
         Returns:
             dict: Project financial data
@@ -366,9 +382,14 @@ class L4Dashboard(models.Model):
         else:
             data["outstanding_aging"] = 0
 
-        # Calculate vendor bills and payments
-        vendor_bills_data = self._get_project_vendor_bills_data(project, start_date, end_date)
-        
+        # Vendor bills of the period and those of them already paid
+        if rollup is None:
+            vendor_bills_data = self._get_project_vendor_bills_data(project, start_date, end_date)
+        else:
+            vendor_bills_data = {
+                'total_amount': rollup['vendor_bills']['projects'].get(project.id, 0.0),
+                'paid_amount': rollup['vendor_paid']['projects'].get(project.id, 0.0),
+            }
         data["vendor_invoice"] = vendor_bills_data['total_amount']
         data["payment_made"] = vendor_bills_data['paid_amount']
         data["payment_to_be_made"] = data["vendor_invoice"] - data["payment_made"]
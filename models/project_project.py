@@ -0,0 +1,43 @@
+from odoo import api, models
+
+# Fields of a project its Local/Export classification depends on
+CLASSIFICATION_FIELDS = {'tag_ids', 'analytic_account_id', 'active'}
+
+
+class ProjectProject(models.Model):
+    _inherit = 'project.project'
+
+    # Roll-up cubes whose cells are classified by project
+    _dashboard_cubes = ('druksmart_dashboard.monthly_cube', 'sale.target.cube')
+
+    def _mark_dashboard_cubes(self):
+        """The classification changed: every built year of the cubes must be rebuilt."""
+        self.env['druksmart_dashboard.cube_stale'].sudo()._mark_all(self._dashboard_cubes)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        projects = super().create(vals_list)
+        if any(CLASSIFICATION_FIELDS & set(vals) for vals in vals_list):
+            projects._mark_dashboard_cubes()
+        return projects
+
+    def write(self, vals):
+        res = super().write(vals)
+        if CLASSIFICATION_FIELDS & set(vals):
+            self._mark_dashboard_cubes()
+        return res
+
+    def unlink(self):
+        self._mark_dashboard_cubes()
+        return super().unlink()
+
+
+class ProjectTags(models.Model):
+    _inherit = 'project.tags'
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'name' in vals:
+            # the classification matches the tags by name
+            self.env['project.project']._mark_dashboard_cubes()
+        return res
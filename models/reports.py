@@ -6,15 +6,28 @@ import io
 import xlsxwriter
 
 from odoo import api, fields, models, _
-from odoo.tools import date_utils, float_round
+from odoo.tools import date_utils
 
 _logger = logging.getLogger(__name__)
 
 
 class DashboardReports(models.Model):
     _name = 'druksmart_dashboard.reports'
+    _inherit = ['druksmart_dashboard.mixin']
     _description = 'DrukSmart Dashboard Reports'
 
+    DASHBOARD_FILTER_FIELDS = ('company_id', 'category', 'year', 'month', 'quarter')
+
+    COLUMNAR_ROWS = (
+        ('sales_data', 'sales'),
+        ('revenue_data', 'revenues'),
+        ('expense_data', 'expenses'),
+        ('cashflow_data', 'cashflows', 'inflows', 'locals'),
+        ('cashflow_data', 'cashflows', 'inflows', 'exports'),
+        ('cashflow_data', 'cashflows', 'outflows', 'locals'),
+        ('cashflow_data', 'cashflows', 'outflows', 'exports'),
+    )
+
     name = fields.Char(string='Dashboard Name', default='Reports')
     category = fields.Selection([
         ('sales', 'Sales'),
@@ -56,8 +69,20 @@ class DashboardReports(models.Model):
 
     @api.depends('category', 'year', 'month', 'company_id', "quarter")
     def _compute_dashboard_data(self):
+        # with ``dashboard_lazy`` (set by the report action) the form only
+        # carries the filters: the widget fetches the rows itself
+        lazy = self.env.context.get('dashboard_lazy')
         for record in self:
-            record.dashboard_data = json.dumps(record._get_dashboard_data())
+            if lazy:
+                data = {'lazy': True, 'filters': {
+                    'category': record.category,
+                    'year': record.year,
+                    'month': record.month,
+                    'quarter': record.quarter,
+                }}
+            else:
+                data = record._get_dashboard_data()
+            record.dashboard_data = self._json_dumps(data)
             record.last_update = fields.Datetime.now()
 
     @api.model
@@ -66,25 +91,13 @@ class DashboardReports(models.Model):
 
         if not year:
             year = str(fields.Date.today().year)
-            
-        dashboard = self.search([
-            ('category', '=', category),
-            ('year', '=', str(year)),
-            ('month', '=', month),
-            ('quarter', '=', quarter),
-            ('company_id', '=', self.env.company.id)
-        ], limit=1)
-        
-        if not dashboard:
-            dashboard = self.create({
-                'category': category,
-                'year': str(year),
-                'month': month,
-                'quarter': quarter,
-            })
-        
-        dashboard._compute_dashboard_data()
-        return dashboard.dashboard_data
+
+        return self._get_dashboard_snapshot({
+            'category': category,
+            'year': str(year),
+            'month': month or False,
+            'quarter': quarter or False,
+        })
 
     def _get_dashboard_data(self):
         """Compute all dashboard data and return as a structured dictionary"""
@@ -158,24 +171,65 @@ class DashboardReports(models.Model):
         }
         
         # Populate data based on category
-        if category == 'sales':
-            sales_data = self._get_sales_data(start_date, end_date)
-            response['sales_data'] = sales_data
-        elif category == 'revenue':
-            revenue_data = self._get_revenue_data(start_date, end_date)
-            response['revenue_data'] = revenue_data
-        elif category == 'expense':
-            expense_data = self.get_expense_data(start_date, end_date)
-            response['expense_data'] = expense_data
-        elif category == 'cashflow':
-            cashflow_data = self.get_cashflow_data(start_date, end_date)
-            response['cashflow_data'] = cashflow_data
-
-        return response
-    
-    def _format_amount(self, amount):
-        """Format amount to match the dashboard display format"""
-        return f"{float_round(round(amount, 2), 2):,.2f}"
+        perf = self._perf_start()
+        with self._perf_section(category, perf):
+            if category == 'sales':
+                sales_data = self._get_sales_data(start_date, end_date)
+                response['sales_data'] = sales_data
+            elif category == 'revenue':
+                revenue_data = self._get_revenue_data(start_date, end_date)
+                response['revenue_data'] = revenue_data
+            elif category == 'expense':
+                expense_data = self.get_expense_data(start_date, end_date)
+                response['expense_data'] = expense_data
+            elif category == 'cashflow':
+                # not cached: payments are matched to invoices through their
+                # reconciliation, which can still change after the lock date
+                cashflow_data = self.get_cashflow_data(start_date, end_date)
+                response['cashflow_data'] = cashflow_data
+        with self._perf_section('ttm', perf):
+            response['ttm_data'] = self._get_ttm_data(category, end_date)
+
+        # amounts are numbers in the company currency, except the untaxed
+        # amounts of sale orders which are in the currency the row names
+        row_currencies = {row['currency'] for row in response['sales_data']['sales']}
+        response['schema'] = self.PAYLOAD_SCHEMA
+        response['format'] = self._get_payload_format(
+            self.company_id.currency_id,
+            self.env['res.currency'].search([('name', 'in', list(row_currencies))]) if row_currencies else None,
+        )
+        return self._perf_finish(response, perf)
+
+    def _get_ttm_data(self, category, end_date):
+        """Trailing twelve months region totals of the category, from the monthly cube.
+
+        Args:
+            category (str): Report category ('sales', 'revenue', 'expense' or 'cashflow')
+            end_date (str): Last day of the selected period
+
+        Returns:
+            dict: Local/export/other/total amounts per cube metric
+        """
+        metrics = {
+            'sales': ('sales',),
+            'revenue': ('revenue',),
+            'expense': ('expenses',),
+            'cashflow': ('cash_in', 'cash_out'),
+        }.get(category, ())
+        if not metrics:
+            return {}
+        ttm = self.env['druksmart_dashboard.monthly_cube']._get_ttm_rollup(
+            self.company_id or self.env.company, end_date)
+        if ttm is None:
+            # left out until the cron has built the cube of the window
+            return {}
+        return {
+            metric: {
+                key: round(ttm[metric][key], 2)
+                for key in ('local', 'export', 'other', 'total')
+            }
+            for metric in metrics
+        }
     
     def _get_sales_data(self, start_date, end_date):
         """Get sales related data for dashboard reports"""
@@ -241,9 +295,6 @@ class DashboardReports(models.Model):
                 else:
                     converted_amount = untaxed_amount
 
-                comapany_currancy_icon = self.company_id.currency_id.symbol or ''
-                sale_currancy_icon = sale_order.currency_id.symbol or ''
-
                 sales_data.append({
                     "id": sale_id_counter,
                     "date": sale_order.date_order.strftime('%Y-%m-%d'),
@@ -252,8 +303,9 @@ class DashboardReports(models.Model):
                     "tags": tags,
                     "customer": sale_order.partner_id.name,
                     "sale_person": sale_order.user_id.name,
-                    "untaxed_amount": f"{sale_currancy_icon}{self._format_amount(untaxed_amount)}",
-                    "converted_amount": f"{comapany_currancy_icon}{self._format_amount(converted_amount)}",
+                    "untaxed_amount": round(untaxed_amount, 2),
+                    "currency": sale_order.currency_id.name,
+                    "converted_amount": round(converted_amount, 2),
                 })
                 sale_id_counter += 1
                 # Update totals - now includes Other
@@ -347,9 +399,6 @@ class DashboardReports(models.Model):
                 else:
                     converted_amount = total_untaxed_amount
 
-                comapany_currancy_icon = self.company_id.currency_id.symbol or ''
-                sale_currancy_icon = sale_order.currency_id.symbol or ''
-
                 sales_data.append({
                     "id": sale_id_counter,
                     "date": sale_order.date_order.strftime('%Y-%m-%d'),
@@ -358,8 +407,9 @@ class DashboardReports(models.Model):
                     "tags": tags,
                     "customer": sale_order.partner_id.name,
                     "sale_person": sale_order.user_id.name,
-                    "untaxed_amount": f"{sale_currancy_icon}{self._format_amount(total_untaxed_amount)}",
-                    "converted_amount": f"{comapany_currancy_icon}{self._format_amount(converted_amount)}",
+                    "untaxed_amount": round(total_untaxed_amount, 2),
+                    "currency": sale_order.currency_id.name,
+                    "converted_amount": round(converted_amount, 2),
                 })
                 sale_id_counter += 1
                 # Update totals - now includes Other and Mixed
@@ -373,18 +423,17 @@ class DashboardReports(models.Model):
                     total_other_untaxed += converted_amount
                     total_other_untaxed_not_converted += total_untaxed_amount
 
-        company_currancy_icon = self.company_id.currency_id.symbol or ''
         total_sales_untaxed = total_local_untaxed + total_export_untaxed + total_other_untaxed
 
         return {
             'sales': sales_data,
-            'total_sales_local_untaxed': f"{company_currancy_icon}{self._format_amount(total_local_untaxed)}",
-            'total_sales_export_untaxed': f"{company_currancy_icon}{self._format_amount(total_export_untaxed)}",
-            'total_sales_other_untaxed': f"{company_currancy_icon}{self._format_amount(total_other_untaxed)}",  # Added Other total
-            'total_sales_local_untaxed_not_converted': f"{self._format_amount(total_local_untaxed_not_converted)}",
-            'total_sales_export_untaxed_not_converted': f"{self._format_amount(total_export_untaxed_not_converted)}",
-            'total_sales_other_untaxed_not_converted': f"{self._format_amount(total_other_untaxed_not_converted)}",  # Added Other total
-            'total_sales_untaxed': f"{company_currancy_icon}{self._format_amount(total_sales_untaxed)}"  # Added Other total
+            'total_sales_local_untaxed': round(total_local_untaxed, 2),
+            'total_sales_export_untaxed': round(total_export_untaxed, 2),
+            'total_sales_other_untaxed': round(total_other_untaxed, 2),  # Added Other total
+            'total_sales_local_untaxed_not_converted': round(total_local_untaxed_not_converted, 2),
+            'total_sales_export_untaxed_not_converted': round(total_export_untaxed_not_converted, 2),
+            'total_sales_other_untaxed_not_converted': round(total_other_untaxed_not_converted, 2),  # Added Other total
+            'total_sales_untaxed': round(total_sales_untaxed, 2)  # Added Other total
         }
     
     def _get_revenue_data(self, start_date, end_date):
@@ -499,7 +548,7 @@ class DashboardReports(models.Model):
                 "local_export": invoice_category,
                 "tags": ', '.join(sorted(invoice_tags)) if invoice_tags else '',
                 "customer": invoice.partner_id.name or '',
-                "untaxed_amount": self._format_amount(invoice_amount),
+                "untaxed_amount": round(invoice_amount, 2),
                 "payment_status": payment_state_mapping.get(invoice.payment_state, invoice.payment_state or ''),
                 "project": linked_project.name if linked_project else '',
             })
@@ -521,13 +570,13 @@ class DashboardReports(models.Model):
 
         return {
             'revenues': revenues,
-            'total_local_revenue_untaxed': self._format_amount(total_local_revenue_signed),
-            'total_export_revenue_untaxed': self._format_amount(total_export_revenue_signed),
-            'total_other_revenue_untaxed': self._format_amount(total_other_revenue_signed),
-            'total_local_revenue_untaxed_not_converted': self._format_amount(total_local_revenue),
-            'total_export_revenue_untaxed_not_converted': self._format_amount(total_export_revenue),
-            'total_other_revenue_untaxed_not_converted': self._format_amount(total_other_revenue),
-            'total_revenue_untaxed': self._format_amount(total_revenue_signed)
+            'total_local_revenue_untaxed': round(total_local_revenue_signed, 2),
+            'total_export_revenue_untaxed': round(total_export_revenue_signed, 2),
+            'total_other_revenue_untaxed': round(total_other_revenue_signed, 2),
+            'total_local_revenue_untaxed_not_converted': round(total_local_revenue, 2),
+            'total_export_revenue_untaxed_not_converted': round(total_export_revenue, 2),
+            'total_other_revenue_untaxed_not_converted': round(total_other_revenue, 2),
+            'total_revenue_untaxed': round(total_revenue_signed, 2)
         }
 
     def get_expense_data(self, start_date, end_date):
@@ -648,7 +697,7 @@ class DashboardReports(models.Model):
                 "local_export": bill_category,
                 "tags": ', '.join(sorted(bill_tags)) if bill_tags else '',
                 "source_document": bill.invoice_origin or '',
-                "tax_excluded": self._format_amount(bill_amount),
+                "tax_excluded": round(bill_amount, 2),
                 "payment_status": payment_state_mapping.get(bill.payment_state, bill.payment_state or ''),
                 "project": linked_project.name if linked_project else '',
             })
@@ -670,14 +719,14 @@ class DashboardReports(models.Model):
 
         return {
             'expenses': expenses,
-            'total_expenses_local_untaxed': self._format_amount(total_local_expense_signed),
-            'total_expenses_export_untaxed': self._format_amount(total_export_expense_signed),
-            'total_expenses_other_untaxed': self._format_amount(total_other_expense_signed),
-            'total_expenses_local_untaxed_not_converted': self._format_amount(total_local_expense),
-            'total_expenses_export_untaxed_not_converted': self._format_amount(total_export_expense),
-            'total_expenses_other_untaxed_not_converted': self._format_amount(total_other_expense),
-            'total_expense_untaxed': self._format_amount(total_expense_signed),
-            # 'total_expense_signed': self._format_amount(),
+            'total_expenses_local_untaxed': round(total_local_expense_signed, 2),
+            'total_expenses_export_untaxed': round(total_export_expense_signed, 2),
+            'total_expenses_other_untaxed': round(total_other_expense_signed, 2),
+            'total_expenses_local_untaxed_not_converted': round(total_local_expense, 2),
+            'total_expenses_export_untaxed_not_converted': round(total_export_expense, 2),
+            'total_expenses_other_untaxed_not_converted': round(total_other_expense, 2),
+            'total_expense_untaxed': round(total_expense_signed, 2),
+            # 'total_expense_signed': 0.0,
         }
 
     def get_cashflow_data(self, start_date, end_date):
@@ -702,13 +751,13 @@ class DashboardReports(models.Model):
                     },
                 },
                 'company_currency_icon': company_currency_icon,
-                'total_local_cashflow_inflow': f"{self._format_amount(0.0)}",
-                'total_export_cashflow_inflow': f"{self._format_amount(0.0)}",
-                'total_local_cashflow_outflow': f"{self._format_amount(0.0)}",
-                'total_export_cashflow_outflow': f"{self._format_amount(0.0)}",
-                'net_local_cashflow': f"{self._format_amount(0.0)}",
-                'net_export_cashflow': f"{self._format_amount(0.0)}",
-                'total_net_cashflow': f"{self._format_amount(0.0)}",
+                'total_local_cashflow_inflow': 0.0,
+                'total_export_cashflow_inflow': 0.0,
+                'total_local_cashflow_outflow': 0.0,
+                'total_export_cashflow_outflow': 0.0,
+                'net_local_cashflow': 0.0,
+                'net_export_cashflow': 0.0,
+                'total_net_cashflow': 0.0,
             }
 
         # Get project tags
@@ -804,7 +853,7 @@ class DashboardReports(models.Model):
                                         "local_export": region,
                                         "tags": project_tags,
                                         "source_document": invoice.name or '',
-                                        "payment_amount": f"{self._format_amount(amount_in_company_currency)}",
+                                        "payment_amount": round(amount_in_company_currency, 2),
                                         "payment_status": payment.state or '',
                                     }
                                     
@@ -822,7 +871,7 @@ class DashboardReports(models.Model):
                                         "local_export": region,
                                         "tags": project_tags,
                                         "source_document": invoice.name or '',
-                                        "payment_amount": f"{self._format_amount(amount_in_company_currency)}",
+                                        "payment_amount": round(amount_in_company_currency, 2),
                                         "payment_status": payment.state or '',
                                     }
                                     cashflows['inflows']['exports'].append(cashflow_entry)
@@ -882,7 +931,7 @@ class DashboardReports(models.Model):
                                         "local_export": region,
                                         "tags": project_tags,
                                         "source_document": bill.name or '',
-                                        "payment_amount": f"{self._format_amount(amount_in_company_currency)}",
+                                        "payment_amount": round(amount_in_company_currency, 2),
                                         "payment_status": payment.state or '',
                                     }
                                     cashflows['outflows']['locals'].append(cashflow_entry)
@@ -899,7 +948,7 @@ class DashboardReports(models.Model):
                                         "local_export": region,
                                         "tags": project_tags,
                                         "source_document": bill.name or '',
-                                        "payment_amount": f"{self._format_amount(amount_in_company_currency)}",
+                                        "payment_amount": round(amount_in_company_currency, 2),
                                         "payment_status": payment.state or '',
                                     }
                                     cashflows['outflows']['exports'].append(cashflow_entry)
@@ -918,13 +967,13 @@ class DashboardReports(models.Model):
         return {
             'cashflows': cashflows,
             'company_currency_icon': company_currency_icon,
-            'total_local_cashflow_inflow': self._format_amount(total_local_inflow),
-            'total_export_cashflow_inflow': self._format_amount(total_export_inflow),
-            'total_local_cashflow_outflow': self._format_amount(total_local_outflow),
-            'total_export_cashflow_outflow': self._format_amount(total_export_outflow),
-            'net_local_cashflow': self._format_amount(net_local_cashflow),
-            'net_export_cashflow': self._format_amount(net_export_cashflow),
-            'total_net_cashflow': self._format_amount(net_local_cashflow + net_export_cashflow)
+            'total_local_cashflow_inflow': round(total_local_inflow, 2),
+            'total_export_cashflow_inflow': round(total_export_inflow, 2),
+            'total_local_cashflow_outflow': round(total_local_outflow, 2),
+            'total_export_cashflow_outflow': round(total_export_outflow, 2),
+            'net_local_cashflow': round(net_local_cashflow, 2),
+            'net_export_cashflow': round(net_export_cashflow, 2),
+            'total_net_cashflow': round(net_local_cashflow + net_export_cashflow, 2)
         }
     
     def export_excel(self):
@@ -938,17 +987,6 @@ class DashboardReports(models.Model):
 
         bold = workbook.add_format({'bold': True})
 
-        def parse_numeric(val):
-            if val is None:
-                return 0
-            if isinstance(val, str):
-                val = val.replace(',', '').replace('Nu.', '').replace('₹', '').replace('$', '').strip()
-                try:
-                    return float(val)
-                except ValueError:
-                    return 0
-            return val
-
         # Header
         worksheet.write(0, 0, 'Company', bold)
         worksheet.write(0, 1, data['company']['name'])
@@ -976,8 +1014,8 @@ class DashboardReports(models.Model):
                 worksheet.write(row, 2, record.get('tags'))
                 worksheet.write(row, 3, record.get('customer'))
                 worksheet.write(row, 4, record.get('sale_person'))
-                worksheet.write_number(row, 5, parse_numeric(record.get('untaxed_amount')))
-                worksheet.write_number(row, 6, parse_numeric(record.get('converted_amount')))
+                worksheet.write_number(row, 5, record.get('untaxed_amount') or 0.0)
+                worksheet.write_number(row, 6, record.get('converted_amount') or 0.0)
                 row += 1
 
             # row += 1
@@ -994,16 +1032,16 @@ class DashboardReports(models.Model):
                 worksheet.write(row, 2, record.get('tags'))
                 worksheet.write(row, 3, record.get('customer'))
                 worksheet.write(row, 4, record.get('sale_person'))
-                worksheet.write_number(row, 5, parse_numeric(record.get('untaxed_amount')))
-                worksheet.write_number(row, 6, parse_numeric(record.get('converted_amount')))
+                worksheet.write_number(row, 5, record.get('untaxed_amount') or 0.0)
+                worksheet.write_number(row, 6, record.get('converted_amount') or 0.0)
                 row += 1
 
             row += 1
             worksheet.write(row, 4, "Total Local Untaxed", bold)
-            worksheet.write_number(row, 5, parse_numeric(data['sales_data']['total_sales_local_untaxed']))
+            worksheet.write_number(row, 5, data['sales_data']['total_sales_local_untaxed'])
             row += 1
             worksheet.write(row, 4, "Total Export Untaxed", bold)
-            worksheet.write_number(row, 5, parse_numeric(data['sales_data']['total_sales_export_untaxed']))
+            worksheet.write_number(row, 5, data['sales_data']['total_sales_export_untaxed'])
 
         elif category == 'revenue':
             worksheet.write_row(row, 0, ['Date', 'Invoice No', 'Tags', 'Customer', 'Untaxed Amount'], bold)
@@ -1013,16 +1051,16 @@ class DashboardReports(models.Model):
                 worksheet.write(row, 1, record.get('invoice_no'))
                 worksheet.write(row, 2, record.get('tags'))
                 worksheet.write(row, 3, record.get('customer'))
-                worksheet.write_number(row, 4, parse_numeric(record.get('untaxed_amount')))
+                worksheet.write_number(row, 4, record.get('untaxed_amount') or 0.0)
                 row += 1
 
             row += 1
             worksheet.write(row, 3, "Total Local Revenue", bold)
-            worksheet.write_number(row, 4, parse_numeric(data['revenue_data']['total_local_revenue_untaxed']))
+            worksheet.write_number(row, 4, data['revenue_data']['total_local_revenue_untaxed'])
 
             row += 1
             worksheet.write(row, 3, "Total Export Revenue", bold)
-            worksheet.write_number(row, 4, parse_numeric(data['revenue_data']['total_export_revenue_untaxed']))
+            worksheet.write_number(row, 4, data['revenue_data']['total_export_revenue_untaxed'])
 
         elif category == 'expense':
             worksheet.write_row(row, 0, ['Date', 'Vendor', 'Tags', 'Tax Excluded'], bold)
@@ -1035,7 +1073,7 @@ class DashboardReports(models.Model):
                 worksheet.write(row, 0, record.get('date'))
                 worksheet.write(row, 1, record.get('vendor'))
                 worksheet.write(row, 2, record.get('tags'))
-                amount = parse_numeric(record.get('tax_excluded'))
+                amount = record.get('tax_excluded') or 0.0
                 worksheet.write_number(row, 3, amount)
                 if 'Local' in (record.get('tags') or ''):
                     local_total += amount
@@ -1067,7 +1105,7 @@ class DashboardReports(models.Model):
                 worksheet.write(row, 3, record.get('local_export'))
                 worksheet.write(row, 4, record.get('tags'))
                 worksheet.write(row, 5, record.get('source_document'))
-                amount = parse_numeric(record.get('payment_amount'))
+                amount = record.get('payment_amount') or 0.0
                 worksheet.write_number(row, 6, amount)
                 worksheet.write(row, 7, record.get('payment_status'))
                 inflow_local_total += amount
@@ -1090,7 +1128,7 @@ class DashboardReports(models.Model):
                 worksheet.write(row, 3, record.get('local_export'))
                 worksheet.write(row, 4, record.get('tags'))
                 worksheet.write(row, 5, record.get('source_document'))
-                amount = parse_numeric(record.get('payment_amount'))
+                amount = record.get('payment_amount') or 0.0
                 worksheet.write_number(row, 6, amount)
                 worksheet.write(row, 7, record.get('payment_status'))
                 inflow_export_total += amount
@@ -1113,7 +1151,7 @@ class DashboardReports(models.Model):
                 worksheet.write(row, 3, record.get('local_export'))
                 worksheet.write(row, 4, record.get('tags'))
                 worksheet.write(row, 5, record.get('source_document'))
-                amount = parse_numeric(record.get('payment_amount'))
+                amount = record.get('payment_amount') or 0.0
                 worksheet.write_number(row, 6, amount)
                 worksheet.write(row, 7, record.get('payment_status'))
                 outflow_local_total += amount
@@ -1136,7 +1174,7 @@ class DashboardReports(models.Model):
                 worksheet.write(row, 3, record.get('local_export'))
                 worksheet.write(row, 4, record.get('tags'))
                 worksheet.write(row, 5, record.get('source_document'))
-                amount = parse_numeric(record.get('payment_amount'))
+                amount = record.get('payment_amount') or 0.0
                 worksheet.write_number(row, 6, amount)
                 worksheet.write(row, 7, record.get('payment_status'))
                 outflow_export_total += amount
@@ -1148,13 +1186,13 @@ class DashboardReports(models.Model):
 
             # Final Summary
             worksheet.write(row, 2, "Net Local Cashflow", bold)
-            worksheet.write_number(row, 3, parse_numeric(data['cashflow_data']['net_local_cashflow']))
+            worksheet.write_number(row, 3, data['cashflow_data']['net_local_cashflow'])
             row += 1
             worksheet.write(row, 2, "Net Export Cashflow", bold)
-            worksheet.write_number(row, 3, parse_numeric(data['cashflow_data']['net_export_cashflow']))
+            worksheet.write_number(row, 3, data['cashflow_data']['net_export_cashflow'])
             row += 1
             worksheet.write(row, 2, "Total Net Cashflow", bold)
-            worksheet.write_number(row, 3, parse_numeric(data['cashflow_data']['total_net_cashflow']))
+            worksheet.write_number(row, 3, data['cashflow_data']['total_net_cashflow'])
 
         workbook.close()
         output.seek(0)
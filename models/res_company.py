@@ -0,0 +1,23 @@
+from odoo import models
+
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+
+    def write(self, vals):
+        """Drop the cached dashboard periods that are open again when the fiscal year lock date moves backwards.
+
+        Entries of other companies whose scope allows this one go too: their
+        periods were closed on the earliest lock date of the scope.
+        """
+        if 'fiscalyear_lock_date' not in vals:
+            return super().write(vals)
+
+        Cache = self.env['druksmart_dashboard.period_cache'].sudo()
+        previous = {company: company.fiscalyear_lock_date for company in self}
+        res = super().write(vals)
+        for company, old_lock_date in previous.items():
+            new_lock_date = company.fiscalyear_lock_date
+            if old_lock_date and (not new_lock_date or new_lock_date < old_lock_date):
+                Cache._invalidate(company, new_lock_date)
+        return res
@@ -0,0 +1,67 @@
+from odoo import api, models
+
+# Fields of the orders and order lines the dashboard cubes read: writes to
+# any other field leave the cubes untouched
+ORDER_FIELDS = {'state', 'date_order', 'company_id', 'currency_id', 'currency_rate', 'pricelist_id', 'order_line'}
+ORDER_LINE_FIELDS = {'order_id', 'display_type', 'product_id', 'product_uom_qty', 'price_unit', 'discount', 'tax_id',
+                     'analytic_distribution'}
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    # Roll-up cubes built from the confirmed orders
+    _dashboard_cubes = ('druksmart_dashboard.monthly_cube', 'sale.target.cube')
+
+    def _get_dashboard_cube_months(self):
+        """``(company id, year, month)`` of the confirmed orders, see ``druksmart_dashboard.cube_stale``."""
+        return {
+            (order.company_id.id, order.date_order.year, order.date_order.month)
+            for order in self if order.state in ('sale', 'done') and order.date_order
+        }
+
+    def _mark_dashboard_cubes(self, months=()):
+        """Mark the months of the orders, and ``months``, stale in the dashboard cubes."""
+        self.env['druksmart_dashboard.cube_stale'].sudo()._mark(
+            self._dashboard_cubes, set(months) | self._get_dashboard_cube_months())
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        orders = super().create(vals_list)
+        orders._mark_dashboard_cubes()
+        return orders
+
+    def write(self, vals):
+        if not ORDER_FIELDS & set(vals):
+            return super().write(vals)
+        # months before the change too: the order may leave them
+        months = self._get_dashboard_cube_months()
+        res = super().write(vals)
+        self._mark_dashboard_cubes(months)
+        return res
+
+    def unlink(self):
+        self._mark_dashboard_cubes()
+        return super().unlink()
+
+
+class SaleOrderLine(models.Model):
+    _inherit = 'sale.order.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.order_id._mark_dashboard_cubes()
+        return lines
+
+    def write(self, vals):
+        if not ORDER_LINE_FIELDS & set(vals):
+            return super().write(vals)
+        months = self.order_id._get_dashboard_cube_months()
+        res = super().write(vals)
+        self.order_id._mark_dashboard_cubes(months)
+        return res
+
+    def unlink(self):
+        self.order_id._mark_dashboard_cubes()
+        return super().unlink()
@@ -1,5 +1,5 @@
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+from odoo import models, fields, api, Command, _
+from odoo.exceptions import UserError, ValidationError
 
 class SaleTarget(models.Model):
     """
@@ -23,6 +23,13 @@ class SaleTarget(models.Model):
         ('odoo', 'Odoo'),
         ('ites', 'ITES')
     ]
+
+    # Monthly phasing of the yearly amount
+    PHASING_SELECTION = [
+        ('even', 'Even'),
+        ('seasonal', 'Seasonal'),
+        ('manual', 'Manual')
+    ]
     
     year = fields.Integer(
         string='Year', 
@@ -85,6 +92,23 @@ class SaleTarget(models.Model):
         tracking=True
     )
     
+    phasing = fields.Selection(
+        selection=PHASING_SELECTION,
+        string='Phasing',
+        required=True,
+        default='even',
+        help='How the yearly target is spread over the months: evenly, '
+             'following last year\'s sales (seasonal) or with manual weights',
+        tracking=True
+    )
+
+    phasing_line_ids = fields.One2many(
+        'sale.target.phasing',
+        'target_id',
+        string='Monthly Weights',
+        copy=True
+    )
+
     description = fields.Text(
         string='Description',
         help='Additional details about the sales target'
@@ -153,3 +177,118 @@ class SaleTarget(models.Model):
                     f"A target already exists for {record.year} "
                     f"with {record.category} - {record.type} category"
                 )
+
+    def _get_dashboard_cube_months(self):
+        """Years of the targets, as ``(company id, year, 0)``, see ``druksmart_dashboard.cube_stale``."""
+        return {(target.company_id.id, target.year, 0) for target in self}
+
+    def _mark_dashboard_cubes(self, months=()):
+        """Mark the years of the targets, and ``months``, stale in the target cube."""
+        self.env['druksmart_dashboard.cube_stale'].sudo()._mark(
+            ('sale.target.cube',), set(months) | self._get_dashboard_cube_months())
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        targets = super().create(vals_list)
+        targets.filtered(lambda t: t.phasing == 'seasonal' and not t.phasing_line_ids)._compute_seasonal_phasing(even_fallback=True)
+        targets._mark_dashboard_cubes()
+        return targets
+
+    def write(self, vals):
+        months = self._get_dashboard_cube_months()
+        res = super().write(vals)
+        if vals.get('phasing') == 'seasonal' and 'phasing_line_ids' not in vals:
+            self.filtered(lambda t: not t.phasing_line_ids)._compute_seasonal_phasing(even_fallback=True)
+        self._mark_dashboard_cubes(months)
+        return res
+
+    def unlink(self):
+        self._mark_dashboard_cubes()
+        return super().unlink()
+
+    def action_compute_seasonal_phasing(self):
+        """
+        Fill the monthly weights from the previous year's actual sales of the same category and type.
+        """
+        self._compute_seasonal_phasing()
+
+    def _compute_seasonal_phasing(self, even_fallback=False):
+        """
+        Fill the monthly weights from the previous year's actual sales.
+
+        Args:
+            even_fallback (bool): split evenly when there were no sales, instead
+                of raising (for the phasing set on create/write)
+        """
+        Cube = self.env['sale.target.cube']
+        for target in self:
+            Cube._ensure_built(target.company_id, target.year - 1)
+            actuals = Cube._get_monthly_actuals(target.company_id, target.year - 1, target.category, target.type)
+            if not any(actuals) and not even_fallback:
+                raise UserError(_(
+                    "There are no actual sales in %(year)s to phase the target %(target)s from.",
+                    year=target.year - 1, target=target.display_name))
+            weights = actuals if any(actuals) else [1.0] * 12
+            target.phasing_line_ids = [Command.clear()] + [
+                Command.create({'month': str(month), 'weight': weight})
+                for month, weight in enumerate(weights, start=1)
+            ]
+
+    def _get_monthly_amounts(self):
+        """
+        Return the target amount of every month (January first) according to the phasing.
+        """
+        self.ensure_one()
+        amount = self.target_amount or 0.0
+        weights = [0.0] * 12
+        if self.phasing != 'even':
+            for line in self.phasing_line_ids:
+                weights[int(line.month) - 1] += max(line.weight, 0.0)
+        total_weight = sum(weights)
+        if not total_weight:
+            return [amount / 12.0] * 12
+        return [amount * weight / total_weight for weight in weights]
+
+
+class SaleTargetPhasing(models.Model):
+    """
+    Monthly weight of a sales target. Weights are relative: they are normalised
+    over the twelve months when the target is phased.
+    """
+    _name = 'sale.target.phasing'
+    _description = 'Sales Target Monthly Phasing'
+    _order = 'target_id, month_number'
+
+    target_id = fields.Many2one('sale.target', string='Target', required=True, ondelete='cascade', index=True)
+    month = fields.Selection([
+        ('1', 'January'), ('2', 'February'), ('3', 'March'), ('4', 'April'),
+        ('5', 'May'), ('6', 'June'), ('7', 'July'), ('8', 'August'),
+        ('9', 'September'), ('10', 'October'), ('11', 'November'), ('12', 'December'),
+    ], string='Month', required=True)
+    month_number = fields.Integer(compute='_compute_month_number', store=True)
+    weight = fields.Float(string='Weight', default=1.0, digits=(16, 4))
+
+    _sql_constraints = [
+        ('unique_target_month', 'UNIQUE(target_id, month)', 'Each month can only be phased once per target!')
+    ]
+
+    @api.depends('month')
+    def _compute_month_number(self):
+        for line in self:
+            line.month_number = int(line.month or 0)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.target_id._mark_dashboard_cubes()
+        return lines
+
+    def write(self, vals):
+        targets = self.target_id
+        res = super().write(vals)
+        (targets | self.target_id)._mark_dashboard_cubes()
+        return res
+
+    def unlink(self):
+        self.target_id._mark_dashboard_cubes()
+        return super().unlink()
@@ -0,0 +1,313 @@
+import copy
+import logging
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+
+class SaleTargetCube(models.Model):
+    """Target vs actual sales per year, month, category and type.
+
+    Targets come from ``sale.target``; actual sales are the confirmed sale
+    order lines whose analytic distribution points to a project tagged
+    Local/Export (category) and, optionally, SAP/Odoo/ITES (type). Actuals
+    without a type tag are kept in cells with an empty type.
+
+    Reading never refreshes the cube: orders, targets and project
+    classification changes mark the months they touch in
+    ``druksmart_dashboard.cube_stale`` and a cron rebuilds them, like the
+    monthly cube.
+    """
+    _name = 'sale.target.cube'
+    _description = 'Sales Target vs Actual Cube'
+    _order = 'year, month, category, type'
+
+    company_id = fields.Many2one('res.company', string='Company', required=True, index=True, ondelete='cascade')
+    currency_id = fields.Many2one('res.currency', related='company_id.currency_id')
+    year = fields.Integer(string='Year', required=True, index=True)
+    month = fields.Integer(string='Month', required=True)
+    category = fields.Selection(selection=lambda self: self.env['sale.target'].CATEGORY_SELECTION,
+                                string='Category', required=True)
+    type = fields.Selection(selection=lambda self: self.env['sale.target'].TYPE_SELECTION, string='Type')
+    target_amount = fields.Monetary(string='Target', currency_field='currency_id')
+    actual_amount = fields.Monetary(string='Actual', currency_field='currency_id')
+
+    def init(self):
+        # One cell per key, the typeless cells included: a UNIQUE constraint
+        # would let any number of them through since their type is NULL.
+        tools.create_unique_index(self._cr, 'sale_target_cube_cell_uniq', self._table, [
+            'company_id', 'year', 'month', 'category', "COALESCE(type, '')"])
+
+    @api.model
+    def _get_monthly_targets(self, company, year):
+        """Return {(category, type): [12 monthly target amounts]} for the year."""
+        targets = {}
+        for target in self.env['sale.target'].search([
+            ('year', '=', year),
+            ('company_id', '=', company.id),
+        ]):
+            key = (target.category, target.type)
+            monthly = targets.setdefault(key, [0.0] * 12)
+            for i, amount in enumerate(target._get_monthly_amounts()):
+                monthly[i] += amount
+        return targets
+
+    @api.model
+    def _compute_actuals(self, company, year, months):
+        """Actual sales of the given months in one grouped query.
+
+        Orders are selected on a date range (from the first to the end of the
+        last month), so the date index is used; the month list only drops the
+        months in between that are not recomputed.
+
+        Returns:
+            dict: {(month, category, type): amount in company currency}
+        """
+        index = self.env['druksmart_dashboard.mixin']._get_region_index()
+        project_ids, categories, types = [], [], []
+        for project_id in index['project_names']:
+            if project_id in index['local_project_ids']:
+                category = 'local'
+            elif project_id in index['export_project_ids']:
+                category = 'export'
+            else:
+                continue
+            project_ids.append(project_id)
+            categories.append(category)
+            types.append(index['project_types'].get(project_id))
+        if not project_ids or not months:
+            return {}
+
+        self.env['sale.order.line'].flush_model(['analytic_distribution', 'price_subtotal', 'order_id'])
+        self.env['sale.order'].flush_model(['date_order', 'state', 'company_id', 'currency_rate'])
+        self.env.cr.execute("""
+            SELECT EXTRACT(MONTH FROM so.date_order)::int AS month,
+                   cls.category,
+                   cls.type,
+                   SUM(sol.price_subtotal / COALESCE(NULLIF(so.currency_rate, 0), 1)
+                       * COALESCE(NULLIF(dist.value, '')::numeric, 100) / 100.0) AS amount
+              FROM sale_order_line sol
+              JOIN sale_order so ON so.id = sol.order_id
+             CROSS JOIN LATERAL jsonb_each_text(sol.analytic_distribution) dist
+              JOIN project_project p ON p.analytic_account_id::text = dist.key
+              JOIN unnest(%(project_ids)s::int[], %(categories)s::varchar[], %(types)s::varchar[])
+                   AS cls(project_id, category, type) ON cls.project_id = p.id
+             WHERE so.company_id = %(company_id)s
+               AND so.state IN ('sale', 'done')
+               AND so.date_order >= %(date_from)s
+               AND so.date_order < %(date_to)s
+               AND EXTRACT(MONTH FROM so.date_order)::int = ANY(%(months)s)
+               AND sol.analytic_distribution IS NOT NULL
+          GROUP BY 1, 2, 3
+        """, {
+            'project_ids': project_ids,
+            'categories': categories,
+            'types': types,
+            'company_id': company.id,
+            'date_from': date(year, min(months), 1),
+            'date_to': date(year, max(months), 1) + relativedelta(months=1),
+            'months': list(months),
+        })
+        return {
+            (row['month'], row['category'], row['type'] or False): row['amount'] or 0.0
+            for row in self.env.cr.dictfetchall()
+        }
+
+    @api.model
+    def _get_watermark(self, company, year):
+        """Last refresh time of the cube of ``company``/``year`` (None when never built)."""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT MAX(write_date) FROM sale_target_cube WHERE company_id = %s AND year = %s
+        """, (company.id, year))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _is_built(self, company, year):
+        """Whether the cube of ``company``/``year`` was built, else ask the cron to build it."""
+        if self._get_watermark(company, year):
+            return True
+        self.env['druksmart_dashboard.cube_stale']._request_build(self._name, company, year)
+        return False
+
+    @api.model
+    def _ensure_built(self, company, year):
+        """Build the cube of ``company``/``year`` now if it never was (for actions, not for reads)."""
+        if not self._get_watermark(company, year):
+            self.sudo()._refresh(company, year)
+
+    @api.model
+    def _refresh(self, company, year, months=None):
+        """Rebuild ``months`` of the cube of ``company``/``year``, the whole year when None.
+
+        Run by ``druksmart_dashboard.cube_stale._cron_refresh``.
+        """
+        months = months or list(range(1, 13))
+        actuals = self._compute_actuals(company, year, months)
+        targets = self._get_monthly_targets(company, year)
+
+        keys = set(targets)
+        keys.update((category, target_type) for _month, category, target_type in actuals)
+        # Always keep one typed-less cell per category so every month has a row.
+        keys.update((category, False) for category, _label in self.env['sale.target'].CATEGORY_SELECTION)
+
+        self.search([
+            ('company_id', '=', company.id),
+            ('year', '=', year),
+            ('month', 'in', months),
+        ]).unlink()
+        self.create([{
+            'company_id': company.id,
+            'year': year,
+            'month': month,
+            'category': category,
+            'type': target_type,
+            'target_amount': targets.get((category, target_type), [0.0] * 12)[month - 1],
+            'actual_amount': actuals.get((month, category, target_type), 0.0),
+        } for month in months for category, target_type in sorted(keys, key=str)])
+        _logger.info("Sale target cube refreshed: company=%s year=%s months=%s", company.id, year, months)
+
+    @api.model
+    def _get_cube_data(self, company, year):
+        """Return the cube of a year as plain cells plus totals."""
+        self._is_built(company, year)
+        cells = self.search_read([
+            ('company_id', '=', company.id),
+            ('year', '=', year),
+        ], ['month', 'category', 'type', 'target_amount', 'actual_amount'], order='month, category, type')
+
+        totals = {}
+        for cell in cells:
+            for key in ('total', cell['category']):
+                bucket = totals.setdefault(key, {'target': 0.0, 'actual': 0.0})
+                bucket['target'] += cell['target_amount'] or 0.0
+                bucket['actual'] += cell['actual_amount'] or 0.0
+
+        return {
+            'year': year,
+            'cells': [{
+                'month': cell['month'],
+                'category': cell['category'],
+                'type': cell['type'] or False,
+                'target': round(cell['target_amount'] or 0.0, 2),
+                'actual': round(cell['actual_amount'] or 0.0, 2),
+            } for cell in cells],
+            'totals': {
+                key: {'target': round(val['target'], 2), 'actual': round(val['actual'], 2)}
+                for key, val in totals.items()
+            },
+        }
+
+    @api.model
+    def _get_monthly_actuals(self, company, year, category, target_type):
+        """Actual sales of every month of ``year`` for one category and type."""
+        self._is_built(company, year)
+        monthly = [0.0] * 12
+        for group in self.sudo().read_group([
+            ('company_id', '=', company.id),
+            ('year', '=', year),
+            ('category', '=', category),
+            ('type', '=', target_type),
+        ], ['actual_amount:sum'], ['month'], lazy=False):
+            monthly[group['month'] - 1] += group['actual_amount'] or 0.0
+        return monthly
+
+    @api.model
+    def _get_achievement_series(self, company, year):
+        """Monthly and cumulative target/actual series of a year.
+
+        The series is computed once per cube state: it is cached on the cube
+        watermark, so any period view (month, quarter, year) of the same year
+        reuses it until the cube is refreshed again. Until the cron built the
+        year, the series is computed from the targets and orders directly.
+
+        Returns:
+            dict: {'year', 'target', 'actual', 'cumulative_target',
+            'cumulative_actual'} where every series has 12 values.
+        """
+        if not self._is_built(company, year):
+            target = [0.0] * 12
+            for monthly in self._get_monthly_targets(company, year).values():
+                target = [amount + monthly[i] for i, amount in enumerate(target)]
+            actual = [0.0] * 12
+            for (month, _category, _type), amount in self._compute_actuals(company, year, range(1, 13)).items():
+                actual[month - 1] += amount
+            return self._make_achievement_series(year, target, actual)
+        watermark = self._get_watermark(company, year)
+        return copy.deepcopy(self._get_achievement_series_cached(company.id, year, watermark))
+
+    @tools.ormcache('company_id', 'year', 'watermark')
+    def _get_achievement_series_cached(self, company_id, year, watermark):
+        target = [0.0] * 12
+        actual = [0.0] * 12
+        for group in self.sudo().read_group([
+            ('company_id', '=', company_id),
+            ('year', '=', year),
+        ], ['target_amount:sum', 'actual_amount:sum'], ['month'], lazy=False):
+            target[group['month'] - 1] += group['target_amount'] or 0.0
+            actual[group['month'] - 1] += group['actual_amount'] or 0.0
+        return self._make_achievement_series(year, target, actual)
+
+    @api.model
+    def _make_achievement_series(self, year, target, actual):
+        cumulative_target, cumulative_actual = [], []
+        running_target = running_actual = 0.0
+        for i in range(12):
+            running_target += target[i]
+            running_actual += actual[i]
+            cumulative_target.append(round(running_target, 2))
+            cumulative_actual.append(round(running_actual, 2))
+
+        return {
+            'year': year,
+            'target': [round(v, 2) for v in target],
+            'actual': [round(v, 2) for v in actual],
+            'cumulative_target': cumulative_target,
+            'cumulative_actual': cumulative_actual,
+        }
+
+    @api.model
+    def _get_period_achievement(self, company, year, month_from, month_to, today=None):
+        """Target, achievement and run-rate forecast for months ``month_from``..``month_to`` of ``year``.
+
+        The run rate is the average monthly actual of the elapsed months of the
+        year; the forecasts keep the actuals of elapsed months and count every
+        month that is not over yet at the run rate (or its actual, if already
+        higher).
+        """
+        today = today or fields.Date.context_today(self)
+        series = self._get_achievement_series(company, year)
+
+        if year < today.year:
+            elapsed = 12
+        elif year > today.year:
+            elapsed = 0
+        else:
+            elapsed = today.month - 1  # the current month is still running
+
+        period = range(month_from - 1, month_to)
+        period_target = sum(series['target'][i] for i in period)
+        period_actual = sum(series['actual'][i] for i in period)
+        ytd_actual = series['cumulative_actual'][elapsed - 1] if elapsed else 0.0
+        run_rate = ytd_actual / elapsed if elapsed else 0.0
+
+        def forecast(months):
+            return sum(
+                series['actual'][i] if i < elapsed else max(series['actual'][i], run_rate)
+                for i in months
+            )
+
+        return {
+            'target': round(period_target, 2),
+            'actual': round(period_actual, 2),
+            'achievement': round(period_actual / period_target * 100, 2) if period_target else 0.0,
+            'run_rate': round(run_rate, 2),
+            'forecast': round(forecast(period), 2),
+            'year_target': series['cumulative_target'][-1],
+            'year_forecast': round(forecast(range(12)), 2),
+            'series': series,
+        }
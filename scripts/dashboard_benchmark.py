@@ -0,0 +1,376 @@
+"""Dashboard benchmark.
+
+Generates a synthetic ledger (Local/Export projects with analytic accounts,
+multi-currency sale orders, customer invoices, vendor bills and payments,
+and the timesheets of employees on the projects when ``hr_timesheet`` is
+installed), times every dashboard entry point on it and writes a JSON report.
+
+Run it through the Odoo shell of a scratch database::
+
+    BENCH_SCALE=medium BENCH_OUTPUT=/tmp/dashboard_benchmark.json \\
+        odoo-bin shell -d bench_db --no-http < scripts/dashboard_benchmark.py
+
+Environment variables:
+
+    BENCH_SCALE    small | medium | large (default: small)
+    BENCH_REPEAT   timed runs per entry point after the cold run (default: 3)
+    BENCH_OUTPUT   path of the JSON report (default: dashboard_benchmark.json)
+    BENCH_KEEP     1 to commit the generated data instead of rolling it back
+    BENCH_SEED     random seed of the generator (default: 42)
+
+The same entry points can be driven from Python with
+``run(env, scale='small', repeat=3, output=None, keep=False)``.
+"""
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from datetime import date, datetime
+
+from odoo import Command, fields
+
+_logger = logging.getLogger(__name__)
+
+SCALES = {
+    'small': {'projects': 10, 'orders': 200, 'bills': 150, 'employees': 10, 'timesheets': 300},
+    'medium': {'projects': 60, 'orders': 2000, 'bills': 1500, 'employees': 50, 'timesheets': 3000},
+    'large': {'projects': 250, 'orders': 20000, 'bills': 15000, 'employees': 200, 'timesheets': 30000},
+}
+
+# L3 dashboards timed, one per project from the first one.
+L3_PROJECTS = 3
+
+# Share of invoiced orders that also get a payment, and of bills that get paid.
+PAID_RATIO = 0.7
+
+
+class LedgerGenerator:
+    """Create a deterministic synthetic ledger for the benchmark."""
+
+    def __init__(self, env, scale, seed=42):
+        self.env = env
+        self.company = env.company
+        self.counts = SCALES[scale]
+        self.rng = random.Random(seed)
+        self.years = list(range(fields.Date.today().year - 2, fields.Date.today().year + 1))
+        self.stats = {}
+
+    def _random_date(self):
+        year = self.rng.choice(self.years)
+        today = fields.Date.today()
+        last_month = today.month if year == today.year else 12
+        month = self.rng.randint(1, last_month)
+        return date(year, month, self.rng.randint(1, 28))
+
+    def _get_tag(self, name):
+        Tag = self.env['project.tags']
+        return Tag.search([('name', '=', name)], limit=1) or Tag.create({'name': name})
+
+    def _setup_currencies(self):
+        company_currency = self.company.currency_id
+        foreign = self.env['res.currency'].with_context(active_test=False).search([
+            ('name', 'in', ('USD', 'EUR')),
+            ('id', '!=', company_currency.id),
+        ], limit=1)
+        foreign.active = True
+        rates = []
+        for year in self.years:
+            for month in range(1, 13):
+                rates.append({
+                    'name': date(year, month, 1),
+                    'rate': round(self.rng.uniform(0.011, 0.013), 6),
+                    'currency_id': foreign.id,
+                    'company_id': self.company.id,
+                })
+        existing = self.env['res.currency.rate'].search([
+            ('currency_id', '=', foreign.id),
+            ('company_id', '=', self.company.id),
+            ('name', 'in', [vals['name'] for vals in rates]),
+        ])
+        existing.unlink()
+        self.env['res.currency.rate'].create(rates)
+        self.currencies = [company_currency, foreign]
+        self.pricelists = [
+            self.env['product.pricelist'].create({
+                'name': f'Benchmark {currency.name}',
+                'currency_id': currency.id,
+                'company_id': self.company.id,
+            })
+            for currency in self.currencies
+        ]
+
+    def _setup_projects(self):
+        plan = self.env['account.analytic.plan'].create({'name': 'Dashboard Benchmark'})
+        local_tag = self._get_tag('Local')
+        export_tag = self._get_tag('Export')
+        type_tags = [self._get_tag(label) for _value, label in self.env['sale.target'].TYPE_SELECTION]
+
+        self.projects = self.env['project.project']
+        for i in range(self.counts['projects']):
+            account = self.env['account.analytic.account'].create({
+                'name': f'BENCH-{i:04d}',
+                'plan_id': plan.id,
+                'company_id': self.company.id,
+            })
+            tags = [local_tag.id if i % 2 else export_tag.id, type_tags[i % len(type_tags)].id]
+            self.projects |= self.env['project.project'].create({
+                'name': f'Benchmark Project {i:04d}',
+                'analytic_account_id': account.id,
+                'company_id': self.company.id,
+                'tag_ids': [Command.set(tags)],
+            })
+
+    def _setup_partners(self):
+        Partner = self.env['res.partner']
+        self.customers = Partner.create([{'name': f'Benchmark Customer {i}'} for i in range(20)])
+        self.vendors = Partner.create([{'name': f'Benchmark Vendor {i}'} for i in range(10)])
+        self.product = self.env['product.product'].create({
+            'name': 'Benchmark Service',
+            'type': 'service',
+            'invoice_policy': 'order',
+        })
+
+    def _distribution(self):
+        project = self.rng.choice(self.projects)
+        return {str(project.analytic_account_id.id): 100}
+
+    def _register_payment(self, moves, payment_date):
+        self.env['account.payment.register'].with_context(
+            active_model='account.move', active_ids=moves.ids,
+        ).create({'payment_date': payment_date})._create_payments()
+
+    def _generate_sales(self):
+        orders_count = invoices_count = payments_count = 0
+        for _i in range(self.counts['orders']):
+            order_date = self._random_date()
+            pricelist = self.rng.choice(self.pricelists)
+            order = self.env['sale.order'].create({
+                'partner_id': self.rng.choice(self.customers).id,
+                'pricelist_id': pricelist.id,
+                'company_id': self.company.id,
+                'order_line': [Command.create({
+                    'product_id': self.product.id,
+                    'product_uom_qty': self.rng.randint(1, 10),
+                    'price_unit': round(self.rng.uniform(500, 50000), 2),
+                    'analytic_distribution': self._distribution(),
+                }) for _line in range(self.rng.randint(1, 4))],
+            })
+            order.action_confirm()
+            # action_confirm stamps the confirmation time on date_order
+            order.date_order = datetime.combine(order_date, datetime.min.time())
+            orders_count += 1
+
+            if self.rng.random() < 0.8:
+                invoice = order._create_invoices()
+                invoice.invoice_date = order_date
+                invoice.action_post()
+                invoices_count += 1
+                if self.rng.random() < PAID_RATIO:
+                    self._register_payment(invoice, order_date)
+                    payments_count += 1
+        self.stats.update(orders=orders_count, invoices=invoices_count, customer_payments=payments_count)
+
+    def _generate_bills(self):
+        bills_count = payments_count = 0
+        for _i in range(self.counts['bills']):
+            bill_date = self._random_date()
+            bill = self.env['account.move'].create({
+                'move_type': 'in_invoice',
+                'partner_id': self.rng.choice(self.vendors).id,
+                'invoice_date': bill_date,
+                'currency_id': self.rng.choice(self.currencies).id,
+                'invoice_line_ids': [Command.create({
+                    'name': 'Benchmark expense',
+                    'quantity': 1,
+                    'price_unit': round(self.rng.uniform(100, 20000), 2),
+                    'analytic_distribution': self._distribution(),
+                })],
+            })
+            bill.action_post()
+            bills_count += 1
+            if self.rng.random() < PAID_RATIO:
+                self._register_payment(bill, bill_date)
+                payments_count += 1
+        self.stats.update(vendor_bills=bills_count, vendor_payments=payments_count)
+
+    def _generate_timesheets(self):
+        # the project of analytic lines comes with hr_timesheet, which the
+        # module does not depend on: without it the L3 payroll cost stays 0
+        Line = self.env['account.analytic.line']
+        if 'project_id' not in Line._fields:
+            self.stats.update(employees=0, timesheets=0)
+            return
+        Employee = self.env['hr.employee']
+        employees = Employee.create([
+            dict({'name': f'Benchmark Employee {i}', 'company_id': self.company.id},
+                 **({'hourly_cost': round(self.rng.uniform(5, 60), 2)} if 'hourly_cost' in Employee._fields else {}))
+            for i in range(self.counts['employees'])
+        ])
+        Line.create([{
+            'name': 'Benchmark timesheet',
+            'project_id': self.rng.choice(self.projects).id,
+            'employee_id': self.rng.choice(employees).id,
+            'unit_amount': self.rng.choice((0.5, 1, 2, 4, 8)),
+            'date': self._random_date(),
+        } for _i in range(self.counts['timesheets'])])
+        self.stats.update(employees=len(employees), timesheets=self.counts['timesheets'])
+
+    def generate(self):
+        started = time.perf_counter()
+        self._setup_currencies()
+        self._setup_projects()
+        self._setup_partners()
+        self._generate_sales()
+        self._generate_bills()
+        self._generate_timesheets()
+        self.env.flush_all()
+        self.stats.update(
+            projects=len(self.projects),
+            years=self.years,
+            generation_seconds=round(time.perf_counter() - started, 2),
+        )
+        return self.stats
+
+
+def _entry_points(env, years, projects):
+    """(label, callable) pairs of every dashboard entry point to time."""
+    year = years[-1]
+    entries = [
+        ('hr.dashboard.get_dashboard_data_json', {},
+         lambda: env['hr.dashboard'].get_dashboard_data_json()),
+        ('l1.dashboard_demo.get_target_cube', {'year': year},
+         lambda: env['l1.dashboard_demo'].get_target_cube(year)),
+    ]
+    for y in years:
+        entries += [
+            ('l1.dashboard_demo.get_dashboard_data_json', {'year': y},
+             lambda y=y: env['l1.dashboard_demo'].get_dashboard_data_json(year=str(y))),
+            ('l2.dashboard.get_dashboard_data_json', {'year': y},
+             lambda y=y: env['l2.dashboard'].get_dashboard_data_json(year=str(y))),
+        ]
+    # the L3 form computes its payload in ``default_get``, from the project
+    # of the context (see ``openProjectDetails`` of the L4 dashboard)
+    for project_id in projects.ids[:L3_PROJECTS]:
+        entries.append((
+            'l3.dashboard.default_get', {'project_id': project_id},
+            lambda project_id=project_id:
+                env['l3.dashboard'].with_context(default_project_id=project_id).default_get(['dashboard_data'])
+                .get('dashboard_data', ''),
+        ))
+    for kwargs in ({'year': str(year)}, {'year': str(year), 'quarter': 'Q1'}, {'year': str(year), 'month': '1'}):
+        entries += [
+            ('l1.dashboard.get_dashboard_data_json', kwargs,
+             lambda kwargs=kwargs: env['l1.dashboard'].get_dashboard_data_json(**kwargs)),
+            ('l4.dashboard.get_dashboard_data_json', kwargs,
+             lambda kwargs=kwargs: env['l4.dashboard'].get_dashboard_data_json(**kwargs)),
+        ]
+        for category in ('sales', 'revenue', 'expense', 'cashflow'):
+            entries.append((
+                'druksmart_dashboard.reports.get_dashboard_data_json', dict(kwargs, category=category),
+                lambda kwargs=kwargs, category=category:
+                    env['druksmart_dashboard.reports'].get_dashboard_data_json(category, **kwargs),
+            ))
+    return entries
+
+
+def _measure(env, func):
+    env.invalidate_all()
+    env.cr.cache.clear()
+    queries = env.cr.sql_log_count
+    started = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - started) * 1000
+    return {
+        'wall_ms': round(elapsed, 2),
+        'queries': env.cr.sql_log_count - queries,
+        'payload_bytes': len(result) if isinstance(result, (str, bytes)) else len(json.dumps(result, default=str)),
+    }
+
+
+def build_cubes(env, years):
+    """Build the monthly and target cubes of ``years`` (and of the year before, read by the TTM).
+
+    The cron builds them in production; without them the dashboards would
+    be timed on their fallback computations.
+    """
+    started = time.perf_counter()
+    for year in range(min(years) - 1, max(years) + 1):
+        env['druksmart_dashboard.monthly_cube'].sudo()._refresh(env.company, year)
+        env['sale.target.cube'].sudo()._refresh(env.company, year)
+    wall_ms = round((time.perf_counter() - started) * 1000, 2)
+    _logger.info("benchmark cubes of %s built in %.1f ms", env.company.name, wall_ms)
+    return wall_ms
+
+
+def benchmark(env, years, projects, repeat=3):
+    # Compute in this transaction (the generated ledger is not committed)
+    # and never reuse a stored snapshot or closed period, every run must do
+    # the full work.
+    env = env(context=dict(env.context, dashboard_single_flight=False, dashboard_snapshot_ttl=0,
+                           dashboard_period_cache=False))
+    build_cubes(env, years)
+    results = []
+    for label, kwargs, func in _entry_points(env, years, projects.with_env(env)):
+        cold = _measure(env, func)
+        runs = [_measure(env, func) for _i in range(repeat)]
+        timings = [run['wall_ms'] for run in runs] or [cold['wall_ms']]
+        results.append({
+            'entry_point': label,
+            'args': kwargs,
+            'cold': cold,
+            'runs': runs,
+            'min_ms': min(timings),
+            'median_ms': round(statistics.median(timings), 2),
+            'max_ms': max(timings),
+            'queries': runs[-1]['queries'] if runs else cold['queries'],
+        })
+        _logger.info("benchmark %s %s: median %.1f ms, %s queries",
+                     label, kwargs, results[-1]['median_ms'], results[-1]['queries'])
+    return results
+
+
+def run(env, scale='small', repeat=3, output=None, keep=False, seed=42):
+    """Generate the ledger, time the entry points and write the JSON report."""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale {scale!r}, expected one of {', '.join(SCALES)}")
+
+    # Without BENCH_KEEP everything (ledger and dashboard records) is rolled back.
+    savepoint = None if keep else env.cr.savepoint()
+    try:
+        generator = LedgerGenerator(env, scale, seed=seed)
+        dataset = generator.generate()
+        results = benchmark(env, generator.years, generator.projects, repeat=repeat)
+    finally:
+        if savepoint:
+            savepoint.close(rollback=True)
+            env.invalidate_all()
+    if keep:
+        env.cr.commit()
+
+    report = {
+        'generated_at': fields.Datetime.to_string(fields.Datetime.now()),
+        'database': env.cr.dbname,
+        'scale': scale,
+        'repeat': repeat,
+        'seed': seed,
+        'dataset': dataset,
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as fp:
+            json.dump(report, fp, indent=2, default=str)
+        _logger.info("Dashboard benchmark report written to %s", output)
+    return report
+
+
+if __name__ == '__main__' and 'env' in globals():
+    run(
+        env,  # noqa: F821 - provided by odoo-bin shell
+        scale=os.environ.get('BENCH_SCALE', 'small'),
+        repeat=int(os.environ.get('BENCH_REPEAT', 3)),
+        output=os.environ.get('BENCH_OUTPUT', 'dashboard_benchmark.json'),
+        keep=os.environ.get('BENCH_KEEP') == '1',
+        seed=int(os.environ.get('BENCH_SEED', 42)),
+    )
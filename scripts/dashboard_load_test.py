@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Concurrent-user load harness for the dashboards.
+
+Simulates N users hitting ``get_dashboard_data_json`` of the dashboard models
+and the L3 JSON routes of a running Odoo server, then reports latency
+percentiles per endpoint together with database-side figures sampled from
+PostgreSQL while the test runs.
+
+    python3 scripts/dashboard_load_test.py --url http://localhost:8069 \\
+        --db prod_copy --login admin --password admin \\
+        --users 20 --duration 120 --workers 8 \\
+        --dsn "dbname=prod_copy user=odoo" --output load_report.json
+
+Reported figures:
+
+* p50/p95/p99/max latency and error count per endpoint;
+* worker utilisation: average share of ``--workers`` busy with an active
+  statement of the target database (sampled from ``pg_stat_activity``);
+* lock waits: samples of backends waiting on a lock, and the longest wait;
+* serialization failures: failed responses mentioning a serialization or
+  concurrent-update error, plus the deadlock/conflict counters of
+  ``pg_stat_database``.
+
+Only the standard library is required; psycopg2 (already an Odoo
+dependency) is needed for the database sampling, which is skipped when
+``--dsn`` is not given.
+"""
+import argparse
+import http.cookiejar
+import itertools
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import date
+
+SERIALIZATION_MARKERS = (
+    'could not serialize access',
+    'concurrent update',
+    'SerializationFailure',
+    'deadlock detected',
+)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return round(ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower), 2)
+
+
+class OdooSession:
+    """Minimal JSON-RPC client keeping its own session cookie."""
+
+    def __init__(self, url, db, login, password, timeout):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.ids = itertools.count(1)
+        self.call('/web/session/authenticate', {'db': db, 'login': login, 'password': password})
+
+    def call(self, path, params):
+        body = json.dumps({
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': params,
+            'id': next(self.ids),
+        }).encode()
+        request = urllib.request.Request(
+            self.url + path, data=body, headers={'Content-Type': 'application/json'})
+        with self.opener.open(request, timeout=self.timeout) as response:
+            payload = json.loads(response.read())
+        if payload.get('error'):
+            error = payload['error']
+            raise RuntimeError((error.get('data') or {}).get('message') or error.get('message'))
+        return payload.get('result')
+
+    def call_kw(self, model, method, kwargs):
+        return self.call(f'/web/dataset/call_kw/{model}/{method}', {
+            'model': model,
+            'method': method,
+            'args': [],
+            'kwargs': kwargs,
+        })
+
+
+def build_scenarios(years):
+    """(endpoint label, callable(session)) pairs picked at random by every user."""
+    year = str(years[-1])
+    scenarios = []
+
+    def kw(model, **kwargs):
+        return (f'{model}.get_dashboard_data_json',
+                lambda s: s.call_kw(model, 'get_dashboard_data_json', kwargs))
+
+    for y in map(str, years):
+        scenarios += [
+            kw('l1.dashboard_demo', year=y),
+            kw('l2.dashboard', year=y),
+            kw('l1.dashboard', year=y),
+        ]
+    for filters in ({'year': year, 'quarter': 'Q1'}, {'year': year, 'month': '1'}):
+        scenarios += [kw('l1.dashboard', **filters), kw('l4.dashboard', **filters)]
+    for category in ('sales', 'revenue', 'expense', 'cashflow'):
+        scenarios.append(kw('druksmart_dashboard.reports', category=category, year=year))
+    scenarios.append(kw('hr.dashboard'))
+    scenarios += [
+        ('/custom/l3_dashboard/projects', lambda s: s.call('/custom/l3_dashboard/projects', {})),
+        ('/l3_dashboard/data', lambda s: s.call('/l3_dashboard/data', {'year': year})),
+    ]
+    return scenarios
+
+
+class DatabaseSampler(threading.Thread):
+    """Periodically sample pg_stat_activity / pg_stat_database."""
+
+    def __init__(self, dsn, dbname, interval):
+        super().__init__(daemon=True)
+        import psycopg2  # imported lazily: only needed with --dsn
+        self.conn = psycopg2.connect(dsn)
+        self.conn.autocommit = True
+        self.dbname = dbname
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.samples = []
+        self.start_counters = self._database_counters()
+        self.end_counters = None
+
+    def _database_counters(self):
+        with self.conn.cursor() as cr:
+            cr.execute("""
+                SELECT deadlocks, conflicts, xact_rollback
+                  FROM pg_stat_database WHERE datname = %s
+            """, (self.dbname,))
+            row = cr.fetchone() or (0, 0, 0)
+        return dict(zip(('deadlocks', 'conflicts', 'xact_rollback'), row))
+
+    def run(self):
+        while not self.stop_event.is_set():
+            with self.conn.cursor() as cr:
+                cr.execute("""
+                    SELECT COUNT(*) FILTER (WHERE state = 'active'),
+                           COUNT(*) FILTER (WHERE wait_event_type = 'Lock'),
+                           COALESCE(EXTRACT(EPOCH FROM MAX(now() - query_start)
+                                    FILTER (WHERE wait_event_type = 'Lock')), 0)
+                      FROM pg_stat_activity
+                     WHERE datname = %s AND pid <> pg_backend_pid()
+                """, (self.dbname,))
+                active, lock_waiting, longest_wait = cr.fetchone()
+            self.samples.append({
+                'active': active,
+                'lock_waiting': lock_waiting,
+                'longest_lock_wait_s': float(longest_wait),
+            })
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+        self.end_counters = self._database_counters()
+        self.conn.close()
+
+    def report(self, workers):
+        samples = self.samples or [{'active': 0, 'lock_waiting': 0, 'longest_lock_wait_s': 0.0}]
+        return {
+            'samples': len(self.samples),
+            'worker_utilisation': round(
+                statistics.mean(min(s['active'], workers) / workers for s in samples), 3) if workers else None,
+            'active_backends_max': max(s['active'] for s in samples),
+            'lock_wait_samples': sum(1 for s in samples if s['lock_waiting']),
+            'lock_waiting_max': max(s['lock_waiting'] for s in samples),
+            'longest_lock_wait_s': round(max(s['longest_lock_wait_s'] for s in samples), 3),
+            'counters': {
+                key: self.end_counters[key] - self.start_counters[key]
+                for key in self.start_counters
+            },
+        }
+
+
+def user_loop(args, scenarios, deadline, results, lock, seed):
+    rng = random.Random(seed)
+    try:
+        session = OdooSession(args.url, args.db, args.login, args.password, args.timeout)
+    except Exception as e:  # noqa: BLE001 - report login failures as errors
+        with lock:
+            results['login']['errors'].append(str(e))
+        return
+    iterations = 0
+    while time.monotonic() < deadline and (not args.iterations or iterations < args.iterations):
+        label, call = rng.choice(scenarios)
+        started = time.perf_counter()
+        error = None
+        try:
+            call(session)
+        except Exception as e:  # noqa: BLE001 - every failure is a data point
+            error = str(e)
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            bucket = results[label]
+            bucket['latencies'].append(elapsed)
+            if error:
+                bucket['errors'].append(error)
+        iterations += 1
+        if args.think_time:
+            time.sleep(rng.uniform(0, args.think_time))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--login', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--users', type=int, default=10, help='concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=60, help='test duration in seconds')
+    parser.add_argument('--iterations', type=int, default=0, help='max requests per user (0 = no limit)')
+    parser.add_argument('--think-time', type=float, default=0.5, help='max random pause between requests (s)')
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--workers', type=int, default=0, help='Odoo HTTP workers, for utilisation')
+    parser.add_argument('--years', type=int, default=3, help='number of years to cycle through')
+    parser.add_argument('--dsn', help='libpq DSN of the Odoo database, enables PostgreSQL sampling')
+    parser.add_argument('--sample-interval', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    this_year = date.today().year
+    scenarios = build_scenarios(list(range(this_year - args.years + 1, this_year + 1)))
+    results = defaultdict(lambda: {'latencies': [], 'errors': []})
+    lock = threading.Lock()
+
+    sampler = DatabaseSampler(args.dsn, args.db, args.sample_interval) if args.dsn else None
+    if sampler:
+        sampler.start()
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=user_loop, args=(args, scenarios, deadline, results, lock, args.seed + i))
+        for i in range(args.users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+
+    database = None
+    if sampler:
+        sampler.stop()
+        database = sampler.report(args.workers)
+
+    endpoints = {}
+    all_latencies, serialization_failures = [], 0
+    for label, bucket in sorted(results.items()):
+        latencies = bucket['latencies']
+        all_latencies += latencies
+        failures = sum(1 for e in bucket['errors'] if any(m in e for m in SERIALIZATION_MARKERS))
+        serialization_failures += failures
+        endpoints[label] = {
+            'requests': len(latencies),
+            'errors': len(bucket['errors']),
+            'serialization_failures': failures,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': round(max(latencies), 2) if latencies else None,
+            'sample_errors': sorted(set(bucket['errors']))[:5],
+        }
+
+    report = {
+        'url': args.url,
+        'database': args.db,
+        'users': args.users,
+        'wall_seconds': round(wall, 2),
+        'requests': len(all_latencies),
+        'throughput_rps': round(len(all_latencies) / wall, 2) if wall else None,
+        'p50_ms': percentile(all_latencies, 50),
+        'p95_ms': percentile(all_latencies, 95),
+        'p99_ms': percentile(all_latencies, 99),
+        'serialization_failures': serialization_failures,
+        'endpoints': endpoints,
+        'database_stats': database,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            fp.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
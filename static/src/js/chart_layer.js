@@ -0,0 +1,121 @@
+/** @odoo-module **/
+
+// Series with more points than this are redrawn without animation
+export const LARGE_SERIES_POINTS = 500;
+
+function countPoints(series) {
+    return (series || []).reduce((total, serie) => {
+        const data = Array.isArray(serie) ? serie : serie?.data;
+        return total + (Array.isArray(data) ? data.length : 0);
+    }, 0);
+}
+
+/**
+ * Canvas a chart is drawn on: ``element`` itself when it is a canvas, else
+ * a canvas created once inside it.
+ */
+export function chartCanvas(element, height) {
+    let canvas = element.tagName === "CANVAS" ? element : element.querySelector("canvas");
+    if (!canvas) {
+        canvas = document.createElement("canvas");
+        element.innerHTML = "";
+        element.appendChild(canvas);
+    }
+    if (height) {
+        element.style.height = `${height}px`;
+        canvas.height = height;
+    }
+    return canvas;
+}
+
+/**
+ * Inline plugin writing ``format(value)`` above every bar or point of the
+ * visible datasets, ``offset`` pixels over it.
+ */
+export function valueLabels(format, { offset = 6, color = "#111", font = "700 11px Inter, sans-serif" } = {}) {
+    return {
+        id: "valueLabels",
+        afterDatasetsDraw(chart) {
+            const ctx = chart.ctx;
+            ctx.save();
+            ctx.fillStyle = color;
+            ctx.font = font;
+            ctx.textAlign = "center";
+            ctx.textBaseline = "bottom";
+            chart.data.datasets.forEach((dataset, datasetIndex) => {
+                const meta = chart.getDatasetMeta(datasetIndex);
+                if (meta.hidden) {
+                    return;
+                }
+                meta.data.forEach((element, index) => {
+                    const text = format(dataset.data[index]);
+                    if (text) {
+                        ctx.fillText(text, element.x, element.y - offset);
+                    }
+                });
+            });
+            ctx.restore();
+        },
+    };
+}
+
+/**
+ * Chart.js instances of one widget, kept alive across renders.
+ *
+ * Every dashboard draws with Chart.js, the only chart library of the
+ * dashboard bundle. Each chart is identified by a name: the first render
+ * creates it, the next ones apply the new data and options in place
+ * (``update``) so a filter change only repaints the plot area instead of
+ * tearing down and laying out every chart again. A chart is only recreated
+ * when its canvas was replaced in the DOM. Large series are redrawn without
+ * animation.
+ */
+export class ChartLayer {
+    constructor() {
+        this.charts = {};
+    }
+
+    _reuse(name, element) {
+        const entry = this.charts[name];
+        if (entry && entry.element === element && element.isConnected) {
+            return entry.chart;
+        }
+        this.destroy(name);
+        return null;
+    }
+
+    /** Create or update a Chart.js chart drawn on ``canvas``. */
+    chartjs(name, canvas, config) {
+        if (!canvas) return null;
+        const animate = countPoints(config.data?.datasets) <= LARGE_SERIES_POINTS;
+        if (!animate) {
+            config.options = { ...(config.options || {}), animation: false };
+        }
+        const chart = this._reuse(name, canvas);
+        if (chart) {
+            chart.data = config.data;
+            chart.options = config.options || {};
+            // inline plugins close over the values of the render that built
+            // them: swap them in place, ``update`` invalidates the plugin cache
+            const plugins = chart.config.plugins;
+            plugins.splice(0, plugins.length, ...(config.plugins || []));
+            chart.update(animate ? undefined : "none");
+            return chart;
+        }
+        const created = new Chart(canvas.getContext("2d"), config);
+        this.charts[name] = { element: canvas, chart: created, destroy: () => created.destroy() };
+        return created;
+    }
+
+    destroy(name) {
+        const entry = this.charts[name];
+        if (entry) {
+            try { entry.destroy(); } catch {}
+            delete this.charts[name];
+        }
+    }
+
+    destroyAll() {
+        Object.keys(this.charts).forEach((name) => this.destroy(name));
+    }
+}
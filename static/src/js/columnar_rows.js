@@ -0,0 +1,76 @@
+/** @odoo-module **/
+
+const { markRaw } = owl;
+
+/**
+ * Row list received column-wise (see ``_encode_rows`` on the server).
+ *
+ * Values are read in place from their column, so a table only builds the
+ * rows it renders. Dictionary-encoded columns hold indexes into the
+ * dictionary of the field. The list is marked raw: it is replaced as a
+ * whole, never mutated, so it does not need to be reactive.
+ */
+export class ColumnarRows {
+    constructor({ length, fields, values, dictionaries }) {
+        this.length = length;
+        this.fields = fields;
+        this.values = values;
+        this.dictionaries = dictionaries || {};
+        this.rows = new Array(length);
+        markRaw(this);
+    }
+
+    /** Value of ``field`` in row ``index``. */
+    value(index, field) {
+        const column = this.values[field];
+        if (!column) {
+            return undefined;
+        }
+        const dictionary = this.dictionaries[field];
+        const value = column[index];
+        return dictionary && value !== null ? dictionary[value] : value;
+    }
+
+    /** Row ``index`` as an object, built on first access. */
+    get(index) {
+        if (!this.rows[index]) {
+            const row = {};
+            for (const field of this.fields) {
+                row[field] = this.value(index, field);
+            }
+            this.rows[index] = row;
+        }
+        return this.rows[index];
+    }
+
+    toArray() {
+        return Array.from({ length: this.length }, (_, index) => this.get(index));
+    }
+
+    /** Indexes of the rows grouped by the value of ``field`` (``fallback`` when empty). */
+    groupIndexes(field, fallback) {
+        const groups = {};
+        for (let index = 0; index < this.length; index++) {
+            const key = this.value(index, field) || fallback;
+            (groups[key] = groups[key] || []).push(index);
+        }
+        return groups;
+    }
+}
+
+export function isColumnar(value) {
+    return Boolean(value && value.columnar && value.values);
+}
+
+/** Rows of a payload list, sent either as an array or column-wise. */
+export function decodeRows(value) {
+    if (isColumnar(value)) {
+        return new ColumnarRows(value);
+    }
+    return Array.isArray(value) ? value : [];
+}
+
+/** Value of ``field`` in row ``index`` of an array or a ``ColumnarRows``. */
+export function rowValue(rows, index, field) {
+    return rows instanceof ColumnarRows ? rows.value(index, field) : rows[index]?.[field];
+}
@@ -1,226 +1,255 @@
 /** @odoo-module **/
 import { registry } from "@web/core/registry";
+import { DashboardRequests, FILTER_DEBOUNCE, loadDashboardData } from "@my_dashboard/js/dashboard_transport";
+import { adjacentPeriods, prefetchDashboardData } from "@my_dashboard/js/dashboard_prefetch";
+import { ChartLayer, chartCanvas, valueLabels } from "@my_dashboard/js/chart_layer";
+import { formatAmount, formatPercent } from "@my_dashboard/js/dashboard_format";
 
 var translation = require('web.translation');
 var _t = translation._t;
-const { Component, useEffect, useState } = owl;
+const { Component, onWillUnmount, useEffect, useState } = owl;
+
+// Payload sections fetched one request each, cheapest first
+const SECTIONS = ['cash_flow', 'ttm', 'sales', 'revenue', 'expenses'];
+
+const integerFormat = new Intl.NumberFormat('en-US', { maximumFractionDigits: 0 });
+
+/** Whole number with comma thousands separators, as shown on the charts. */
+function numberFormat(value) {
+    return integerFormat.format(value ?? 0);
+}
+
+function openL2Dashboard() {
+    window.location.href = "/web#action=my_dashboard.action_l2_dashboard";
+}
 
 
 export class Dashboard extends Component {
     static template = 'custom.dashboard'
     setup() {
         super.setup();
+        this.requestId = 0;
+        // charts are kept alive across filter changes and updated in place
+        this.charts = new ChartLayer();
+        this.requests = new DashboardRequests();
+        this.prefetches = new DashboardRequests();
+        onWillUnmount(() => {
+            this.requests.abort();
+            this.prefetches.abort();
+            this.charts.destroyAll();
+        });
 
         this.state = useState({
-            main_data: [],
+            main_data: {},
+            loading: {},
         })
         useEffect(
             () => {
-                this.state.main_data = JSON.parse(this.props.record.data.dashboard_data);
-                this.drawPie('expenses', this.pieData(this.state.main_data.expenses?.region_wise));
-                this.drawPie('revenue', this.pieData(this.state.main_data.revenue?.region_wise));
-                this.drawPie('sales', this.pieData(this.state.main_data.sales?.region_wise));
-                this.drawChartIncome();
+                const data = JSON.parse(this.props.record.data.dashboard_data || '{}');
+                this.state.main_data = data;
+                if (data.lazy) {
+                    this.loadSections();
+                } else {
+                    SECTIONS.forEach((section) => this.drawSection(section));
+                }
             },
             () => [this.props.record.data.dashboard_data]
         );
     }
 
-    drawPie(id, data) {
-        Highcharts.chart(id, {
-            chart: {
-                type: 'pie',
-                options3d: {
-                    enabled: true,
-                    alpha: 60,
-                    beta: 0
-                },
-                width: 400,
-                height: 350,
-                events: {
-                    load: function () {
-                        // Grafik yuklangach, barcha data label span’lariga width beramiz
-                        const spans = document.querySelectorAll(`#${id} span[style*="position: absolute"]`);
-                        spans.forEach(span => {
-                            span.style.width = '90px';
-                            span.style.whiteSpace = 'nowrap'; // matn o‘ramasin
-                            span.style.overflow = 'visible';  // kesilmasin
-                            span.style.textOverflow = 'unset'; // ellipsis olib tashlash
-                        });
-                    }
+    /**
+     * Fetch every section with its own request, in parallel, and render each
+     * card as soon as its data arrives. Responses of a previous filter
+     * selection are ignored. A section kept in the browser cache is drawn
+     * at once and stays dimmed until the server confirmed or replaced it.
+     * The requests wait for the filters to settle, and a newer selection
+     * cancels them, on the server too.
+     * Once every section is drawn, the previous and next periods are
+     * prefetched while the browser is idle.
+     */
+    loadSections() {
+        const requestId = ++this.requestId;
+        const signal = this.requests.next();
+        this.prefetches.abort();
+        const { year, month, quarter, consolidated } = this.props.record.data;
+        const sections = consolidated ? [...SECTIONS, 'companies'] : SECTIONS;
+        const loads = sections.map((section) => {
+            this.state.loading[section] = true;
+            return loadDashboardData('l1.dashboard', {
+                year, month, quarter, consolidated, sections: [section],
+            }, (data) => {
+                if (requestId !== this.requestId) {
+                    return;
                 }
-            },
-            title: { text: '' },
-            legend: {
-                layout: 'vertical',
-                align: 'right',
-                verticalAlign: 'middle'
-            },
-            tooltip: {
-                useHTML: true,
-                backgroundColor: '#000',
-                borderRadius: 8,
-                borderWidth: 0,
-                style: {
-                    color: '#fff',
-                    fontSize: '16px',
-                    padding: 12
-                },
-                formatter: function () {
-                    const formattedValue = Highcharts.numberFormat(this.y, 0, '.', ',');
-                    return `<b style="color:${this.point.color}; font-size: 16px;">${this.point.name}</b>: 
-                            <span style="font-weight: bold; font-size: 16px;">${formattedValue}</span>`;
+                this.state.main_data.format = data.format;
+                this.state.main_data[section] = data[section];
+                this.drawSection(section);
+            }, { signal, delay: FILTER_DEBOUNCE }).finally(() => {
+                if (requestId === this.requestId) {
+                    this.state.loading[section] = false;
                 }
+            });
+        });
+        Promise.allSettled(loads).then(() => {
+            if (signal.aborted) {
+                return;
+            }
+            const requests = adjacentPeriods({ year, month, quarter }).flatMap((period) =>
+                sections.map((section) => ['l1.dashboard', { ...period, consolidated, sections: [section] }])
+            );
+            prefetchDashboardData(requests, { signal: this.prefetches.next() });
+        });
+    }
+
+    /** Payload amount in the payload currency (amounts are sent as numbers). */
+    formatAmount(value) {
+        return formatAmount(value ?? 0, this.state.main_data.format);
+    }
+
+    formatPercent(value, digits = 2) {
+        return formatPercent(value ?? 0, digits);
+    }
+
+    drawSection(section) {
+        const data = this.state.main_data[section];
+        if (!data) {
+            return;
+        }
+        if (section === 'cash_flow') {
+            this.drawChartIncome();
+        } else if (['sales', 'revenue', 'expenses'].includes(section)) {
+            this.drawPie(section, this.pieData(data.region_wise));
+        }
+    }
+
+    drawPie(id, data) {
+        const element = document.getElementById(id);
+        if (!element) {
+            return;
+        }
+        const colors = ['#4e79a7', '#f28e2c'];
+        this.charts.chartjs(id, chartCanvas(element), {
+            type: 'pie',
+            data: {
+                labels: data.map((point) => point.name),
+                datasets: [{
+                    label: 'Count',
+                    data: data.map((point) => point.y),
+                    backgroundColor: colors,
+                    borderColor: '#fff',
+                    borderWidth: 1,
+                }],
             },
-            plotOptions: {
-                pie: {
-                    allowPointSelect: false,
-                    cursor: 'pointer',
-                    depth: 35,
-                    showInLegend: true,
-                    size: "90%",
-                    dataLabels: {
-                        enabled: true,
-                        useHTML: true,
-                        distance: -40,
-                        formatter: function () {
-                            let formattedValue = Highcharts.numberFormat(this.y, 0, '.', ',');
-                            let bgColor = this.point.color || '#007bff';
-                            return `<div style="
-                                background-color: ${bgColor}; 
-                                color: #fff; 
-                                padding: 4px 10px; 
-                                border-radius: 8px;
-                                font-weight: 600;
-                                font-size: 14px;
-                                text-align: center;
-                                white-space: nowrap;
-                                display: inline-block;
-                            ">${formattedValue}</div>`;
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                onClick: () => openL2Dashboard(),
+                onHover: (event, elements, chart) => {
+                    chart.canvas.style.cursor = elements.length ? 'pointer' : 'default';
+                },
+                plugins: {
+                    legend: { position: 'right' },
+                    tooltip: {
+                        backgroundColor: '#000',
+                        cornerRadius: 8,
+                        padding: 12,
+                        titleFont: { size: 16 },
+                        bodyFont: { size: 16, weight: 'bold' },
+                        callbacks: {
+                            label: (context) => `${context.label}: ${numberFormat(context.parsed)}`,
                         },
-                        align: 'center'
                     },
-                    point: {
-                        events: {
-                            click: function () {
-                                window.location.href = "/web#action=my_dashboard.action_l2_dashboard";
-                            }
-                        }
-                    }
-                }
+                },
             },
-            series: [{
-                type: 'pie',
-                name: 'Count',
-                colors: ['#4e79a7', '#f28e2c'],
-                data: data
-            }]
+            plugins: [{
+                // value of each slice in a badge of the slice colour
+                id: 'sliceLabels',
+                afterDatasetsDraw(chart) {
+                    const ctx = chart.ctx;
+                    const meta = chart.getDatasetMeta(0);
+                    ctx.save();
+                    ctx.font = '600 14px Inter, sans-serif';
+                    ctx.textAlign = 'center';
+                    ctx.textBaseline = 'middle';
+                    meta.data.forEach((arc, index) => {
+                        const value = chart.data.datasets[0].data[index];
+                        if (!value || arc.hidden) {
+                            return;
+                        }
+                        const text = numberFormat(value);
+                        const { x, y } = arc.tooltipPosition();
+                        const width = ctx.measureText(text).width + 20;
+                        ctx.fillStyle = colors[index % colors.length];
+                        ctx.beginPath();
+                        ctx.roundRect(x - width / 2, y - 12, width, 24, 8);
+                        ctx.fill();
+                        ctx.strokeStyle = '#fff';
+                        ctx.stroke();
+                        ctx.fillStyle = '#fff';
+                        ctx.fillText(text, x, y);
+                    });
+                    ctx.restore();
+                },
+            }],
         });
     }
-    
+
     drawChartIncome() {
-        const categories = this.state.main_data.cash_flow.region_wise.inflow.map(item => item.name);
-        const inflowData = this.state.main_data.cash_flow.region_wise.inflow.map(item => item.value);
-        const outflowData = this.state.main_data.cash_flow.region_wise.outflow.map(item => item.value);
-    
-        Highcharts.chart('cash', {
-            chart: {
-                type: 'column',
-                options3d: {
-                    enabled: true,
-                    alpha: 10,
-                    beta: 5,
-                    depth: 25,
-                    viewDistance: 25
-                }
+        const element = document.getElementById('cash');
+        if (!element) {
+            return;
+        }
+        const { inflow, outflow } = this.state.main_data.cash_flow.region_wise;
+        this.charts.chartjs('cash', chartCanvas(element), {
+            type: 'bar',
+            data: {
+                labels: inflow.map(item => item.name),
+                datasets: [
+                    { label: 'Inflow', data: inflow.map(item => item.value), backgroundColor: '#1e88e5' },
+                    { label: 'Outflow', data: outflow.map(item => item.value), backgroundColor: '#ff8f00' },
+                ],
             },
-            title: {
-                text: 'Region Wise Cash Flow',
-                align: 'center',
-                style: {
-                    fontSize: '16px',
-                    fontWeight: 'bold',
-                    color: '#fff'
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                layout: { padding: { top: 24 } },
+                onClick: () => openL2Dashboard(),
+                onHover: (event, elements, chart) => {
+                    chart.canvas.style.cursor = elements.length ? 'pointer' : 'default';
                 },
-                backgroundColor: '#3b71ca',
-                borderRadius: 5,
-                padding: 10
-            },
-            xAxis: {
-                categories: categories,
-                labels: {
-                    style: {
-                        fontSize: '12px',
-                        fontWeight: 'bold'
-                    }
-                }
-            },
-            yAxis: {
-                title: { text: null },
-                labels: { enabled: false },
-                gridLineWidth: 0,
-                lineWidth: 0
-            },
-            tooltip: {
-                useHTML: true,
-                backgroundColor: '#000',
-                borderRadius: 6,
-                borderWidth: 0,
-                style: {
-                    color: '#fff',
-                    fontSize: '14px'
-                },
-                formatter: function () {
-                    const value = Highcharts.numberFormat(this.y, 0, '.', ',');
-                    return `<b style="color:${this.color}">${this.series.name}</b>: <b>${value}</b>`;
-                }
-                
-            },
-            plotOptions: {
-                column: {
-                    depth: 25,
-                    grouping: true,
-                    dataLabels: {
-                        enabled: true,
-                        formatter: function () {
-                            return `${Highcharts.numberFormat(this.y, 0, '.', ',')}`;
+                plugins: {
+                    title: {
+                        display: true,
+                        text: 'Region Wise Cash Flow',
+                        font: { size: 16, weight: 'bold' },
+                    },
+                    legend: { position: 'bottom' },
+                    tooltip: {
+                        backgroundColor: '#000',
+                        cornerRadius: 6,
+                        bodyFont: { size: 14 },
+                        callbacks: {
+                            label: (context) => `${context.dataset.label}: ${numberFormat(context.parsed.y)}`,
                         },
-                        style: {
-                            fontSize: '12px',
-                            fontWeight: 'bold',
-                            color: '#000'
-                        }
                     },
-                    point: {
-                        events: {
-                            click: function () {
-                                window.location.href = "/web#action=my_dashboard.action_l2_dashboard";
-                            }
-                        }
-                    }
-                }
-            },
-            legend: {
-                align: 'center',
-                verticalAlign: 'bottom',
-                layout: 'horizontal',
-                backgroundColor: '#FFFFFF'
-            },
-            series: [
-                {
-                    name: 'Inflow',
-                    data: inflowData,
-                    color: '#1e88e5'
                 },
-                {
-                    name: 'Outflow',
-                    data: outflowData,
-                    color: '#ff8f00'
-                }
-            ]
+                scales: {
+                    x: {
+                        grid: { display: false },
+                        ticks: { font: { size: 12, weight: 'bold' } },
+                    },
+                    y: {
+                        beginAtZero: true,
+                        ticks: { display: false },
+                        grid: { display: false },
+                        border: { display: false },
+                    },
+                },
+            },
+            plugins: [valueLabels(numberFormat, { color: '#000', font: 'bold 12px Inter, sans-serif' })],
         });
     }
-    
+
     pieData(source) {
         return source.data.map(info => ({
             name: info.name,
@@ -230,4 +259,4 @@ export class Dashboard extends Component {
 
 }
 
-registry.category("fields").add("dashboard", Dashboard);
+registry.category("my_dashboard.lazy_fields").add("dashboard", Dashboard);
@@ -0,0 +1,86 @@
+/** @odoo-module **/
+import { session } from "@web/session";
+import { PAYLOAD_SCHEMA } from "@my_dashboard/js/dashboard_format";
+
+// Recent dashboard payloads kept in the browser, keyed by model, filters and
+// companies, so a dashboard shows its last copy while it is revalidated.
+const DB_NAME = "my_dashboard";
+const DB_VERSION = 1;
+const STORE = "snapshots";
+const MAX_ENTRIES = 50;
+
+let dbPromise = null;
+
+function openDatabase() {
+    if (!dbPromise) {
+        dbPromise = new Promise((resolve, reject) => {
+            if (!window.indexedDB) {
+                reject(new Error("IndexedDB is not available"));
+                return;
+            }
+            const open = window.indexedDB.open(DB_NAME, DB_VERSION);
+            open.onupgradeneeded = () => {
+                const store = open.result.createObjectStore(STORE, { keyPath: "key" });
+                store.createIndex("time", "time");
+            };
+            open.onsuccess = () => resolve(open.result);
+            open.onerror = () => reject(open.error);
+        }).catch((error) => {
+            dbPromise = null;
+            throw error;
+        });
+    }
+    return dbPromise;
+}
+
+function run(mode, callback) {
+    return openDatabase().then((db) => new Promise((resolve, reject) => {
+        const transaction = db.transaction(STORE, mode);
+        const result = callback(transaction.objectStore(STORE));
+        transaction.oncomplete = () => resolve(result && result.result);
+        transaction.onerror = () => reject(transaction.error);
+        transaction.onabort = () => reject(transaction.error);
+    }));
+}
+
+function currentCompanies() {
+    const match = document.cookie.match(/(?:^|;\s*)cids=([^;]*)/);
+    return match ? decodeURIComponent(match[1]) : "";
+}
+
+/**
+ * Cache key of a payload: the payload schema, the model, the user, the
+ * selected companies and the filters (with sorted keys, so the order they
+ * were passed in does not matter). Payloads of an older schema are never
+ * read back.
+ */
+export function snapshotKey(model, kwargs) {
+    const filters = Object.keys(kwargs).sort().map((name) => [name, kwargs[name]]);
+    return JSON.stringify([PAYLOAD_SCHEMA, model, session.uid, currentCompanies(), filters]);
+}
+
+/** Cached ``{key, etag, data, time}`` of ``key``, or undefined. Never fails. */
+export function getSnapshot(key) {
+    return run("readonly", (store) => store.get(key)).catch(() => undefined);
+}
+
+/** Store ``data`` under ``key`` and drop the oldest entries. Never fails. */
+export function putSnapshot(key, etag, data) {
+    return run("readwrite", (store) => {
+        store.put({ key, etag, data, time: Date.now() });
+        const count = store.count();
+        count.onsuccess = () => {
+            let excess = count.result - MAX_ENTRIES;
+            if (excess <= 0) {
+                return;
+            }
+            store.index("time").openCursor().onsuccess = (ev) => {
+                const cursor = ev.target.result;
+                if (cursor && excess-- > 0) {
+                    cursor.delete();
+                    cursor.continue();
+                }
+            };
+        };
+    }).catch(() => undefined);
+}
@@ -0,0 +1,32 @@
+/** @odoo-module **/
+import { formatFloat } from "@web/views/fields/formatters";
+
+// Payload layout the widgets understand: amounts are plain numbers, formatted
+// here with the ``format`` descriptor sent along (see _get_payload_format)
+export const PAYLOAD_SCHEMA = 2;
+
+/**
+ * ``value`` in the number format of the user's language, with the decimal
+ * places of ``currency`` (a code of ``format.currencies``, the payload
+ * currency by default) and, with ``symbol``, its symbol. Values that are not
+ * numbers are returned as they are.
+ */
+export function formatAmount(value, format, { currency, symbol = false } = {}) {
+    if (typeof value !== "number") {
+        return value ?? "";
+    }
+    const info = format?.currencies?.[currency || format.currency];
+    const text = formatFloat(value, { digits: [16, info ? info.digits : 2] });
+    if (!symbol || !info?.symbol) {
+        return text;
+    }
+    return info.position === "after" ? `${text} ${info.symbol}` : `${info.symbol}${text}`;
+}
+
+/** Percentage points ``value`` with ``digits`` decimals and a percent sign. */
+export function formatPercent(value, digits = 2) {
+    if (typeof value !== "number") {
+        return value ?? "";
+    }
+    return `${formatFloat(value, { digits: [16, digits] })}%`;
+}
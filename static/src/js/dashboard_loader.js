@@ -0,0 +1,54 @@
+/** @odoo-module **/
+import { registry } from "@web/core/registry";
+import { getBundle, loadBundle } from "@web/core/assets";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+
+const { Component, onWillStart, xml } = owl;
+
+// Dashboards (widgets, templates, styles and Chart.js) live in their
+// own bundle: only this loader is part of web.assets_backend.
+const DASHBOARD_BUNDLE = "my_dashboard.assets_dashboard";
+const DASHBOARD_FIELDS = [
+    "dashboard",
+    "druksmart_dashboard_reports",
+    "hr_dashboard",
+    "l1_dashboard",
+    "l2_dashboard",
+    "l3_dashboard",
+    "l4_dashboard",
+];
+
+let bundlePromise = null;
+
+function loadDashboardBundle() {
+    if (!bundlePromise) {
+        bundlePromise = getBundle(DASHBOARD_BUNDLE).then(loadBundle).catch((error) => {
+            bundlePromise = null;  // let the next dashboard retry
+            throw error;
+        });
+    }
+    return bundlePromise;
+}
+
+/**
+ * Field widget standing for the dashboard widget ``name``: it loads the
+ * dashboard bundle the first time a dashboard opens, then renders the real
+ * widget, which the bundle registers in ``my_dashboard.lazy_fields``.
+ */
+function lazyDashboardField(name) {
+    class LazyDashboardField extends Component {
+        setup() {
+            onWillStart(async () => {
+                await loadDashboardBundle();
+                this.FieldComponent = registry.category("my_dashboard.lazy_fields").get(name);
+            });
+        }
+    }
+    LazyDashboardField.template = xml`<t t-component="FieldComponent" t-props="props"/>`;
+    LazyDashboardField.props = { ...standardFieldProps };
+    return LazyDashboardField;
+}
+
+for (const name of DASHBOARD_FIELDS) {
+    registry.category("fields").add(name, lazyDashboardField(name));
+}
@@ -0,0 +1,93 @@
+/** @odoo-module **/
+import { getSnapshot, putSnapshot, snapshotKey } from "@my_dashboard/js/dashboard_cache";
+import { fetchDashboardBatch } from "@my_dashboard/js/dashboard_transport";
+
+// Cached payloads younger than this are not prefetched again
+const PREFETCH_MAX_AGE = 5 * 60 * 1000;
+// Payloads of one prefetch request (the server takes 20 at most)
+const PREFETCH_BATCH_SIZE = 10;
+
+function idle(signal) {
+    return new Promise((resolve) => {
+        if (signal?.aborted) {
+            resolve();
+            return;
+        }
+        if (window.requestIdleCallback) {
+            const handle = window.requestIdleCallback(resolve, { timeout: 5000 });
+            signal?.addEventListener("abort", () => {
+                window.cancelIdleCallback(handle);
+                resolve();
+            }, { once: true });
+        } else {
+            setTimeout(resolve, 200);
+        }
+    });
+}
+
+/**
+ * Previous and next period of a ``{year, month, quarter}`` filter selection:
+ * months step by month, quarters by quarter, whole years by year. Periods
+ * starting in the future are left out.
+ */
+export function adjacentPeriods({ year, month, quarter }) {
+    const periods = [];
+    const current = Number(year) || new Date().getFullYear();
+    const today = new Date();
+    const add = (y, startMonth, filters) => {
+        if (new Date(y, startMonth - 1, 1) <= today) {
+            periods.push({ year: String(y), month: false, quarter: false, ...filters });
+        }
+    };
+    if (month) {
+        for (const step of [-1, 1]) {
+            const index = current * 12 + Number(month) - 1 + step;
+            const m = (index % 12) + 1;
+            add(Math.floor(index / 12), m, { month: String(m) });
+        }
+    } else if (quarter) {
+        for (const step of [-1, 1]) {
+            const index = current * 4 + Number(String(quarter).slice(1)) - 1 + step;
+            const q = (index % 4) + 1;
+            add(Math.floor(index / 4), (q - 1) * 3 + 1, { quarter: `Q${q}` });
+        }
+    } else {
+        add(current - 1, 1, {});
+        add(current + 1, 1, {});
+    }
+    return periods;
+}
+
+/**
+ * Warm the browser cache with ``[[model, kwargs], ...]`` payloads when the
+ * browser is idle: the payloads not cached recently are fetched at low
+ * priority in batches of ``PREFETCH_BATCH_SIZE`` (one request each), and
+ * revalidated by ETag. Aborting ``signal`` stops the queue. Never fails.
+ */
+export async function prefetchDashboardData(requests, { signal } = {}) {
+    const pending = [];
+    for (const [model, kwargs] of requests) {
+        const key = snapshotKey(model, kwargs);
+        const cached = await getSnapshot(key);
+        if (!cached || Date.now() - cached.time >= PREFETCH_MAX_AGE) {
+            pending.push({ key, request: [model, kwargs, cached?.etag] });
+        }
+    }
+    for (let start = 0; start < pending.length; start += PREFETCH_BATCH_SIZE) {
+        await idle(signal);
+        if (signal?.aborted) {
+            return;
+        }
+        const batch = pending.slice(start, start + PREFETCH_BATCH_SIZE);
+        try {
+            const results = await fetchDashboardBatch(batch.map((item) => item.request), {
+                signal, priority: "low",
+            });
+            await Promise.all(results.map((result, index) =>
+                result.notModified ? undefined : putSnapshot(batch[index].key, result.etag, result.data)
+            ));
+        } catch {
+            // prefetching is best effort
+        }
+    }
+}
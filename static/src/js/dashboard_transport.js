@@ -0,0 +1,191 @@
+/** @odoo-module **/
+import { getSnapshot, putSnapshot, snapshotKey } from "@my_dashboard/js/dashboard_cache";
+
+// Filter changes settle for this long before the server is asked
+export const FILTER_DEBOUNCE = 300;
+
+// Models whose row lists are asked column-wise (see ``columnar_rows.js``)
+const COLUMNAR_MODELS = new Set(["druksmart_dashboard.reports", "l4.dashboard"]);
+
+// Tokens of the requests still running on the server
+const pendingTokens = new Set();
+
+function newRequestToken() {
+    const bytes = new Uint8Array(12);
+    window.crypto.getRandomValues(bytes);
+    return Array.from(bytes, (byte) => byte.toString(16).padStart(2, "0")).join("");
+}
+
+/** Ask the server to abort the query of request ``token`` (fire and forget). */
+function cancelRequest(token) {
+    if (!pendingTokens.delete(token)) {
+        return;
+    }
+    const body = JSON.stringify({ request_token: token, csrf_token: odoo.csrf_token });
+    if (!navigator.sendBeacon || !navigator.sendBeacon("/my_dashboard/cancel", body)) {
+        fetch("/my_dashboard/cancel", { method: "POST", body, keepalive: true }).catch(() => {});
+    }
+}
+
+// the browser drops the connections of a page going away, not the queries
+window.addEventListener("pagehide", () => [...pendingTokens].forEach(cancelRequest));
+
+/**
+ * POST ``body`` as JSON to ``url`` with the CSRF token and a new request
+ * token: aborting ``signal`` cancels the query on the server too.
+ */
+async function postRequest(url, body, { headers = {}, signal, priority } = {}) {
+    const token = newRequestToken();
+    const onAbort = () => cancelRequest(token);
+    pendingTokens.add(token);
+    signal?.addEventListener("abort", onAbort, { once: true });
+    try {
+        return await fetch(url, {
+            method: "POST",
+            headers: { "Content-Type": "application/json", ...headers },
+            body: JSON.stringify({ ...body, csrf_token: odoo.csrf_token, request_token: token }),
+            signal,
+            priority,
+        });
+    } finally {
+        pendingTokens.delete(token);
+        signal?.removeEventListener("abort", onAbort);
+    }
+}
+
+function wait(delay, signal) {
+    return new Promise((resolve) => {
+        const timer = setTimeout(resolve, delay);
+        signal?.addEventListener("abort", () => {
+            clearTimeout(timer);
+            resolve();
+        }, { once: true });
+    });
+}
+
+/**
+ * Fetch ``model.get_dashboard_data_json(**kwargs)`` through the plain JSON
+ * route: the stored payload comes back as an object, without the second
+ * encoding of the JSON-RPC envelope, and gzipped when it is large.
+ *
+ * With an ``etag`` the request is conditional: an unchanged payload resolves
+ * to ``{ notModified: true }`` instead of being downloaded again. Aborting
+ * ``signal`` drops the response and cancels the query on the server.
+ * ``priority`` is passed on as the fetch priority hint. The row lists of
+ * ``COLUMNAR_MODELS`` come back column-wise, to be read with ``decodeRows``.
+ */
+export async function fetchDashboardData(model, kwargs = {}, { etag, signal, priority } = {}) {
+    const headers = {};
+    if (etag) {
+        headers["If-None-Match"] = etag;
+    }
+    const response = await postRequest(`/my_dashboard/data/${model}`, {
+        kwargs,
+        encoding: COLUMNAR_MODELS.has(model) ? "columnar" : undefined,
+    }, { headers, signal, priority });
+    if (etag && response.status === 304) {
+        return { notModified: true };
+    }
+    if (!response.ok) {
+        throw new Error(`Dashboard data request failed (${response.status})`);
+    }
+    const data = await response.json();
+    return etag === undefined ? data : { data, etag: response.headers.get("ETag") };
+}
+
+/**
+ * Fetch several payloads in one request, computed one after the other by
+ * the server with shared caches. ``requests`` are ``[model, kwargs, etag]``
+ * triples; ``kwargs.sections`` is sent as the ``sections`` of the request.
+ * Resolves to ``{ data, etag }`` or, when ``etag`` is still current,
+ * ``{ notModified: true, etag }`` per request, in order. Aborting
+ * ``signal`` cancels the whole batch.
+ */
+export async function fetchDashboardBatch(requests, { signal, priority } = {}) {
+    const response = await postRequest("/my_dashboard/batch", {
+        requests: requests.map(([model, { sections, ...filters } = {}, etag]) => ({
+            model,
+            filters,
+            sections,
+            etag: etag || undefined,
+            encoding: COLUMNAR_MODELS.has(model) ? "columnar" : undefined,
+        })),
+    }, { signal, priority });
+    if (!response.ok) {
+        throw new Error(`Dashboard batch request failed (${response.status})`);
+    }
+    const { results } = await response.json();
+    return results.map((result) => result.not_modified
+        ? { notModified: true, etag: result.etag }
+        : { data: result.data, etag: result.etag });
+}
+
+/**
+ * Stale-while-revalidate load of a dashboard payload.
+ *
+ * ``onData(data)`` is called right away with the copy kept in IndexedDB, if
+ * any, then the server is asked whether it changed; the payload is only
+ * downloaded (and ``onData`` called again) when it did. The returned promise
+ * resolves once the server answered.
+ *
+ * The server is only asked after ``delay`` ms, so clicking through several
+ * filter values sends one request. Aborting ``signal`` (see
+ * ``DashboardRequests``) skips or cancels the request and resolves quietly.
+ */
+export async function loadDashboardData(model, kwargs, onData, { signal, delay = 0 } = {}) {
+    const key = snapshotKey(model, kwargs);
+    const cached = await getSnapshot(key);
+    if (signal?.aborted) {
+        return;
+    }
+    if (cached) {
+        onData(cached.data);
+    }
+    if (delay) {
+        await wait(delay, signal);
+    }
+    if (signal?.aborted) {
+        return;
+    }
+    let result;
+    try {
+        result = await fetchDashboardData(model, kwargs, { etag: cached?.etag || "", signal });
+    } catch (error) {
+        if (signal?.aborted) {
+            return;
+        }
+        throw error;
+    }
+    if (result.notModified || signal?.aborted) {
+        return;
+    }
+    // stored before the widget gets (and possibly mutates) the payload
+    if (result.etag) {
+        putSnapshot(key, result.etag, result.data);
+    }
+    onData(result.data);
+}
+
+/**
+ * The in-flight load of a widget: starting a new one aborts the previous
+ * one, so results of an outdated filter selection never render.
+ */
+export class DashboardRequests {
+    constructor() {
+        this.controller = null;
+    }
+
+    /** Abort the current load and return the signal of the next one. */
+    next() {
+        this.abort();
+        this.controller = new AbortController();
+        return this.controller.signal;
+    }
+
+    abort() {
+        if (this.controller) {
+            this.controller.abort();
+            this.controller = null;
+        }
+    }
+}
@@ -1,20 +1,84 @@
 /** @odoo-module **/
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
+import { DashboardRequests, FILTER_DEBOUNCE, loadDashboardData } from "@my_dashboard/js/dashboard_transport";
+import { adjacentPeriods, prefetchDashboardData } from "@my_dashboard/js/dashboard_prefetch";
+import { formatAmount } from "@my_dashboard/js/dashboard_format";
+import { decodeRows, rowValue } from "@my_dashboard/js/columnar_rows";
+import { useVirtualRows } from "@my_dashboard/js/virtual_rows";
 var translation = require('web.translation');
 var _t = translation._t;
-const { Component, useEffect, useState } = owl;
+const { Component, onWillUnmount, useEffect, useRef, useState } = owl;
+
+// Table columns of each report tab. Amount columns hold numbers, formatted
+// with the payload format (in the currency of ``currencyField`` if any).
+const COLUMNS = {
+    sales: [
+        { field: 'date', label: 'Date' },
+        { field: 'sales_order_no', label: 'Sale Order No' },
+        { field: 'tags', label: 'Tags' },
+        { field: 'customer', label: 'Customer' },
+        { field: 'sale_person', label: 'Sale Person' },
+        { field: 'untaxed_amount', label: 'Untaxed Amount', numeric: true, amount: true, symbol: true, currencyField: 'currency' },
+        { field: 'converted_amount', label: 'Converted Amount', numeric: true, amount: true, symbol: true },
+    ],
+    revenue: [
+        { field: 'date', label: 'Date' },
+        { field: 'invoice_no', label: 'Invoice No' },
+        { field: 'sales_order_no', label: 'Sale Order No' },
+        { field: 'local_export', label: 'Local/Export' },
+        { field: 'tags', label: 'Tags' },
+        { field: 'customer', label: 'Customer' },
+        { field: 'untaxed_amount', label: 'Untaxed Amount', numeric: true, amount: true },
+        { field: 'payment_status', label: 'Payment Status', numeric: true },
+    ],
+    expense: [
+        { field: 'date', label: 'Date' },
+        { field: 'bill_no', label: 'Bill No' },
+        { field: 'vendor', label: 'Vendor' },
+        { field: 'local_export', label: 'Local/Export' },
+        { field: 'tags', label: 'Tags' },
+        { field: 'source_document', label: 'Source Document' },
+        { field: 'tax_excluded', label: 'Tax Excluded', numeric: true, amount: true },
+        { field: 'payment_status', label: 'Payment Status', numeric: true },
+    ],
+    cashflow: [
+        { field: 'date', label: 'Date' },
+        { field: 'inflow_outflow', label: 'Inflow/Outflow' },
+        { field: 'project', label: 'Project' },
+        { field: 'local_export', label: 'Local/Export' },
+        { field: 'tags', label: 'Tags' },
+        { field: 'source_document', label: 'Source Document' },
+        { field: 'payment_amount', label: 'Payment Amount', numeric: true, amount: true },
+        { field: 'payment_status', label: 'Payment Status', numeric: true },
+    ],
+};
 
 export class Dashboard extends Component {
     static template = 'custom.druksmart_dashboard_reports'
 
     setup() {
         this.actionService = useService("action");
+        this.requestId = 0;
+        this.requests = new DashboardRequests();
+        this.prefetches = new DashboardRequests();
+        onWillUnmount(() => {
+            this.requests.abort();
+            this.prefetches.abort();
+        });
+        this.columns = COLUMNS;
+        // only the rows scrolled into view are rendered
+        this.virtual = useVirtualRows({ rowHeight: 33 });
+        this.scrollerRef = useRef("scroller");
+        this.itemsCache = { key: null, items: [] };
 
         this.state = useState({
             selectedCategory: this.props.record.data.category || "sales",
             openedGroups: {},
+            dataVersion: 0,
             main_data: {
+                format: null,
+
                 sales: [],
                 total_sales_local_untaxed: 0,
                 total_sales_export_untaxed: 0,
@@ -71,6 +135,7 @@ export class Dashboard extends Component {
             // this.props.record.data.category = category;
             this.props.record.update({ category: category });
             this.state.openedGroups = {}; // reset opened groups on category switch
+            this.virtual.reset(this.scrollerRef.el);
         };
 
         this.toggleGroup = (groupKey) => {
@@ -81,6 +146,77 @@ export class Dashboard extends Component {
             return !!this.state.openedGroups[key];
         }
 
+        // amounts are sent as numbers: format them with the payload format
+        this.formatAmount = (value, options) => formatAmount(value, this.state.main_data.format, options);
+
+        // rows may be column-wise: values are read in place, by row index
+        this.formatCell = (item, column) => {
+            const value = rowValue(item.rows, item.index, column.field);
+            if (!column.amount) {
+                return value;
+            }
+            return this.formatAmount(value, {
+                currency: column.currencyField && rowValue(item.rows, item.index, column.currencyField),
+                symbol: column.symbol,
+            });
+        };
+
+        // the sales totals are in the company currency, shown with its symbol
+        this.formatTotal = (category, value) => {
+            return value === undefined ? '--' : this.formatAmount(value, { symbol: category === 'sales' });
+        };
+
+        /**
+         * Flat list of group headers and rows of the selected tab, as rendered
+         * by the virtual table: rows of collapsed groups are left out. The list
+         * is only rebuilt when the data, the tab or the opened groups change.
+         */
+        this.getItems = () => {
+            const category = this.state.selectedCategory;
+            const opened = Object.keys(this.state.openedGroups).filter((key) => this.state.openedGroups[key]);
+            const cacheKey = `${this.state.dataVersion}|${category}|${opened.join(',')}`;
+            if (this.itemsCache.key === cacheKey) {
+                return this.itemsCache.items;
+            }
+            const data = this.state.main_data;
+            let groups;
+            if (category === 'cashflow') {
+                groups = [
+                    { key: 'INFLOW - LOCAL', rows: data.cashflows.inflows.locals, totals: [['TOTAL', this.formatTotal(category, data.total_local_cashflow_inflow)]] },
+                    { key: 'INFLOW - EXPORT', rows: data.cashflows.inflows.exports, totals: [['TOTAL', this.formatTotal(category, data.total_export_cashflow_inflow)]] },
+                    { key: 'OUTFLOW - LOCAL', rows: data.cashflows.outflows.locals, totals: [['TOTAL', this.formatTotal(category, data.total_local_cashflow_outflow)]] },
+                    { key: 'OUTFLOW - EXPORT', rows: data.cashflows.outflows.exports, totals: [['TOTAL', this.formatTotal(category, data.total_export_cashflow_outflow)]] },
+                ];
+            } else {
+                const prefix = `total_${category}_`;
+                const rows = data[category === 'sales' ? 'sales' : `${category}s`];
+                groups = Object.entries(data[`grouped_${category}s`] || {}).map(([key, indexes]) => ({
+                    key,
+                    rows,
+                    indexes,
+                    totals: [
+                        // not converted totals mix the currencies of the rows
+                        ['TOTAL UNTAXED', this.formatAmount(data[`${prefix}${key.toLowerCase()}_untaxed_not_converted`] ?? '--')],
+                        ['TOTAL', this.formatTotal(category, data[`${prefix}${key.toLowerCase()}_untaxed`])],
+                    ],
+                }));
+            }
+            const items = [];
+            for (const group of groups) {
+                const headerIndex = items.length;
+                items.push({ ...group, group: true, headerIndex, rows: undefined, indexes: undefined });
+                if (this.state.openedGroups[group.key]) {
+                    const indexes = group.indexes || Array.from({ length: group.rows.length }, (_, index) => index);
+                    for (const index of indexes) {
+                        const id = rowValue(group.rows, index, 'id') ?? index;
+                        items.push({ key: `${headerIndex}-${id}`, rows: group.rows, index, headerIndex });
+                    }
+                }
+            }
+            this.itemsCache = { key: cacheKey, items };
+            return items;
+        };
+
         useEffect(() => {
             console.log(this.props.record.data.category);
 
@@ -92,68 +228,106 @@ export class Dashboard extends Component {
         useEffect(() => {
             if (this.props.record.data.dashboard_data) {
                 try {
-                    const parsedData = JSON.parse(this.props.record.data.dashboard_data);
-                    const groupByLE = (records) => {
-                        return (records || []).reduce((acc, cur) => {
-                            const key = cur.local_export || "Unknown";
-                            acc[key] = acc[key] || [];
-                            acc[key].push(cur);
-                            return acc;
-                        }, {});
-                    };
+                    const parsed = JSON.parse(this.props.record.data.dashboard_data);
+                    const requestId = ++this.requestId;
+                    const applyData = (parsedData) => {
+                        if (requestId !== this.requestId) {
+                            return;
+                        }
+                        // row lists may come column-wise: groups hold row indexes
+                        const sales = decodeRows(parsedData.sales_data?.sales);
+                        const revenues = decodeRows(parsedData.revenue_data?.revenues);
+                        const expenses = decodeRows(parsedData.expense_data?.expenses);
+                        const cashflows = parsedData.cashflow_data?.cashflows;
+                        const groupByLE = (rows) => {
+                            if (rows.groupIndexes) {
+                                return rows.groupIndexes('local_export', "Unknown");
+                            }
+                            return rows.reduce((acc, cur, index) => {
+                                const key = cur.local_export || "Unknown";
+                                acc[key] = acc[key] || [];
+                                acc[key].push(index);
+                                return acc;
+                            }, {});
+                        };
+
+                        console.log(this.state.main_data)
+
+                        this.state.dataVersion++;
+                        Object.assign(this.state.main_data, {
+                            format: parsedData.format || null,
+                            sales,
+                            total_sales_local_untaxed: parsedData.sales_data?.total_sales_local_untaxed || 0,
+                            total_sales_export_untaxed: parsedData.sales_data?.total_sales_export_untaxed || 0,
+                            total_sales_other_untaxed: parsedData.sales_data?.total_sales_other_untaxed || 0,
+                            total_sales_local_untaxed_not_converted: parsedData.sales_data?.total_sales_local_untaxed_not_converted || 0,
+                            total_sales_export_untaxed_not_converted: parsedData.sales_data?.total_sales_export_untaxed_not_converted || 0,
+                            total_sales_other_untaxed_not_converted: parsedData.sales_data?.total_sales_other_untaxed_not_converted || 0,
+                            total_sales_untaxed: parsedData.sales_data?.total_sales_untaxed || 0,
+                            grouped_saless: groupByLE(sales),
 
-                    console.log(this.state.main_data)
-
-                    Object.assign(this.state.main_data, {
-                        sales: parsedData.sales_data?.sales || [],
-                        total_sales_local_untaxed: parsedData.sales_data?.total_sales_local_untaxed || 0,
-                        total_sales_export_untaxed: parsedData.sales_data?.total_sales_export_untaxed || 0,
-                        total_sales_other_untaxed: parsedData.sales_data?.total_sales_other_untaxed || 0,
-                        total_sales_local_untaxed_not_converted: parsedData.sales_data?.total_sales_local_untaxed_not_converted || 0,
-                        total_sales_export_untaxed_not_converted: parsedData.sales_data?.total_sales_export_untaxed_not_converted || 0,
-                        total_sales_other_untaxed_not_converted: parsedData.sales_data?.total_sales_other_untaxed_not_converted || 0,
-                        total_sales_untaxed: parsedData.sales_data?.total_sales_untaxed || 0,
-                        grouped_saless: groupByLE(parsedData.sales_data?.sales),
-
-                        revenues: parsedData.revenue_data?.revenues || [],
-                        total_revenue_local_untaxed: parsedData.revenue_data?.total_local_revenue_untaxed || 0,
-                        total_revenue_export_untaxed: parsedData.revenue_data?.total_export_revenue_untaxed || 0,                        
-                        total_revenue_other_untaxed: parsedData.revenue_data?.total_other_revenue_untaxed || 0,                        
-                        total_revenue_local_untaxed_not_converted: parsedData.revenue_data?.total_local_revenue_untaxed_not_converted || 0,
-                        total_revenue_export_untaxed_not_converted: parsedData.revenue_data?.total_export_revenue_untaxed_not_converted || 0,                        
-                        total_revenue_other_untaxed_not_converted: parsedData.revenue_data?.total_other_revenue_untaxed_not_converted || 0,                        
-                        total_revenue_untaxed: parsedData.revenue_data?.total_revenue_untaxed || 0,                        
-                        grouped_revenues: groupByLE(parsedData.revenue_data?.revenues),
-
-                        expenses: parsedData.expense_data?.expenses || [],
-                        total_expense_local_untaxed: parsedData.expense_data?.total_expenses_local_untaxed || 0,
-                        total_expense_export_untaxed: parsedData.expense_data?.total_expenses_export_untaxed || 0,                        
-                        total_expense_other_untaxed: parsedData.expense_data?.total_expenses_other_untaxed || 0,                        
-                        total_expense_local_untaxed_not_converted: parsedData.expense_data?.total_expenses_local_untaxed_not_converted || 0,
-                        total_expense_export_untaxed_not_converted: parsedData.expense_data?.total_expenses_export_untaxed_not_converted || 0,                        
-                        total_expense_other_untaxed_not_converted: parsedData.expense_data?.total_expenses_other_untaxed_not_converted || 0,                        
-                        total_expense_untaxed: parsedData.expense_data?.total_expense_untaxed || 0,                        
-                        grouped_expenses: groupByLE(parsedData.expense_data?.expenses),
-
-                        cashflows: {
-                            inflows: {
-                                locals: parsedData.cashflow_data?.cashflows?.inflows?.locals || [],
-                                exports: parsedData.cashflow_data?.cashflows?.inflows?.exports || []
+                            revenues,
+                            total_revenue_local_untaxed: parsedData.revenue_data?.total_local_revenue_untaxed || 0,
+                            total_revenue_export_untaxed: parsedData.revenue_data?.total_export_revenue_untaxed || 0,                        
+                            total_revenue_other_untaxed: parsedData.revenue_data?.total_other_revenue_untaxed || 0,                        
+                            total_revenue_local_untaxed_not_converted: parsedData.revenue_data?.total_local_revenue_untaxed_not_converted || 0,
+                            total_revenue_export_untaxed_not_converted: parsedData.revenue_data?.total_export_revenue_untaxed_not_converted || 0,                        
+                            total_revenue_other_untaxed_not_converted: parsedData.revenue_data?.total_other_revenue_untaxed_not_converted || 0,                        
+                            total_revenue_untaxed: parsedData.revenue_data?.total_revenue_untaxed || 0,                        
+                            grouped_revenues: groupByLE(revenues),
+
+                            expenses,
+                            total_expense_local_untaxed: parsedData.expense_data?.total_expenses_local_untaxed || 0,
+                            total_expense_export_untaxed: parsedData.expense_data?.total_expenses_export_untaxed || 0,                        
+                            total_expense_other_untaxed: parsedData.expense_data?.total_expenses_other_untaxed || 0,                        
+                            total_expense_local_untaxed_not_converted: parsedData.expense_data?.total_expenses_local_untaxed_not_converted || 0,
+                            total_expense_export_untaxed_not_converted: parsedData.expense_data?.total_expenses_export_untaxed_not_converted || 0,                        
+                            total_expense_other_untaxed_not_converted: parsedData.expense_data?.total_expenses_other_untaxed_not_converted || 0,                        
+                            total_expense_untaxed: parsedData.expense_data?.total_expense_untaxed || 0,                        
+                            grouped_expenses: groupByLE(expenses),
+
+                            cashflows: {
+                                inflows: {
+                                    locals: decodeRows(cashflows?.inflows?.locals),
+                                    exports: decodeRows(cashflows?.inflows?.exports)
+                                },
+                                outflows: {
+                                    locals: decodeRows(cashflows?.outflows?.locals),
+                                    exports: decodeRows(cashflows?.outflows?.exports)
+                                }
                             },
-                            outflows: {
-                                locals: parsedData.cashflow_data?.cashflows?.outflows?.locals || [],
-                                exports: parsedData.cashflow_data?.cashflows?.outflows?.exports || []
-                            }
-                        },
-                        total_local_cashflow_inflow: parsedData.cashflow_data?.total_local_cashflow_inflow || 0,
-                        total_export_cashflow_inflow: parsedData.cashflow_data?.total_export_cashflow_inflow || 0,
-                        total_local_cashflow_outflow: parsedData.cashflow_data?.total_local_cashflow_outflow || 0,
-                        total_export_cashflow_outflow: parsedData.cashflow_data?.total_export_cashflow_outflow || 0,
-                        net_local_cashflow: parsedData.cashflow_data?.net_local_cashflow || 0,
-                        net_export_cashflow: parsedData.cashflow_data?.net_export_cashflow || 0,
-                        total_net_cashflow: parsedData.cashflow_data?.total_net_cashflow || 0,
-                        // grouped_cashflows: groupByInflowAndLE(parsedData.cashflow_data?.cashflows),
-                    });
+                            total_local_cashflow_inflow: parsedData.cashflow_data?.total_local_cashflow_inflow || 0,
+                            total_export_cashflow_inflow: parsedData.cashflow_data?.total_export_cashflow_inflow || 0,
+                            total_local_cashflow_outflow: parsedData.cashflow_data?.total_local_cashflow_outflow || 0,
+                            total_export_cashflow_outflow: parsedData.cashflow_data?.total_export_cashflow_outflow || 0,
+                            net_local_cashflow: parsedData.cashflow_data?.net_local_cashflow || 0,
+                            net_export_cashflow: parsedData.cashflow_data?.net_export_cashflow || 0,
+                            total_net_cashflow: parsedData.cashflow_data?.total_net_cashflow || 0,
+                            // grouped_cashflows: groupByInflowAndLE(parsedData.cashflow_data?.cashflows),
+                        });
+                    };
+
+                    // lazy records only carry the filters: fetch the rows as an
+                    // object instead of a JSON string inside the record, showing
+                    // the copy cached in the browser meanwhile, then prefetch the
+                    // previous and next periods while the browser is idle
+                    if (parsed.lazy) {
+                        const { category, year, month, quarter } = this.props.record.data;
+                        const signal = this.requests.next();
+                        this.prefetches.abort();
+                        loadDashboardData('druksmart_dashboard.reports', { category, year, month, quarter }, applyData, { signal, delay: FILTER_DEBOUNCE })
+                            .then(() => {
+                                if (!signal.aborted) {
+                                    const requests = adjacentPeriods({ year, month, quarter }).map((period) =>
+                                        ['druksmart_dashboard.reports', { category, ...period }]
+                                    );
+                                    prefetchDashboardData(requests, { signal: this.prefetches.next() });
+                                }
+                            })
+                            .catch((e) => console.error("Error loading dashboard data:", e));
+                    } else {
+                        applyData(parsed);
+                    }
 
                 } catch (e) {
                     console.error("Error parsing dashboard data:", e);
@@ -163,4 +337,4 @@ export class Dashboard extends Component {
     }
 }
 
-registry.category("fields").add("druksmart_dashboard_reports", Dashboard);
+registry.category("my_dashboard.lazy_fields").add("druksmart_dashboard_reports", Dashboard);
@@ -1,25 +1,68 @@
 /** @odoo-module **/
-import { loadJS } from "@web/core/assets";
-
 import { registry } from "@web/core/registry";
-const { Component, useEffect, useState } = owl;
-
-const CHART_JS_URL = "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js";
+import { useService } from "@web/core/utils/hooks";
+import { ChartLayer } from "@my_dashboard/js/chart_layer";
+const { Component, onWillUnmount, useEffect, useState } = owl;
 
 export class Dashboard extends Component {
     static template = "custom.hr_dashboard";
 
     setup() {
         super.setup();
-        this.state = useState({ main_data: [] });
+        this.state = useState({ main_data: [], expandedDepartments: {}, trendDimension: "total", trend: null });
+        this.orm = useService("orm");
+        // charts are kept alive across reloads and updated in place
+        this.charts = new ChartLayer();
+        onWillUnmount(() => this.charts.destroyAll());
 
         useEffect(() => {
             const parsedData = JSON.parse(this.props.record.data.dashboard_data || "{}");
             this.state.main_data = parsedData;
-            loadJS(CHART_JS_URL).then(() => {
-                this.renderCharts();
-            });
+            // Chart.js comes with the dashboard bundle
+            this.renderCharts();
         }, () => [this.props.record.data.dashboard_data]);
+
+        // the trend is read from the headcount snapshots, not from the payload
+        useEffect(() => {
+            this.loadTrend(this.state.trendDimension);
+        }, () => [this.state.trendDimension]);
+    }
+
+    /**
+     * Headcount of the last twelve months, split by the selected dimension
+     * (total, department, gender or category).
+     */
+    async loadTrend(dimension) {
+        const toDate = (d) => `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, "0")}-${String(d.getDate()).padStart(2, "0")}`;
+        const today = new Date();
+        const yearAgo = new Date(today.getFullYear() - 1, today.getMonth(), today.getDate());
+        const trend = await this.orm.call("hr.dashboard", "get_headcount_trend", [], {
+            date_from: toDate(yearAgo),
+            date_to: toDate(today),
+            dimension,
+        });
+        // a newer selection replaced this one meanwhile
+        if (dimension !== this.state.trendDimension) return;
+        this.state.trend = trend;
+        this.renderTrendChart(trend);
+    }
+
+    onTrendDimensionChange(ev) {
+        this.state.trendDimension = ev.target.value;
+    }
+
+    /**
+     * Department hierarchy: children are only rendered once their parent is
+     * expanded, the roll-up counts already come with the payload.
+     */
+    toggleDepartment(node) {
+        if (!node.children.length) return;
+        const key = String(node.id);
+        this.state.expandedDepartments[key] = !this.state.expandedDepartments[key];
+    }
+
+    isDepartmentExpanded(node) {
+        return !!this.state.expandedDepartments[String(node.id)];
     }
 
     renderCharts() {
@@ -50,7 +93,7 @@ export class Dashboard extends Component {
 
         const gradient = this._gradient(ctx, "#6366f1", "#a855f7");
 
-        new Chart(ctx, {
+        this.charts.chartjs("department", canvas, {
             type: "bar",
             data: {
                 labels,
@@ -169,6 +212,58 @@ export class Dashboard extends Component {
         });
     }
 
+    renderTrendChart(trend) {
+        const canvas = document.getElementById("headcount_trend");
+        if (!canvas) return;
+
+        const colors = ["#6366f1", "#f472b6", "#10b981", "#f59e0b", "#06b6d4", "#ef4444", "#8b5cf6", "#84cc16"];
+        this.charts.chartjs("headcount_trend", canvas, {
+            type: "line",
+            data: {
+                labels: trend.dates,
+                datasets: trend.series.map((serie, index) => ({
+                    label: serie.name,
+                    data: serie.data,
+                    borderColor: colors[index % colors.length],
+                    backgroundColor: colors[index % colors.length],
+                    borderWidth: 2,
+                    pointRadius: 0,
+                    tension: 0.25,
+                })),
+            },
+            options: {
+                maintainAspectRatio: false,
+                animation: { duration: 800, easing: "easeOutQuart" },
+                interaction: { mode: "index", intersect: false },
+                plugins: {
+                    legend: {
+                        display: trend.series.length > 1,
+                        position: "bottom",
+                        labels: { color: "#334155", usePointStyle: true, boxWidth: 10 },
+                    },
+                    tooltip: {
+                        backgroundColor: "#0f172a",
+                        titleColor: "#fff",
+                        bodyColor: "#cbd5e1",
+                        padding: 10,
+                        cornerRadius: 8,
+                    }
+                },
+                scales: {
+                    x: {
+                        grid: { display: false },
+                        ticks: { color: "#64748b", maxTicksLimit: 12 }
+                    },
+                    y: {
+                        beginAtZero: true,
+                        grid: { color: "#e2e8f0" },
+                        ticks: { color: "#64748b", precision: 0 }
+                    }
+                }
+            }
+        });
+    }
+
     renderGenderChart() {
         const canvas = document.getElementById("gender");
         if (!canvas) return;
@@ -178,7 +273,7 @@ export class Dashboard extends Component {
         const labels = data.map(g => g.name);
         const values = data.map(g => g.value);
 
-        new Chart(ctx, {
+        this.charts.chartjs("gender", canvas, {
             type: "doughnut",
             data: {
                 labels,
@@ -240,7 +335,7 @@ export class Dashboard extends Component {
 
         const gradient = this._gradient(ctx, "#10b981", "#06b6d4", true);
 
-        new Chart(ctx, {
+        this.charts.chartjs("category", canvas, {
             type: "bar",
             data: {
                 labels,
@@ -282,4 +377,4 @@ export class Dashboard extends Component {
     }
 }
 
-registry.category("fields").add("hr_dashboard", Dashboard);
+registry.category("my_dashboard.lazy_fields").add("hr_dashboard", Dashboard);
@@ -1,18 +1,14 @@
 /** @odoo-module **/
 import { registry } from "@web/core/registry";
-import { loadJS } from "@web/core/assets";
-import { loadCSS } from "@web/core/assets";
-
-await loadCSS("https://cdn.jsdelivr.net/npm/apexcharts/dist/apexcharts.css");
-
-const CHART_JS_URL = "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js";
+import { ChartLayer } from "@my_dashboard/js/chart_layer";
+import { formatAmount, formatPercent } from "@my_dashboard/js/dashboard_format";
 
 const { Component, useEffect, useState, useRef } = owl;
 const _t = require("web.translation")._t;
 
 export class Dashboard extends Component {
   setup() {
-    this.charts = {};
+    this.charts = new ChartLayer();
 
     this.state = useState({
       main_data: {},
@@ -50,24 +46,15 @@ export class Dashboard extends Component {
         this.state.main_data = parsed;
         this.state.isLoading = false;
 
-        Promise.all([
-          loadJS("https://cdn.jsdelivr.net/npm/apexcharts"),
-          loadJS(CHART_JS_URL),
-        ])
-          .then(() => {
-            this._initDashboard();
-            try {
-              this._renderCharts();
-            } catch (error) {
-              console.error("Chart render error:", error);
-              this.state.error = true;
-              this.state.errorMessage = _t("Failed to render charts.");
-            }
-          })
-          .catch(() => {
-            this.state.error = true;
-            this.state.errorMessage = _t("Failed to load chart libraries.");
-          });
+        // Chart.js comes with the dashboard bundle
+        this._initDashboard();
+        try {
+          this._renderCharts();
+        } catch (error) {
+          console.error("Chart render error:", error);
+          this.state.error = true;
+          this.state.errorMessage = _t("Failed to render charts.");
+        }
       },
       () => [this.props.record?.data?.dashboard_data]
     );
@@ -79,7 +66,7 @@ export class Dashboard extends Component {
     this.targetBarChartRef = useRef("targetBarChart");
   }
 
-  // ---------- external tooltip host (Apex charts) ----------
+  // ---------- external tooltip host ----------
   _ensureTooltipHost() {
     if (!document.getElementById("l1-exttip-style")) {
       const css = document.createElement("style");
@@ -156,7 +143,8 @@ export class Dashboard extends Component {
 
   _renderCharts() {
     if (this.state.error) return;
-    this._destroyCharts();
+    // charts are kept alive and updated in place, see ChartLayer
+    this._hideExtTip();
 
     if (this.salesChartRef.el) {
       this._renderSalesChart();
@@ -195,78 +183,102 @@ export class Dashboard extends Component {
 
     const yMax = this._padMax(Math.max(...salesData));
 
-    const options = {
-      series: [{ name: 'Total Sales', data: salesData.slice(0, length) }],
-      chart: {
-        type: 'bar',
-        height: 380,
-        toolbar: { show: false },
-        fontFamily: "Inter, Roboto, sans-serif",
-        animations: { enabled: true, easing: "easeinout", speed: 800 },
-        events: {
-          click: () => this._navigateToL2Dashboard(),
-          mouseLeave: () => this._hideExtTip(),
-        },
+    let canvas = element.tagName === "CANVAS" ? element : element.querySelector("canvas");
+    if (!canvas) {
+      canvas = document.createElement("canvas");
+      element.innerHTML = "";
+      element.appendChild(canvas);
+    }
+    element.style.height = "380px";
+    canvas.height = 380;
+
+    this._createChart("salesChart", canvas, {
+      type: "bar",
+      data: {
+        labels: months.slice(0, length),
+        datasets: [
+          {
+            label: "Total Sales",
+            data: salesData.slice(0, length),
+            backgroundColor: this.palette.sales,
+            borderColor: "#fff",
+            borderWidth: 1,
+            borderRadius: 6,
+            categoryPercentage: 0.6,
+          },
+        ],
       },
-      colors: [this.palette.sales],
-      plotOptions: {
-        bar: {
-          borderRadius: 6,
-          columnWidth: "60%",
-          distributed: false,
-          dataLabels: { position: "top" },
+      options: {
+        onClick: () => this._navigateToL2Dashboard(),
+        onHover: (evt, elements, chart) => {
+          chart.canvas.style.cursor = elements.length ? 'pointer' : 'default';
         },
-      },
-      dataLabels: {
-        enabled: true,
-        formatter: (val) => this.formatMillionsShort(val),
-        offsetY: -14,
-        style: { fontSize: "11px", fontWeight: 700, colors: ["#111"] },
-      },
-      stroke: { width: 1, colors: ["#fff"] },
-      grid: { borderColor: "#e0e0e0", strokeDashArray: 4 },
-      xaxis: {
-        categories: months.slice(0, length),
-        labels: { rotate: -45, style: { fontSize: "11px", fontWeight: 500, colors: "#333" } },
-        axisTicks: { show: false },
-        axisBorder: { color: "#ccc" },
-      },
-      yaxis: {
-        min: 0,
-        max: yMax,
-        tickAmount: 5,
-        labels: { show: false },
-        title: { text: undefined },
-      },
-      fill: { type: "solid", opacity: 0.9 },
-      tooltip: {
-        shared: false,
-        intersect: true,
-        custom: ({ dataPointIndex, w }) => {
-          const label = months[dataPointIndex] ?? "";
-          const total = salesData[dataPointIndex] ?? 0;
-          const local = localData[dataPointIndex] || 0;
-          const exportVal = exportData[dataPointIndex] || 0;
-          const x = w?.globals?.clientX ?? 0;
-          const y = w?.globals?.clientY ?? 0;
-
-          const html = `
-            <div class="l1-head">${label} ${year}</div>
-            <div class="l1-row"><span><span class="l1-dot" style="background:${this.palette.sales}"></span>Total</span><b>${this.formatNumber(total)}</b></div>
-            ${(local || exportVal) ? `
-              <div style="margin: 6px 0; border-top: 1px solid rgba(0,0,0,.1);"></div>
-              <div class="l1-row"><span>Local</span><b>${this.formatNumber(local)}</b></div>
-              <div class="l1-row"><span>Export</span><b>${this.formatNumber(exportVal)}</b></div>
-            ` : ''}
-          `;
-          this._showExtTip(html, x, y);
-          return '<div></div>';
+        responsive: true,
+        maintainAspectRatio: false,
+        layout: { padding: { top: 24, right: 12, bottom: 8, left: 12 } },
+        plugins: {
+          title: { display: false },
+          legend: { display: false },
+          tooltip: {
+            enabled: false,
+            external: ({ chart, tooltip }) => {
+              if (!tooltip.opacity || !tooltip.dataPoints?.length) {
+                this._hideExtTip();
+                return;
+              }
+              const index = tooltip.dataPoints[0].dataIndex;
+              const label = months[index] ?? "";
+              const total = salesData[index] ?? 0;
+              const local = localData[index] || 0;
+              const exportVal = exportData[index] || 0;
+              const rect = chart.canvas.getBoundingClientRect();
+
+              const html = `
+                <div class="l1-head">${label} ${year}</div>
+                <div class="l1-row"><span><span class="l1-dot" style="background:${this.palette.sales}"></span>Total</span><b>${this.formatNumber(total)}</b></div>
+                ${(local || exportVal) ? `
+                  <div style="margin: 6px 0; border-top: 1px solid rgba(0,0,0,.1);"></div>
+                  <div class="l1-row"><span>Local</span><b>${this.formatNumber(local)}</b></div>
+                  <div class="l1-row"><span>Export</span><b>${this.formatNumber(exportVal)}</b></div>
+                ` : ''}
+              `;
+              this._showExtTip(html, rect.left + tooltip.caretX, rect.top + tooltip.caretY);
+            },
+          },
+        },
+        scales: {
+          x: {
+            grid: { display: false, drawBorder: false },
+            ticks: { maxRotation: 45, minRotation: 45, font: { size: 11, weight: "500" }, color: "#333" },
+          },
+          y: {
+            min: 0,
+            max: yMax,
+            ticks: { display: false, maxTicksLimit: 6 },
+            grid: { color: "#e0e0e0", borderDash: [4,4], drawBorder: false },
+          },
         },
       },
-      legend: { show: false },
-    };
-
-    this._createChart("salesChart", element, options);
+      plugins: [{
+        id: 'customDataLabels',
+        afterDatasetsDraw: (chart) => {
+          const ctx = chart.ctx;
+          chart.data.datasets.forEach((dataset, datasetIndex) => {
+            const meta = chart.getDatasetMeta(datasetIndex);
+            if (!meta.hidden) {
+              meta.data.forEach((bar, index) => {
+                ctx.fillStyle = '#111';
+                ctx.font = '700 11px Inter, sans-serif';
+                ctx.textAlign = 'center';
+                ctx.textBaseline = 'bottom';
+                ctx.fillText(this.formatMillionsShort(dataset.data[index]), bar.x, bar.y - 6);
+              });
+            }
+          });
+        }
+      }]
+    });
+    canvas.onmouseleave = () => this._hideExtTip();
   }
 
   _renderRevenueExpensesChart() {
@@ -301,13 +313,7 @@ export class Dashboard extends Component {
     element.style.height = "380px";
     canvas.height = 380;
 
-    if (element._chartjs?.destroy) {
-      try { element._chartjs.destroy(); } catch {}
-    }
-
-    const ctx = canvas.getContext("2d");
-
-    element._chartjs = new Chart(ctx, {
+    this._createChart("revenueExpensesChart", canvas, {
       type: "line",
       data: {
         labels: months.slice(0, length),
@@ -455,13 +461,7 @@ export class Dashboard extends Component {
     element.style.height = "380px";
     canvas.height = 380;
 
-    if (element._chartjs?.destroy) {
-      try { element._chartjs.destroy(); } catch {}
-    }
-
-    const ctx = canvas.getContext("2d");
-
-    element._chartjs = new Chart(ctx, {
+    this._createChart("cashflowChart", canvas, {
       type: "line",
       data: {
         labels: months.slice(0, length),
@@ -586,10 +586,6 @@ export class Dashboard extends Component {
     element.style.height = "380px";
     canvas.height = 380;
 
-    if (element._chartjs?.destroy) {
-      try { element._chartjs.destroy(); } catch {}
-    }
-
     const ov = this.state.data.overview || {};
     const target = this._toNumber(ov.sales_target);
     const achieved = this._toNumber(ov.total_achieved);
@@ -600,9 +596,7 @@ export class Dashboard extends Component {
     const pctAch = safeTarget ? (safeAch / safeTarget) * 100 : this._toNumber(ov.ratio);
     const pctRem = 100 - pctAch;
 
-    const ctx = canvas.getContext("2d");
-
-    element._chartjs = new Chart(ctx, {
+    this._createChart("targetBarChart", canvas, {
       type: 'bar',
       data: {
         labels: ['Target'],
@@ -698,11 +692,10 @@ export class Dashboard extends Component {
     });
   }
 
-  _createChart(name, element, options) {
-    if (!element) return;
+  _createChart(name, canvas, config) {
+    if (!canvas) return;
     try {
-      this.charts[name] = new ApexCharts(element, options);
-      this.charts[name].render();
+      this.charts.chartjs(name, canvas, config);
     } catch (error) {
       console.error("Failed to create chart:", error);
       this.state.error = true;
@@ -711,12 +704,7 @@ export class Dashboard extends Component {
   }
 
   _destroyCharts() {
-    Object.values(this.charts).forEach((chart) => {
-      if (chart?.destroy) {
-        try { chart.destroy(); } catch {}
-      }
-    });
-    this.charts = {};
+    this.charts.destroyAll();
     this._hideExtTip();
   }
 
@@ -739,6 +727,14 @@ export class Dashboard extends Component {
     return num > 0 ? Math.ceil(num * 1.15) : 100;
   }
 
+  formatAmount(value) {
+    return formatAmount(value ?? 0, this.state.main_data.format);
+  }
+
+  formatPercent(value) {
+    return formatPercent(value ?? 0);
+  }
+
   formatNumber(value) {
     const n = Number(value);
     if (!isFinite(n)) return "0";
@@ -776,4 +772,4 @@ export class Dashboard extends Component {
 }
 
 Dashboard.template = 'custom.l1_dashboard_demo';
-registry.category("fields").add("l1_dashboard", Dashboard);
+registry.category("my_dashboard.lazy_fields").add("l1_dashboard", Dashboard);
@@ -1,19 +1,16 @@
 /** @odoo-module **/
 import { registry } from "@web/core/registry";
-import { loadJS } from "@web/core/assets";
-import { loadCSS } from "@web/core/assets";
-
-await loadCSS("https://cdn.jsdelivr.net/npm/apexcharts/dist/apexcharts.css");
-
-const CHART_JS_URL = "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js";
+import { useService } from "@web/core/utils/hooks";
+import { DashboardRequests, FILTER_DEBOUNCE, loadDashboardData } from "@my_dashboard/js/dashboard_transport";
+import { ChartLayer, chartCanvas, valueLabels } from "@my_dashboard/js/chart_layer";
 
 const { Component, useEffect, useState, useRef } = owl;
 const _t = require("web.translation")._t;
 
 export class L2Dashboard extends Component {
   setup() {
-    this.charts = {};
-    this._cashflowChartJS = null;
+    this.charts = new ChartLayer();
+    this.orm = useService("orm");
 
     this.state = useState({
       main_data: [],
@@ -33,6 +30,11 @@ export class L2Dashboard extends Component {
 
     this._extTip = null;
     this._ensureTooltipHost();
+    this._requestId = 0;
+    this._requests = new DashboardRequests();
+    // project drill-downs of the bars, fetched on hover: "metric|region|month" -> promise
+    this._breakdowns = new Map();
+    this._tipKey = null;
 
     useEffect(
       () => {
@@ -45,25 +47,38 @@ export class L2Dashboard extends Component {
           this.state.errorMessage = _t("Dashboard data is invalid.");
           return;
         }
-        this.state.main_data = parsed;
-
-        Promise.all([
-          loadJS("https://cdn.jsdelivr.net/npm/apexcharts"),
-          loadJS(CHART_JS_URL),
-        ])
-          .then(() => {
-            this._initDashboard();
-            try {
-              this._renderCharts();
-            } catch {
-              this.state.error = true;
-              this.state.errorMessage = _t("Failed to render charts.");
-            }
-          })
-          .catch(() => {
+        // lazy records only carry the filters: fetch the payload itself as an
+        // object, without the string-in-JSON of the record field, showing the
+        // copy cached in the browser while the server is asked for changes
+        const requestId = ++this._requestId;
+        const { year, consolidated } = this.props.record.data;
+
+        const apply = (data) => {
+          if (requestId !== this._requestId) {
+            return;
+          }
+          this.state.main_data = data;
+          this._breakdowns = new Map();
+          this._breakdownFilters = { year, consolidated };
+          this._initDashboard();
+          try {
+            this._renderCharts();
+          } catch {
             this.state.error = true;
-            this.state.errorMessage = _t("Failed to load chart libraries.");
-          });
+            this.state.errorMessage = _t("Failed to render charts.");
+          }
+        };
+        if (!parsed.lazy) {
+          apply(parsed);
+          return;
+        }
+        const signal = this._requests.next();
+        loadDashboardData("l2.dashboard", { year, consolidated }, apply, { signal, delay: FILTER_DEBOUNCE }).catch(() => {
+          if (requestId === this._requestId) {
+            this.state.error = true;
+            this.state.errorMessage = _t("Failed to load dashboard data.");
+          }
+        });
       },
       () => [this.props.record?.data?.dashboard_data]
     );
@@ -81,13 +96,13 @@ export class L2Dashboard extends Component {
     this.localExpensesChart  = useRef("localExpensesChart");
     this.exportExpensesChart = useRef("exportExpensesChart");
 
-    // Only one combined cashflow canvas is used
+    // Cashflow line charts
     this.totalCashFlowChart = useRef("totalCashFlowChart");
     this.localCashFlowChart  = useRef("localCashFlowChart");  
     this.exportCashFlowChart = useRef("exportCashFlowChart");
   }
 
-  // ---------- external tooltip host (Apex charts) ----------
+  // ---------- external tooltip host (charts) ----------
   _ensureTooltipHost() {
     if (!document.getElementById("l2-exttip-style")) {
       const css = document.createElement("style");
@@ -152,7 +167,32 @@ export class L2Dashboard extends Component {
     this._extTip.style.top  = `${y}px`;
     this._extTip.classList.add("show");
   }
-  _hideExtTip() { if (this._extTip) this._extTip.classList.remove("show"); }
+  _hideExtTip() {
+    this._tipKey = null;
+    if (this._extTip) this._extTip.classList.remove("show");
+  }
+
+  /**
+   * Top projects of one bar, asked to the server the first time it is
+   * hovered: the payload only carries the monthly totals.
+   */
+  _loadBreakdown(metric, region, index) {
+    const key = `${metric}|${region}|${index}`;
+    if (!this._breakdowns.has(key)) {
+      const { year, consolidated } = this._breakdownFilters || this.props.record.data;
+      const promise = this.orm.call("l2.dashboard", "get_breakdown", [], {
+        metric,
+        region,
+        month: index + 1,
+        year,
+        consolidated,
+      });
+      // failed drill-downs are asked again on the next hover
+      promise.catch(() => this._breakdowns.delete(key));
+      this._breakdowns.set(key, promise);
+    }
+    return this._breakdowns.get(key);
+  }
   // ----------------------------------------------------------
 
   _initDashboard() {
@@ -172,7 +212,8 @@ export class L2Dashboard extends Component {
 
   _renderCharts() {
     if (this.state.error) return;
-    this._destroyCharts();
+    // charts are kept alive and updated in place, see ChartLayer
+    this._hideExtTip();
 
     const { sales, revenue, expenses, cash_flow } = this.state.data;
 
@@ -214,9 +255,58 @@ export class L2Dashboard extends Component {
     const padMax = (m) => Math.ceil(m * 1.05);
     const clampLen = (...arrs) => Math.min(...arrs.map(a => Array.isArray(a) ? a.length : 0));
 
-    const totalWithBreakdownOpts = (title, totalData, localData, exportData, color, yMaxRaw, localColor, exportColor) => {
-      const yMax = padMax(yMaxRaw);
+    // Bar chart of one monthly series; ``tip(index, x, y)`` shows the tooltip
+    // of the hovered bar at the given viewport position
+    const barConfig = (title, cats, vals, color, yMaxRaw, tip) => ({
+      type: "bar",
+      data: {
+        labels: cats,
+        datasets: [{
+          label: title,
+          data: vals,
+          backgroundColor: color,
+          borderColor: "#fff",
+          borderWidth: 1,
+          borderRadius: 6,
+          categoryPercentage: 0.6,
+        }],
+      },
+      options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        layout: { padding: { top: 24, right: 12, bottom: 8, left: 12 } },
+        plugins: {
+          legend: { display: false },
+          tooltip: {
+            enabled: false,
+            external: ({ chart, tooltip }) => {
+              if (!tooltip.opacity || !tooltip.dataPoints?.length) {
+                this._hideExtTip();
+                return;
+              }
+              const rect = chart.canvas.getBoundingClientRect();
+              tip(tooltip.dataPoints[0].dataIndex, rect.left + tooltip.caretX, rect.top + tooltip.caretY);
+            },
+          },
+        },
+        scales: {
+          x: {
+            grid: { display: false },
+            ticks: { maxRotation: 45, minRotation: 45, font: { size: 11, weight: "500" }, color: "#333" },
+          },
+          y: {
+            min: 0,
+            max: padMax(yMaxRaw),
+            ticks: { display: false, maxTicksLimit: 6 },
+            grid: { color: "#e0e0e0" },
+            border: { display: false, dash: [4, 4] },
+          },
+        },
+      },
+      plugins: [valueLabels((val) => this.formatMillionsShort(val))],
+    });
 
+    const totalWithBreakdownOpts = (title, totalData, localData, exportData, color, yMaxRaw, localColor, exportColor) => {
       const months = Array.isArray(totalData?.months) ? totalData.months : [];
       const L = clampLen(months, totalData?.amounts, localData?.amounts, exportData?.amounts);
 
@@ -225,149 +315,53 @@ export class L2Dashboard extends Component {
       const exportArr = (exportData?.amounts || []).slice(0, L).map(n => Number(n) || 0);
       const cats      = months.slice(0, L);
 
-      return {
-        series: [{ name: title, data: totalArr }],
-        chart: {
-          type: "bar",
-          height: 280,
-          toolbar: { show: false },
-          fontFamily: "Inter, Roboto, sans-serif",
-          animations: { enabled: true, easing: "easeinout", speed: 800 },
-          events: { mouseLeave: () => this._hideExtTip() },
-        },
-        colors: [color],
-        plotOptions: {
-          bar: {
-            borderRadius: 6,
-            columnWidth: "60%",
-            distributed: false,
-            dataLabels: { position: "top" },
-          },
-        },
-        dataLabels: {
-          enabled: true,
-          formatter: (val) => this.formatMillionsShort(val),
-          offsetY: -14,
-          style: { fontSize: "11px", fontWeight: 700, colors: ["#111"] },
-        },
-        stroke: { width: 1, colors: ["#fff"] },
-        grid: { borderColor: "#e0e0e0", strokeDashArray: 4 },
-        xaxis: {
-          categories: cats,
-          labels: { rotate: -45, style: { fontSize: "11px", fontWeight: 500, colors: "#333" } },
-          axisTicks: { show: false },
-          axisBorder: { color: "#ccc" },
-        },
-        yaxis: {
-          min: 0,
-          max: yMax,
-          tickAmount: 5,
-          labels: { show: false },
-          title: { text: undefined },
-        },
-        fill: { type: "solid", opacity: 0.9 },
-        tooltip: {
-          shared: false,
-          intersect: true,
-          custom: ({ dataPointIndex, w }) => {
-            const label = cats[dataPointIndex] ?? "";
-            const t = totalArr[dataPointIndex] ?? 0;
-            const l = localArr[dataPointIndex] ?? 0;
-            const e = exportArr[dataPointIndex] ?? 0;
-            const x = w?.globals?.clientX ?? 0;
-            const y = w?.globals?.clientY ?? 0;
-
-            const html = `
-              <div class="l2-head">${label}</div>
-              <div class="l2-row"><span><span class="l2-dot" style="background:${color}"></span>Total</span><b>${fmt(t)}</b></div>
-              <div class="l2-row"><span><span class="l2-dot" style="background:${localColor}"></span>Local</span><b>${fmt(l)}</b></div>
-              <div class="l2-row"><span><span class="l2-dot" style="background:${exportColor}"></span>Export</span><b>${fmt(e)}</b></div>
-            `;
-            this._showExtTip(html, x, y);
-            return '<div></div>';
-          },
-        },
-        legend: { show: false },
-      };
+      return barConfig(title, cats, totalArr, color, yMaxRaw, (index, x, y) => {
+        const html = `
+          <div class="l2-head">${cats[index] ?? ""}</div>
+          <div class="l2-row"><span><span class="l2-dot" style="background:${color}"></span>Total</span><b>${fmt(totalArr[index] ?? 0)}</b></div>
+          <div class="l2-row"><span><span class="l2-dot" style="background:${localColor}"></span>Local</span><b>${fmt(localArr[index] ?? 0)}</b></div>
+          <div class="l2-row"><span><span class="l2-dot" style="background:${exportColor}"></span>Export</span><b>${fmt(exportArr[index] ?? 0)}</b></div>
+        `;
+        this._showExtTip(html, x, y);
+      });
     };
 
-    const singleBarOpts = (title, data, color, yMaxRaw) => {
-      const yMax = padMax(yMaxRaw);
+    const singleBarOpts = (title, data, color, yMaxRaw, metric, region) => {
       const cats = data?.months || [];
       const vals = (data?.amounts || []).map(v => Number(v) || 0);
-      const breakdown = Array.isArray(data?.breakdown) ? data.breakdown : null;
-
-      return {
-        series: [{ name: title, data: vals }],
-        chart: {
-          type: "bar",
-          height: 280,
-          toolbar: { show: false },
-          fontFamily: "Inter, Roboto, sans-serif",
-          animations: { enabled: true, easing: "easeinout", speed: 800 },
-          events: {
-            mouseLeave: () => this._hideExtTip(),
-          },
-        },
-        colors: [color],
-        plotOptions: {
-          bar: {
-            borderRadius: 6,
-            columnWidth: "60%",
-            distributed: false,
-            dataLabels: { position: "top" },
-          },
-        },
-        dataLabels: {
-          enabled: true,
-          formatter: (val) => this.formatMillionsShort(val),
-          offsetY: -14,
-          style: { fontSize: "11px", fontWeight: 700, colors: ["#111"] },
-        },
-        stroke: { width: 1, colors: ["#fff"] },
-        grid: { borderColor: "#e0e0e0", strokeDashArray: 4 },
-        xaxis: {
-          categories: cats,
-          labels: { rotate: -45, style: { fontSize: "11px", fontWeight: 500, colors: "#333" } },
-          axisTicks: { show: false },
-          axisBorder: { color: "#ccc" },
-        },
-        yaxis: {
-          min: 0,
-          max: yMax,
-          tickAmount: 5,
-          labels: { show: false },
-          title: { text: undefined },
-        },
-        fill: { type: "solid", opacity: 0.9 },
-        tooltip: {
-          shared: false,
-          intersect: true,
-          custom: ({ dataPointIndex, w }) => {
-            const label = cats[dataPointIndex] ?? "";
-            const totalHere = vals[dataPointIndex] ?? 0;
-            const items = (breakdown && breakdown[dataPointIndex]) ? breakdown[dataPointIndex] : [];
-            const x = w?.globals?.clientX ?? 0;
-            const y = w?.globals?.clientY ?? 0;
-
-            const rows = items.map(it => `
-              <div class="l2-row">
-                <span>${this._truncateProject(it.project)}</span>
-                <b>${this.formatNumber(it.amount)}</b>
-              </div>
-            `).join("");
-
-            const html = `
-              <div class="l2-head">${label}</div>
-              <div class="l2-row"><span>Total</span><b>${this.formatNumber(totalHere)}</b></div>
-              ${rows || '<div class="l2-row" style="opacity:.7;">No project data</div>'}
-            `;
-            this._showExtTip(html, x, y);
-            return '<div></div>';
-          },
-        },
-        legend: { show: false },
-      };
+
+      return barConfig(title, cats, vals, color, yMaxRaw, (index, x, y) => {
+        const key = `${metric}|${region}|${index}`;
+        if (this._tipKey === key) {
+          // same bar: the tooltip is already shown, or on its way
+          return;
+        }
+        const render = (drill) => {
+          let rows = (drill?.projects || []).map(it => `
+            <div class="l2-row">
+              <span>${this._truncateProject(it.project)}</span>
+              <b>${this.formatNumber(it.amount)}</b>
+            </div>
+          `).join("");
+          if (drill?.others?.count) {
+            rows += `<div class="l2-row"><span>${_t("Others")} (${drill.others.count})</span><b>${this.formatNumber(drill.others.amount)}</b></div>`;
+          }
+          const empty = drill ? _t("No project data") : _t("Loading…");
+          const html = `
+            <div class="l2-head">${cats[index] ?? ""}</div>
+            <div class="l2-row"><span>Total</span><b>${this.formatNumber(vals[index] ?? 0)}</b></div>
+            ${rows || `<div class="l2-row" style="opacity:.7;">${empty}</div>`}
+          `;
+          this._showExtTip(html, x, y);
+          this._tipKey = key;
+        };
+
+        render(null);
+        this._loadBreakdown(metric, region, index).then((drill) => {
+          // the pointer may have left the bar meanwhile
+          if (this._tipKey === key) render(drill);
+        }, () => {});
+      });
     };
 
     const p = this.palette;
@@ -378,8 +372,8 @@ export class L2Dashboard extends Component {
       this.totalSalesChart.el,
       totalWithBreakdownOpts("Total Sales", sales?.total, sales?.local_sales, sales?.export_sales, p.total, SALES_MAX, p.local, p.export)
     );
-    this._createChart("localSales",  this.localSalesChart.el,  singleBarOpts("Local Sales",  sales?.local_sales,  p.local,  SALES_MAX));
-    this._createChart("exportSales", this.exportSalesChart.el, singleBarOpts("Export Sales", sales?.export_sales, p.export, SALES_MAX));
+    this._createChart("localSales",  this.localSalesChart.el,  singleBarOpts("Local Sales",  sales?.local_sales,  p.local,  SALES_MAX, "sales", "local"));
+    this._createChart("exportSales", this.exportSalesChart.el, singleBarOpts("Export Sales", sales?.export_sales, p.export, SALES_MAX, "sales", "export"));
 
     // REVENUE
     this._createChart(
@@ -387,8 +381,8 @@ export class L2Dashboard extends Component {
       this.totalRevenueChart.el,
       totalWithBreakdownOpts("Total Revenue", revenue?.total, revenue?.local_revenue, revenue?.export_revenue, p.total, REVENUE_MAX, p.local, p.export)
     );
-    this._createChart("localRevenue",  this.localRevenueChart.el,  singleBarOpts("Local Revenue",  revenue?.local_revenue,  p.local,  REVENUE_MAX));
-    this._createChart("exportRevenue", this.exportRevenueChart.el, singleBarOpts("Export Revenue", revenue?.export_revenue, p.export, REVENUE_MAX));
+    this._createChart("localRevenue",  this.localRevenueChart.el,  singleBarOpts("Local Revenue",  revenue?.local_revenue,  p.local,  REVENUE_MAX, "revenue", "local"));
+    this._createChart("exportRevenue", this.exportRevenueChart.el, singleBarOpts("Export Revenue", revenue?.export_revenue, p.export, REVENUE_MAX, "revenue", "export"));
 
     // EXPENSES
     this._createChart(
@@ -396,156 +390,108 @@ export class L2Dashboard extends Component {
       this.totalExpensesChart.el,
       totalWithBreakdownOpts("Total Expenses", expenses?.total, expenses?.local_expenses, expenses?.export_expenses, p.total, EXPENSES_MAX, p.local, p.export)
     );
-    this._createChart("localExpenses",  this.localExpensesChart.el,  singleBarOpts("Local Expenses",  expenses?.local_expenses,  p.local,  EXPENSES_MAX));
-    this._createChart("exportExpenses", this.exportExpensesChart.el, singleBarOpts("Export Expenses", expenses?.export_expenses, p.export, EXPENSES_MAX));
+    this._createChart("localExpenses",  this.localExpensesChart.el,  singleBarOpts("Local Expenses",  expenses?.local_expenses,  p.local,  EXPENSES_MAX, "expenses", "local"));
+    this._createChart("exportExpenses", this.exportExpensesChart.el, singleBarOpts("Export Expenses", expenses?.export_expenses, p.export, EXPENSES_MAX, "expenses", "export"));
 
-    // CASH FLOW (single Chart.js line chart)
-    this._renderCashflowLine(this.totalCashFlowChart,  cash_flow?.total);
-    this._renderCashflowLine(this.localCashFlowChart,  cash_flow?.local_cash_flow);
-    this._renderCashflowLine(this.exportCashFlowChart, cash_flow?.export_cash_flow);
+    // CASH FLOW (inflow / outflow lines)
+    this._renderCashflowLine("totalCashFlow",  this.totalCashFlowChart,  cash_flow?.total);
+    this._renderCashflowLine("localCashFlow",  this.localCashFlowChart,  cash_flow?.local_cash_flow);
+    this._renderCashflowLine("exportCashFlow", this.exportCashFlowChart, cash_flow?.export_cash_flow);
   }
 
-  // REPLACE the whole _renderCashflowCombined with this generic function
-  _renderCashflowLine(ref, src) {
+  _renderCashflowLine(name, ref, src) {
     const host = ref?.el;
     if (!host || !src) return;
 
-    // ensure <canvas> exists and size the card
-    let canvas = host.tagName === "CANVAS" ? host : host.querySelector("canvas");
-    if (!canvas) {
-      canvas = document.createElement("canvas");
-      host.innerHTML = "";
-      host.appendChild(canvas);
-    }
-    host.style.height = "380px";     // bigger, like other diagrams
-    canvas.height = 380;
-
-    // destroy any old chart kept on the host
-    if (host._chartjs?.destroy) { try { host._chartjs.destroy(); } catch {} }
-
     const months   = Array.isArray(src.months)  ? src.months  : [];
-    const inflows  = Array.isArray(src.inflow)  ? src.inflow  : [];
-    const outflows = Array.isArray(src.outflow) ? src.outflow : [];
+    const inflows  = (Array.isArray(src.inflow)  ? src.inflow  : []).map((v) => Number(v) || 0);
+    const outflows = (Array.isArray(src.outflow) ? src.outflow : []).map((v) => Number(v) || 0);
     if (!months.length) return;
 
-    const ctx = canvas.getContext("2d");
+    const fmt = (v) => this.formatNumber(v);
+    const colors = ["#3b82f6", "#f97316"];
+    const line = (label, data, color) => ({
+      label,
+      data,
+      borderColor: color,
+      backgroundColor: color,
+      borderWidth: 4,
+      tension: 0.4,
+      pointRadius: 5,
+      pointHoverRadius: 8,
+      pointBorderColor: "#fff",
+      pointBorderWidth: 2,
+    });
 
-    host._chartjs = new Chart(ctx, {
+    this._createChart(name, host, {
       type: "line",
       data: {
         labels: months,
         datasets: [
-          {
-            label: "Cash Inflows",
-            data: inflows,
-            borderColor: "#3b82f6",
-            borderWidth: 4,
-            fill: false,              // no area fill
-            tension: 0.4,
-            pointRadius: 5,
-            pointHoverRadius: 8,
-            pointBackgroundColor: "#3b82f6",
-            pointBorderColor: "#fff",
-            pointBorderWidth: 2,
-          },
-          {
-            label: "Cash Outflows",
-            data: outflows,
-            borderColor: "#f97316",
-            borderWidth: 4,
-            fill: false,              // no area fill
-            tension: 0.4,
-            pointRadius: 5,
-            pointHoverRadius: 8,
-            pointBackgroundColor: "#f97316",
-            pointBorderColor: "#fff",
-            pointBorderWidth: 2,
-          },
+          line("Cash Inflows", inflows, colors[0]),
+          line("Cash Outflows", outflows, colors[1]),
         ],
       },
       options: {
         responsive: true,
         maintainAspectRatio: false,
-        layout: { padding: { top: 8, right: 12, bottom: 8, left: 12 } },
-        interaction: { intersect: false, mode: "index" },
+        layout: { padding: { top: 16 } },
+        interaction: { mode: "index", intersect: false },
         plugins: {
-          title: { display: false }, // remove header text
           legend: {
-            display: true,
             position: "top",
             align: "end",
-            labels: {
-              usePointStyle: true,
-              pointStyle: "circle",
-              padding: 12,
-              font: { size: 13, weight: "700", family: "'Inter', sans-serif" },
-              color: "#1e293b",
-            },
+            labels: { color: "#1e293b", font: { size: 13, weight: "700" }, usePointStyle: true },
           },
           tooltip: {
-            enabled: true,
-            backgroundColor: "rgba(30,41,59,0.95)",
-            titleColor: "#fff",
-            bodyColor: "#fff",
-            padding: 14,
-            callbacks: {
-              label: (ctx) => `${ctx.dataset.label}: ${(ctx.parsed.y ?? 0).toLocaleString("en-US")}`,
-              afterBody: (ctx) => {
-                if (ctx.length === 2) {
-                  const infl = ctx[0].parsed.y || 0;
-                  const out  = ctx[1].parsed.y || 0;
-                  const net  = infl - out;
-                  const ratio = infl ? ((net / infl) * 100).toFixed(1) : "0.0";
-                  return ["", `Net Cash Flow: ${net.toLocaleString()}`, `Cash Flow Ratio: ${ratio}%`];
-                }
-              },
+            enabled: false,
+            external: ({ chart, tooltip }) => {
+              if (!tooltip.opacity || !tooltip.dataPoints?.length) {
+                this._hideExtTip();
+                return;
+              }
+              const index = tooltip.dataPoints[0].dataIndex;
+              const infl = inflows[index] ?? 0;
+              const out  = outflows[index] ?? 0;
+              const net  = infl - out;
+              const ratio = infl ? ((net / infl) * 100).toFixed(1) : "0.0";
+              const rect = chart.canvas.getBoundingClientRect();
+
+              const html = `
+                <div class="l2-head">${months[index] ?? ""}</div>
+                <div class="l2-row"><span><span class="l2-dot" style="background:${colors[0]}"></span>Cash Inflows</span><b>${fmt(infl)}</b></div>
+                <div class="l2-row"><span><span class="l2-dot" style="background:${colors[1]}"></span>Cash Outflows</span><b>${fmt(out)}</b></div>
+                <div class="l2-row"><span>Net Cash Flow</span><b>${fmt(net)}</b></div>
+                <div class="l2-row"><span>Cash Flow Ratio</span><b>${ratio}%</b></div>
+              `;
+              this._showExtTip(html, rect.left + tooltip.caretX, rect.top + tooltip.caretY);
             },
           },
         },
-        // match the background feel of other diagrams:
-        // keep card’s white bg, add faint dashed horizontal grid, hide numbers
         scales: {
           x: {
-            grid: { display: false, drawBorder: false },
-            ticks: { font: { size: 12, weight: "600", family: "'Inter', sans-serif" }, color: "#64748b" },
+            grid: { display: false },
+            border: { display: false },
+            ticks: { font: { size: 12, weight: "600" }, color: "#64748b" },
           },
           y: {
-            ticks: { display: false },                     // no amounts on the left
-            grid: { color: "rgba(224,224,224,0.5)",        // faint horizontals
-                    borderDash: [4,4], drawBorder: false },
+            ticks: { display: false },
+            grid: { color: "rgba(224,224,224,0.5)" },
+            border: { display: false, dash: [4, 4] },
           },
         },
       },
-      plugins: [{
-          id: 'customDataLabels',
-          afterDatasetsDraw: (chart) => {
-              const ctx = chart.ctx;
-              chart.data.datasets.forEach((dataset, datasetIndex) => {
-                  const meta = chart.getDatasetMeta(datasetIndex);
-                  if (!meta.hidden) {
-                      meta.data.forEach((bar, index) => {
-                        const value = dataset.data[index];
-                        const displayValue = this.formatMillionsShort(value);
-
-                        ctx.fillStyle = '#333';
-                        ctx.font = '700 11px Inter, sans-serif';
-                        ctx.textAlign = 'center';
-                        ctx.textBaseline = 'bottom';
-                        ctx.fillText(displayValue, bar.x, bar.y - 8);
-                    });
-                  }
-              });
-          }
-      }]
+      plugins: [valueLabels((val) => this.formatMillionsShort(val), { offset: 10, color: "#333" })],
     });
   }
-  
 
-  _createChart(name, element, options) {
+  _createChart(name, element, config) {
     if (!element) return;
     try {
-      this.charts[name] = new ApexCharts(element, options);
-      this.charts[name].render();
+      // the card sets the height of the chart
+      const canvas = chartCanvas(element);
+      this.charts.chartjs(name, canvas, config);
+      canvas.onmouseleave = () => this._hideExtTip();
     } catch {
       this.state.error = true;
       this.state.errorMessage = _t("Failed to create one of the charts.");
@@ -553,12 +499,7 @@ export class L2Dashboard extends Component {
   }
 
   _destroyCharts() {
-    Object.values(this.charts).forEach((chart) => {
-      if (chart?.destroy) {
-        try { chart.destroy(); } catch {}
-      }
-    });
-    this.charts = {};
+    this.charts.destroyAll();
     this._hideExtTip();
   }
 
@@ -568,11 +509,8 @@ export class L2Dashboard extends Component {
   }
 
   __destroy() {
+    this._requests.abort();
     this._destroyCharts();
-    if (this._cashflowChartJS?.destroy) {
-      try { this._cashflowChartJS.destroy(); } catch {}
-      this._cashflowChartJS = null;
-    }
     if (this._extTip?.parentNode) {
       try { this._extTip.parentNode.removeChild(this._extTip); } catch {}
     }
@@ -623,4 +561,4 @@ export class L2Dashboard extends Component {
 }
 
 L2Dashboard.template = "custom.l2_dashboard";
-registry.category("fields").add("l2_dashboard", L2Dashboard);
+registry.category("my_dashboard.lazy_fields").add("l2_dashboard", L2Dashboard);
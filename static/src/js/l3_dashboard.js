@@ -61,4 +61,4 @@ export class L3Dashboard extends Component {
     });
   }
 }
-registry.category("fields").add("l3_dashboard", L3Dashboard);
+registry.category("my_dashboard.lazy_fields").add("l3_dashboard", L3Dashboard);
@@ -1,9 +1,12 @@
 /** @odoo-module **/
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
+import { DashboardRequests, FILTER_DEBOUNCE, loadDashboardData } from "@my_dashboard/js/dashboard_transport";
+import { decodeRows, isColumnar } from "@my_dashboard/js/columnar_rows";
+import { useVirtualRows } from "@my_dashboard/js/virtual_rows";
 
 // OWL hooks
-const { Component, useEffect, useState, onMounted, onPatched, useRef } = owl;
+const { Component, useEffect, useState, onMounted, onPatched, onWillUnmount, useRef } = owl;
 
 export class Dashboard extends Component {
   static template = "custom.l4_dashboard";
@@ -15,6 +18,10 @@ export class Dashboard extends Component {
     // ---- REFS ----
     this.tableRef = useRef("table");
     this.searchInputRef = useRef("searchInput");
+    this.scrollerRef = useRef("scroller");
+
+    // only the project rows scrolled into view are rendered
+    this.virtual = useVirtualRows({ rowHeight: 52 });
 
     this.state = useState({
       main_data: {
@@ -106,6 +113,7 @@ export class Dashboard extends Component {
       }
       if (this.state.main_data.projects?.length) {
         this.state.main_data.projects = this.sortProjects(this.state.main_data.projects);
+        this.virtual.reset(this.scrollerRef.el);
         this.wrapHeaderLabels();
         this.autosizeNumericColumns();
       }
@@ -125,6 +133,7 @@ export class Dashboard extends Component {
         );
       }
       this.state.main_data.projects = this.sortProjects(this.state.main_data.projects);
+      this.virtual.reset(this.scrollerRef.el);
       this.wrapHeaderLabels();
       this.autosizeNumericColumns();
     };
@@ -133,107 +142,129 @@ export class Dashboard extends Component {
       this.state.searchTerm = "";
       this.state.main_data.projects = this.sortProjects([...this.state.originalProjects]);
       if (this.searchInputRef.el) this.searchInputRef.el.value = "";
+      this.virtual.reset(this.scrollerRef.el);
       this.wrapHeaderLabels();
       this.autosizeNumericColumns();
     };
 
     // ---- DATA LOAD ----
-    useEffect(() => {
-      if (this.props.record.data.dashboard_data) {
-        try {
-          const parsed = JSON.parse(this.props.record.data.dashboard_data);
-          if (!parsed.summary) parsed.summary = this.state.main_data.summary;
-
-          if (parsed.projects?.length) {
-            const seenKeys = new Set();
-            parsed.projects = parsed.projects.map((project, i) => {
-              const p = { ...project };
-
-              // numeric/percent normalization
-              const fields = [
-                "po_value",
-                "invoiced",
-                "collected",
-                "pending_collection",
-                "vendor_invoice",
-                "payment_made",
-                "payment_to_be_made",
-                "payroll_cost",
-                "total_outgoing",
-                "total_margin",
-              ];
-              fields.forEach((f) => {
-                if (p[f] !== undefined) {
-                  const raw = Number(String(p[f]).replace(/[,\s]/g, ""));
-                  p[`_raw_${f}`] = Number.isNaN(raw) ? p[f] : raw;
-                  p[f] = this.formatNumber(raw);
-                }
-              });
-              if (p.margin_percent !== undefined) {
-                const rawPct = Number(String(p.margin_percent).replace("%", "").trim());
-                p._raw_margin_percent = Number.isNaN(rawPct) ? p.margin_percent : rawPct;
-                p.margin_percent = this.formatPercent(rawPct);
-              }
-              if (p.region !== undefined) p._raw_region = p.region;
-              if (p.date !== undefined) p._raw_date = p.date;
-
-              // ---- UNIQUE, STABLE KEY ----
-              const base = p.id ?? p.project_id ?? p.code ?? p.uuid ?? null;
-              let key =
-                base != null
-                  ? `id:${String(base)}`
-                  : `${p.region ?? ""}|${p.project ?? ""}|${p.customer ?? ""}|${p.date ?? ""}` || `idx-${i}`;
-
-              let uniqueKey = String(key);
-              let bump = 1;
-              while (seenKeys.has(uniqueKey)) {
-                uniqueKey = `${key}#${bump++}`;
-              }
-              seenKeys.add(uniqueKey);
-              p.__key = uniqueKey;
-
-              return p;
-            });
-
-            this.state.originalProjects = [...parsed.projects];
-            parsed.projects = this.sortProjects(parsed.projects);
+    this.requestId = 0;
+    this.requests = new DashboardRequests();
+    onWillUnmount(() => this.requests.abort());
+
+    this.applyData = (parsed) => {
+      if (!parsed.summary) parsed.summary = this.state.main_data.summary;
+      // every row is formatted and sorted below: decode column-wise lists at once
+      if (isColumnar(parsed.projects)) parsed.projects = decodeRows(parsed.projects).toArray();
+
+      if (parsed.projects?.length) {
+        const seenKeys = new Set();
+        parsed.projects = parsed.projects.map((project, i) => {
+          const p = { ...project };
+
+          // numeric/percent normalization
+          const fields = [
+            "po_value",
+            "invoiced",
+            "collected",
+            "pending_collection",
+            "vendor_invoice",
+            "payment_made",
+            "payment_to_be_made",
+            "payroll_cost",
+            "total_outgoing",
+            "total_margin",
+          ];
+          fields.forEach((f) => {
+            if (p[f] !== undefined) {
+              const raw = Number(String(p[f]).replace(/[,\s]/g, ""));
+              p[`_raw_${f}`] = Number.isNaN(raw) ? p[f] : raw;
+              p[f] = this.formatNumber(raw);
+            }
+          });
+          if (p.margin_percent !== undefined) {
+            const rawPct = Number(String(p.margin_percent).replace("%", "").trim());
+            p._raw_margin_percent = Number.isNaN(rawPct) ? p.margin_percent : rawPct;
+            p.margin_percent = this.formatPercent(rawPct);
           }
+          if (p.region !== undefined) p._raw_region = p.region;
+          if (p.date !== undefined) p._raw_date = p.date;
+
+          // ---- UNIQUE, STABLE KEY ----
+          const base = p.id ?? p.project_id ?? p.code ?? p.uuid ?? null;
+          let key =
+            base != null
+              ? `id:${String(base)}`
+              : `${p.region ?? ""}|${p.project ?? ""}|${p.customer ?? ""}|${p.date ?? ""}` || `idx-${i}`;
+
+          let uniqueKey = String(key);
+          let bump = 1;
+          while (seenKeys.has(uniqueKey)) {
+            uniqueKey = `${key}#${bump++}`;
+          }
+          seenKeys.add(uniqueKey);
+          p.__key = uniqueKey;
 
-          if (parsed.summary) {
-            const s = { ...parsed.summary };
-            const sFields = [
-              "total_po_value",
-              "total_invoiced",
-              "total_collected",
-              "total_pending_collection",
-              "total_vendor_invoice",
-              "total_payment_made",
-              "total_payment_to_be_made",
-              "total_payroll_cost",
-              "total_margin",
-            ];
-            sFields.forEach((f) => {
-              if (s[f] !== undefined) {
-                const raw = Number(String(s[f]).replace(/[,\s]/g, ""));
-                s[`_raw_${f}`] = Number.isNaN(raw) ? s[f] : raw;
-                s[f] = this.formatNumber(raw);
-              }
-            });
-            if (s.avg_margin_percent !== undefined) {
-              const rawPct = Number(String(s.avg_margin_percent).replace("%", "").trim());
-              s._raw_avg_margin_percent = Number.isNaN(rawPct) ? s.avg_margin_percent : rawPct;
-              s.avg_margin_percent = this.formatPercent(rawPct);
-            }
-            parsed.summary = s;
+          return p;
+        });
+
+        this.state.originalProjects = [...parsed.projects];
+        parsed.projects = this.sortProjects(parsed.projects);
+      }
+
+      if (parsed.summary) {
+        const s = { ...parsed.summary };
+        const sFields = [
+          "total_po_value",
+          "total_invoiced",
+          "total_collected",
+          "total_pending_collection",
+          "total_vendor_invoice",
+          "total_payment_made",
+          "total_payment_to_be_made",
+          "total_payroll_cost",
+          "total_margin",
+        ];
+        sFields.forEach((f) => {
+          if (s[f] !== undefined) {
+            const raw = Number(String(s[f]).replace(/[,\s]/g, ""));
+            s[`_raw_${f}`] = Number.isNaN(raw) ? s[f] : raw;
+            s[f] = this.formatNumber(raw);
           }
+        });
+        if (s.avg_margin_percent !== undefined) {
+          const rawPct = Number(String(s.avg_margin_percent).replace("%", "").trim());
+          s._raw_avg_margin_percent = Number.isNaN(rawPct) ? s.avg_margin_percent : rawPct;
+          s.avg_margin_percent = this.formatPercent(rawPct);
+        }
+        parsed.summary = s;
+      }
 
-          this.state.main_data = parsed;
+      this.state.main_data = parsed;
 
-          // DOM ready → wrap headers & autosize cols
-          requestAnimationFrame(() => {
-            this.wrapHeaderLabels();
-            this.autosizeNumericColumns();
-          });
+      // DOM ready → wrap headers & autosize cols
+      requestAnimationFrame(() => {
+        this.wrapHeaderLabels();
+        this.autosizeNumericColumns();
+      });
+    };
+
+    useEffect(() => {
+      if (this.props.record.data.dashboard_data) {
+        try {
+          const parsed = JSON.parse(this.props.record.data.dashboard_data);
+          if (!parsed.lazy) {
+            this.applyData(parsed);
+            return;
+          }
+          // lazy records only carry the filters: fetch the projects once the
+          // filters settled, dropping the requests of older selections
+          const requestId = ++this.requestId;
+          const { year, tag_type, month, quarter } = this.props.record.data;
+          const signal = this.requests.next();
+          loadDashboardData("l4.dashboard", { year, tag_type, month, quarter }, (data) => {
+            if (requestId === this.requestId) this.applyData(data);
+          }, { signal, delay: FILTER_DEBOUNCE }).catch((e) => console.error("Error loading dashboard data:", e));
         } catch (e) {
           console.error("Error parsing dashboard data:", e);
         }
@@ -245,9 +276,10 @@ export class Dashboard extends Component {
       this.wrapHeaderLabels();
       this.autosizeNumericColumns();
     });
+    // scrolling patches the rows in view: column widths come from the whole
+    // data set and are only recomputed when it changes
     onPatched(() => {
       this.wrapHeaderLabels();
-      this.autosizeNumericColumns();
     });
   }
 
@@ -265,13 +297,15 @@ export class Dashboard extends Component {
   }
 
   // --- Autosize numeric/date/aging columns to content width ---
+  // Only a window of the rows is rendered, so the widest value of each column
+  // is looked up in the data (``data-field`` of the header) and measured once.
   autosizeNumericColumns() {
     const table = this.tableRef.el;
-    if (!table || !table.tHead || !table.tBodies?.length) return;
+    if (!table || !table.tHead) return;
 
     const cols = table.querySelectorAll("colgroup col");
     const headerCells = table.tHead.rows[0]?.cells || [];
-    const bodyRows = table.tBodies[0].rows || [];
+    const projects = this.state.main_data.projects || [];
 
     const meas = document.createElement("span");
     const cs = getComputedStyle(table);
@@ -305,10 +339,14 @@ export class Dashboard extends Component {
         maxPx = Math.max(maxPx, meas.getBoundingClientRect().width);
       }
 
-      for (const row of bodyRows) {
-        const cell = row.cells[i];
-        if (!cell) continue;
-        meas.textContent = (cell.textContent || "").trim();
+      const field = th.dataset.field;
+      if (field) {
+        let widest = "";
+        for (const project of projects) {
+          const text = String(project[field] ?? "");
+          if (text.length > widest.length) widest = text;
+        }
+        meas.textContent = widest;
         maxPx = Math.max(maxPx, meas.getBoundingClientRect().width);
       }
 
@@ -336,4 +374,4 @@ export class Dashboard extends Component {
   }
 }
 
-registry.category("fields").add("l4_dashboard", Dashboard);
+registry.category("my_dashboard.lazy_fields").add("l4_dashboard", Dashboard);
@@ -0,0 +1,61 @@
+/** @odoo-module **/
+
+const { useState } = owl;
+
+/**
+ * Windowed rendering of long tables.
+ *
+ * Only the rows visible in the scroll container (plus ``overscan`` rows on
+ * each side) are rendered; two spacer rows of ``top`` / ``bottom`` pixels keep
+ * the scrollbar and the row positions of the full table. Rows must have a
+ * fixed height of ``rowHeight`` pixels.
+ *
+ * Grouped lists are flat lists of group headers and rows where every item
+ * carries the ``headerIndex`` of its group header. ``pinned`` is the header of
+ * the group at the top of the window, meant to be repeated in the sticky table
+ * head while its rows scroll by.
+ *
+ * The template binds ``t-on-scroll="virtual.onScroll"`` on the scroll container
+ * and renders ``virtual.slice(items)``.
+ */
+export function useVirtualRows({ rowHeight = 33, overscan = 10 } = {}) {
+    const state = useState({ first: 0, visible: Math.ceil(window.innerHeight / rowHeight) });
+    let frame = null;
+
+    return {
+        rowHeight,
+
+        onScroll(ev) {
+            const el = ev.currentTarget;
+            if (frame) {
+                return;
+            }
+            frame = requestAnimationFrame(() => {
+                frame = null;
+                // only re-render when the window moved by at least one row
+                const first = Math.floor(el.scrollTop / rowHeight);
+                const visible = Math.ceil(el.clientHeight / rowHeight) + 1;
+                if (first !== state.first) state.first = first;
+                if (visible !== state.visible) state.visible = visible;
+            });
+        },
+
+        reset(el) {
+            if (el) el.scrollTop = 0;
+            state.first = 0;
+        },
+
+        slice(items) {
+            const count = items.length;
+            const start = Math.max(0, Math.min(state.first, count) - overscan);
+            const end = Math.min(count, state.first + state.visible + overscan);
+            const current = items[Math.min(state.first, count - 1)];
+            return {
+                pinned: current ? items[current.headerIndex] || null : null,
+                rows: items.slice(start, end),
+                top: start * rowHeight,
+                bottom: (count - end) * rowHeight,
+            };
+        },
+    };
+}
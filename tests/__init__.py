@@ -0,0 +1,5 @@
+from . import test_dashboard_controller
+from . import test_l2_breakdown
+from . import test_monthly_cube
+from . import test_period_cache
+from . import test_sale_target_cube
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from odoo import Command, fields
+from odoo.tests.common import TransactionCase
+
+
+class DashboardCommon(TransactionCase):
+    """Local and Export projects, tagged SAP, and helpers to sell on them."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env.company
+        # a past year: every month of it is over
+        cls.year = fields.Date.today().year - 1
+
+        Tag = cls.env['project.tags']
+        cls.tags = {
+            name: Tag.search([('name', '=', name)], limit=1) or Tag.create({'name': name})
+            for name in ('Local', 'Export', 'SAP')
+        }
+        cls.plan = cls.env['account.analytic.plan'].create({'name': 'Dashboard Tests'})
+        cls.local_project = cls._create_project('Local Project', cls.tags['Local'] | cls.tags['SAP'])
+        cls.export_project = cls._create_project('Export Project', cls.tags['Export'] | cls.tags['SAP'])
+
+        cls.customer = cls.env['res.partner'].create({'name': 'Dashboard Customer'})
+        cls.product = cls.env['product.product'].create({
+            'name': 'Dashboard Service',
+            'type': 'service',
+            'invoice_policy': 'order',
+            'taxes_id': [Command.clear()],
+        })
+
+    @classmethod
+    def _create_project(cls, name, tags):
+        account = cls.env['account.analytic.account'].create({
+            'name': name,
+            'plan_id': cls.plan.id,
+            'company_id': cls.company.id,
+        })
+        return cls.env['project.project'].create({
+            'name': name,
+            'analytic_account_id': account.id,
+            'company_id': cls.company.id,
+            'tag_ids': [Command.set(tags.ids)],
+        })
+
+    @classmethod
+    def _create_order(cls, order_date, amount, project):
+        """Confirmed order of ``amount`` (untaxed) on ``project``, dated ``order_date``."""
+        order = cls.env['sale.order'].create({
+            'partner_id': cls.customer.id,
+            'company_id': cls.company.id,
+            'order_line': [Command.create({
+                'product_id': cls.product.id,
+                'product_uom_qty': 1,
+                'price_unit': amount,
+                'analytic_distribution': {str(project.analytic_account_id.id): 100},
+            })],
+        })
+        order.action_confirm()
+        # action_confirm stamps the confirmation time on date_order
+        order.date_order = datetime.combine(order_date, datetime.min.time())
+        return order
+
+    def setUp(self):
+        super().setUp()
+        # the cube reads are cached on their refresh time, which is the same
+        # for every refresh of the test transaction
+        self.env.registry.clear_caches()
+        self.env.cr.cache.pop('druksmart_dashboard.region_index', None)
@@ -0,0 +1,68 @@
+import json
+
+from odoo.http import Request
+from odoo.tests import HttpCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDashboardController(HttpCase):
+
+    def setUp(self):
+        super().setUp()
+        # the token of the session is not known to the test client
+        self.patch(Request, 'validate_csrf', lambda request, csrf: True)
+        self.authenticate('admin', 'admin')
+
+    def _post(self, url, body, headers=None):
+        return self.url_open(url, data=json.dumps(dict(body, csrf_token='test')), headers=dict(
+            {'Content-Type': 'application/json'}, **(headers or {})))
+
+    def test_data_not_modified(self):
+        response = self._post('/my_dashboard/data/hr.dashboard', {'kwargs': {}})
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertIn('hr', response.json())
+
+        response = self._post('/my_dashboard/data/hr.dashboard', {'kwargs': {}}, {'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        response = self._post('/my_dashboard/data/hr.dashboard', {'kwargs': {}}, {'If-None-Match': '"outdated"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_data_bad_arguments(self):
+        response = self._post('/my_dashboard/data/hr.dashboard', {'kwargs': {'year': 2024}})
+        self.assertEqual(response.status_code, 400)
+        response = self._post('/my_dashboard/data/l2.dashboard', {'kwargs': {'year': 2024, 'unknown': True}})
+        self.assertEqual(response.status_code, 400)
+
+    def test_data_unknown_model(self):
+        self.assertEqual(self._post('/my_dashboard/data/res.partner', {'kwargs': {}}).status_code, 404)
+        self.assertEqual(self._post('/my_dashboard/data/no.such.model', {'kwargs': {}}).status_code, 404)
+
+    def test_batch(self):
+        etag = self._post('/my_dashboard/data/hr.dashboard', {'kwargs': {}}).headers['ETag']
+        response = self._post('/my_dashboard/batch', {'requests': [
+            {'model': 'hr.dashboard'},
+            {'model': 'hr.dashboard', 'etag': etag},
+            {'model': 'hr.dashboard', 'etag': etag.strip('"')},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        fresh, quoted, unquoted = response.json()['results']
+        self.assertEqual(fresh['model'], 'hr.dashboard')
+        self.assertEqual(fresh['etag'], etag)
+        self.assertIn('hr', fresh['data'])
+        self.assertEqual(quoted, {'model': 'hr.dashboard', 'etag': etag, 'not_modified': True})
+        self.assertEqual(unquoted, {'model': 'hr.dashboard', 'etag': etag, 'not_modified': True})
+
+    def test_batch_bad_requests(self):
+        Mixin = self.env['druksmart_dashboard.mixin']
+        for body in (
+            {'requests': {'model': 'hr.dashboard'}},
+            {'requests': [{'model': 'hr.dashboard', 'filters': ['2024']}]},
+            {'requests': [{'model': 'hr.dashboard', 'filters': {'year': 2024}}]},
+            {'requests': [{'model': 'hr.dashboard'}] * (Mixin.MAX_BATCH_REQUESTS + 1)},
+        ):
+            self.assertEqual(self._post('/my_dashboard/batch', body).status_code, 400, body)
+        self.assertEqual(self._post('/my_dashboard/batch', {'requests': [{'model': 'res.partner'}]}).status_code, 404)
@@ -0,0 +1,50 @@
+from datetime import date
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import DashboardCommon
+
+
+@tagged('post_install', '-at_install')
+class TestL2Breakdown(DashboardCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.second_project = cls._create_project('Second Local Project', cls.tags['Local'])
+        cls.third_project = cls._create_project('Third Local Project', cls.tags['Local'])
+        cls._create_order(date(cls.year, 3, 10), 3000.0, cls.local_project)
+        cls._create_order(date(cls.year, 3, 12), 1000.0, cls.second_project)
+        cls._create_order(date(cls.year, 3, 14), 2000.0, cls.third_project)
+        cls._create_order(date(cls.year, 3, 20), 500.0, cls.second_project)
+        cls._create_order(date(cls.year, 4, 10), 800.0, cls.third_project)
+        cls.Dashboard = cls.env['l2.dashboard']
+
+    def test_top_projects_and_others(self):
+        breakdown = self.Dashboard.get_breakdown('sales', 'local', 3, year=self.year, limit=2)
+        self.assertEqual(
+            [(row['project_id'], row['amount']) for row in breakdown['projects']],
+            [(self.local_project.id, 3000.0), (self.third_project.id, 2000.0)])
+        self.assertEqual(breakdown['others'], {'count': 1, 'amount': 1500.0})
+        self.assertEqual(breakdown['total'], 6500.0)
+
+        everything = self.Dashboard.get_breakdown('sales', 'local', 3, year=self.year)
+        self.assertEqual(len(everything['projects']), 3)
+        self.assertEqual(everything['others'], {'count': 0, 'amount': 0.0})
+
+        none = self.Dashboard.get_breakdown('sales', 'local', 3, year=self.year, limit=0)
+        self.assertEqual(none['projects'], [])
+        self.assertEqual(none['others'], {'count': 3, 'amount': 6500.0})
+
+    def test_breakdowns_stay_out_of_the_payload(self):
+        payload = self.Dashboard._json_loads(self.Dashboard.get_dashboard_data_json(year=self.year))
+        self.assertNotIn('breakdowns', payload)
+        april = self.Dashboard.get_breakdown('sales', 'local', 4, year=self.year)
+        self.assertEqual([row['project_id'] for row in april['projects']], [self.third_project.id])
+
+    def test_unknown_breakdown(self):
+        with self.assertRaises(UserError):
+            self.Dashboard.get_breakdown('cash_flow', 'local', 3, year=self.year)
+        with self.assertRaises(UserError):
+            self.Dashboard.get_breakdown('sales', 'other', 3, year=self.year)
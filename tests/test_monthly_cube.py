@@ -0,0 +1,60 @@
+from datetime import date
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import DashboardCommon
+
+
+@tagged('post_install', '-at_install')
+class TestMonthlyCube(DashboardCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Cube = cls.env['druksmart_dashboard.monthly_cube']
+        cls.local_orders = (
+            cls._create_order(date(cls.year, 2, 10), 1000.0, cls.local_project)
+            | cls._create_order(date(cls.year, 3, 15), 2500.0, cls.local_project)
+        )
+        cls.export_orders = cls._create_order(date(cls.year, 2, 20), 700.0, cls.export_project)
+        cls.late_order = cls._create_order(date(cls.year, 8, 5), 400.0, cls.local_project)
+        cls.dashboard = cls.env['l1.dashboard'].new({'company_id': cls.company.id, 'year': str(cls.year)})
+
+    def _period(self, month_from, month_to):
+        start_date = date(self.year, month_from, 1)
+        end_date = fields.Date.end_of(date(self.year, month_to, 1), 'month')
+        return fields.Date.to_string(start_date), fields.Date.to_string(end_date)
+
+    def test_ledger_rollup_matches_orders(self):
+        self.Cube._refresh(self.company, self.year)
+        rollup = self.Cube._get_rollup(self.company, *self._period(1, 3))
+
+        sales = rollup['sales']
+        self.assertAlmostEqual(sales['local'], sum(self.local_orders.mapped('amount_untaxed')))
+        self.assertAlmostEqual(sales['export'], sum(self.export_orders.mapped('amount_untaxed')))
+        self.assertAlmostEqual(sales['total'], 4200.0)
+        self.assertAlmostEqual(sales['projects'][self.local_project.id], 3500.0)
+        self.assertEqual([round(amount, 2) for amount in sales['monthly']], [0.0, 1700.0, 2500.0])
+        self.assertAlmostEqual(rollup['sales_orders']['total'], 3)
+
+    def test_card_rollup_matches_direct_computation(self):
+        self.Cube._refresh(self.company, self.year)
+        for month_from, month_to in ((1, 3), (2, 2), (1, 12)):
+            start_date, end_date = self._period(month_from, month_to)
+            direct = self.dashboard._get_sales_data(start_date, end_date)
+            cards = self.dashboard._get_sales_cards(start_date, end_date)
+            for key in ('sales_order_count', 'sales_amount', 'local_sales', 'export_sales'):
+                self.assertAlmostEqual(cards[key], direct[key], msg='%s of %s..%s' % (key, start_date, end_date))
+
+    def test_unbuilt_year_is_computed_directly(self):
+        start_date, end_date = self._period(1, 12)
+        self.assertIsNone(self.Cube._get_built_rollup(self.company, start_date, end_date))
+        unbuilt = self.dashboard._get_sales_cards(start_date, end_date)
+        self.assertAlmostEqual(unbuilt['sales_amount'], 4600.0)
+
+        self.Cube._refresh(self.company, self.year)
+        self.assertIsNotNone(self.Cube._get_built_rollup(self.company, start_date, end_date))
+        built = self.dashboard._get_sales_cards(start_date, end_date)
+        for key in ('sales_order_count', 'sales_amount', 'local_sales', 'export_sales'):
+            self.assertAlmostEqual(built[key], unbuilt[key], msg=key)
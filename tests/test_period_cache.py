@@ -0,0 +1,55 @@
+from datetime import date
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestPeriodCache(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env.company
+        cls.other_company = cls.env['res.company'].create({'name': 'Dashboard Other Company'})
+        cls.env.user.company_ids |= cls.other_company
+        (cls.company | cls.other_company).write({'fiscalyear_lock_date': False})
+        cls.Cache = cls.env['druksmart_dashboard.period_cache'].sudo().with_context(
+            allowed_company_ids=(cls.company | cls.other_company).ids)
+
+    def test_closed_only_when_every_company_locked(self):
+        self.company.fiscalyear_lock_date = date(2000, 12, 31)
+        self.assertFalse(self.Cache._is_closed(self.company, '2000-03-31'))
+        self.assertEqual(self.Cache._get_closed_months(self.company, 2000), 0)
+
+        self.other_company.fiscalyear_lock_date = date(2000, 6, 30)
+        self.assertTrue(self.Cache._is_closed(self.company, '2000-06-30'))
+        self.assertFalse(self.Cache._is_closed(self.company, '2000-07-31'))
+        self.assertEqual(self.Cache._get_closed_months(self.company, 2000), 6)
+
+        # alone, the company is closed up to its own lock date
+        Single = self.Cache.with_context(allowed_company_ids=self.company.ids)
+        self.assertTrue(Single._is_closed(self.company, '2000-12-31'))
+        self.assertEqual(Single._get_closed_months(self.company, 2000), 12)
+
+    def test_lock_date_moving_back_drops_entries(self):
+        (self.company | self.other_company).write({'fiscalyear_lock_date': date(2000, 12, 31)})
+        periods = ['2000-03', '2000-09']
+        self.Cache._store(self.company, 'test.metric', {
+            '2000-03': (date(2000, 3, 31), {'amount': 1.0}),
+            '2000-09': (date(2000, 9, 30), {'amount': 2.0}),
+        }, None)
+        self.assertEqual(self.Cache._fetch(self.company, 'test.metric', periods, None),
+                         {'2000-03': {'amount': 1.0}, '2000-09': {'amount': 2.0}})
+
+        # moving the lock date forward keeps everything
+        self.company.fiscalyear_lock_date = date(2001, 1, 31)
+        self.assertEqual(len(self.Cache._fetch(self.company, 'test.metric', periods, None)), 2)
+
+        # the entries of the company were closed on the lock date of the other one too
+        self.other_company.fiscalyear_lock_date = date(2000, 6, 30)
+        self.assertEqual(self.Cache._fetch(self.company, 'test.metric', periods, None),
+                         {'2000-03': {'amount': 1.0}})
+
+        self.company.fiscalyear_lock_date = False
+        self.assertEqual(self.Cache._fetch(self.company, 'test.metric', periods, None), {})
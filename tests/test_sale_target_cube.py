@@ -0,0 +1,71 @@
+from datetime import date
+
+import psycopg2
+
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from .common import DashboardCommon
+
+
+@tagged('post_install', '-at_install')
+class TestSaleTargetCube(DashboardCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Cube = cls.env['sale.target.cube']
+        cls.orders = (
+            cls._create_order(date(cls.year, 3, 10), 1000.0, cls.local_project)
+            | cls._create_order(date(cls.year, 7, 10), 2000.0, cls.local_project)
+            | cls._create_order(date(cls.year, 5, 10), 500.0, cls.export_project)
+        )
+        cls.env['sale.target'].create({
+            'year': cls.year,
+            'company_id': cls.company.id,
+            'category': 'local',
+            'type': 'sap',
+            'target_amount': 12000.0,
+            'phasing': 'even',
+        })
+
+    def _get_achievement(self, month_from, month_to):
+        return self.Cube._get_period_achievement(
+            self.company, self.year, month_from, month_to, today=date(self.year + 1, 1, 15))
+
+    def test_achievement_matches_orders(self):
+        self.Cube._refresh(self.company, self.year)
+
+        year = self._get_achievement(1, 12)
+        self.assertAlmostEqual(year['actual'], sum(self.orders.mapped('amount_untaxed')))
+        self.assertAlmostEqual(year['target'], 12000.0)
+        self.assertAlmostEqual(year['achievement'], round(3500.0 / 12000.0 * 100, 2))
+
+        quarter = self._get_achievement(1, 3)
+        self.assertAlmostEqual(quarter['actual'], 1000.0)
+        self.assertAlmostEqual(quarter['target'], 3000.0)
+
+        data = self.Cube._get_cube_data(self.company, self.year)
+        self.assertAlmostEqual(data['totals']['local']['actual'], 3000.0)
+        self.assertAlmostEqual(data['totals']['export']['actual'], 500.0)
+
+    def test_unbuilt_year_reads_targets_and_orders(self):
+        self.assertFalse(self.Cube._get_watermark(self.company, self.year))
+        unbuilt = self._get_achievement(1, 12)
+        self.assertAlmostEqual(unbuilt['target'], 12000.0)
+        self.assertAlmostEqual(unbuilt['actual'], 3500.0)
+
+        self.Cube._refresh(self.company, self.year)
+        self.assertEqual(self._get_achievement(1, 12), unbuilt)
+
+    def test_typeless_cells_are_unique(self):
+        self.Cube._refresh(self.company, self.year)
+        with self.assertRaises(psycopg2.IntegrityError), mute_logger('odoo.sql_db'):
+            self.Cube.create({
+                'company_id': self.company.id,
+                'year': self.year,
+                'month': 1,
+                'category': 'local',
+                'type': False,
+            })
+            self.Cube.flush_model()